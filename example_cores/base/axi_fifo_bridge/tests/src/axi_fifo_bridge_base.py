@@ -0,0 +1,147 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, ReadOnly
+import json
+import os
+import random
+from collections import deque
+from axi_lite_bfm import axi_lite_manager, channel_stats, RESP_OKAY
+
+
+class axi_fifo_bridge_base:
+
+    def __init__(self, dut, clk_period=4, time_unit="ns", max_outstanding=0):
+        self.dut = dut
+
+        # Get parameters from the DUT (the axi_fifo_bridge_tb wrapper)
+        self.AXI_ADDR_WIDTH = int(self.dut.AXI_ADDR_WIDTH.value)
+        self.AXI_DATA_WIDTH = int(self.dut.AXI_DATA_WIDTH.value)
+        self.FIFO_ADDR_WIDTH = int(self.dut.FIFO_ADDR_WIDTH.value)
+        self.FIFO_DEPTH = 2**self.FIFO_ADDR_WIDTH
+        self.MAX_DATA_VALUE = (2**self.AXI_DATA_WIDTH) - 1
+
+        self.dut._log.info(f"BRIDGE PARAMETERS: AXI_ADDR_WIDTH={self.AXI_ADDR_WIDTH}, AXI_DATA_WIDTH={self.AXI_DATA_WIDTH}, "
+                           f"FIFO_ADDR_WIDTH={self.FIFO_ADDR_WIDTH}, FIFO_DEPTH={self.FIFO_DEPTH}")
+
+        # Queue to store expected data for verification
+        self.expected_data_q = deque()
+
+        # Pipelined AXI4-Lite manager (see scripts/cocotb/axi_lite_bfm.py)
+        self.axi = axi_lite_manager(self.dut, self.dut.aclk, prefix="s_axi", max_outstanding=max_outstanding)
+
+        # Start the clock and the manager
+        cocotb.start_soon(Clock(self.dut.aclk, clk_period, units=time_unit).start())
+        self.axi.start()
+
+        # Initialize the remaining input signals
+        self.dut.s_axi_awaddr.value = 0
+        self.dut.s_axi_wdata.value = 0
+        self.dut.s_axi_wstrb.value = 0
+        self.dut.s_axi_araddr.value = 0
+
+    async def reset(self):
+        """
+        Resets the bridge and the FIFO for 2 clk cycles, dropping any AXI transactions in flight.
+        """
+        await RisingEdge(self.dut.aclk)
+        self.dut._log.info("STARTING RESET")
+        self.dut.aresetn.value = 0  # Assert active-low reset
+        self.axi.reset()
+        self.expected_data_q.clear()
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1  # Deassert reset
+        self.dut._log.info("RESET COMPLETE")
+
+    async def wait_cycles(self, cycles):
+        for _ in range(cycles):
+            await RisingEdge(self.dut.aclk)
+
+    def queue_writes(self, data_list, addr=0):
+        """
+        Queues back-to-back AXI writes of a list of words, without waiting for them.
+        Words that will get an OKAY response are checked by check_reads, so the FIFO must not overflow
+        unless the test expects it (use forget_write for writes rejected with SLVERR).
+        Returns:
+            list: The queued transactions.
+        """
+        self.expected_data_q.extend(data_list)
+        return [self.axi.write_nowait(addr, data) for data in data_list]
+
+    def queue_reads(self, count, addr=0):
+        """
+        Queues back-to-back AXI reads, without waiting for them.
+        Returns:
+            list: The queued transactions.
+        """
+        return [self.axi.read_nowait(addr) for _ in range(count)]
+
+    def forget_write(self, txn):
+        """
+        Removes a write rejected with SLVERR from the expected data queue (its most recent occurrence).
+        """
+        for index in range(len(self.expected_data_q) - 1, -1, -1):
+            if self.expected_data_q[index] == txn.data:
+                del self.expected_data_q[index]
+                return
+
+    def check_reads(self, transactions):
+        """
+        Checks the data of completed reads with an OKAY response against the expected data queue, in order.
+        Returns:
+            int: Number of reads checked.
+        """
+        checked = 0
+        for txn in transactions:
+            if txn.resp != RESP_OKAY:
+                continue
+            expected = self.expected_data_q.popleft()
+            assert txn.data == expected, f"Read data mismatch (read {checked}): read=0x{txn.data:X}, expected=0x{expected:X}"
+            checked += 1
+        return checked
+
+    async def fifo_status(self):
+        """
+        Samples the FIFO status outputs of the wrapper.
+        Returns:
+            dict: fifo_count, fifo_full, fifo_empty, fifo_overflow and fifo_underflow.
+        """
+        await ReadOnly()
+        return {name: int(getattr(self.dut, name).value)
+                for name in ("fifo_count", "fifo_full", "fifo_empty", "fifo_overflow", "fifo_underflow")}
+
+    def generate_random_data(self, count):
+        """
+        Generates a list of random data values within the AXI_DATA_WIDTH range.
+        """
+        return [random.randint(0, self.MAX_DATA_VALUE) for _ in range(count)]
+
+    def record_performance(self, name, writes=None, reads=None, **extra):
+        """
+        Logs the throughput, latency and stall statistics of a workload (see axi_lite_bfm.channel_stats)
+        and merges them into $RESULTS_DIR/axi_fifo_bridge_performance.json.
+        Returns:
+            dict: The recorded statistics.
+        """
+        result = dict(extra)
+        for direction, transactions in (("write", writes), ("read", reads)):
+            if transactions is None:
+                continue
+            stats = channel_stats(transactions)
+            result[direction] = stats
+            if stats["count"]:
+                self.dut._log.info(
+                    f"{name} ({direction}): {stats['count']} words in {stats['cycles']} cycles "
+                    f"({stats['words_per_cycle']:.3f} words/cycle), latency {stats['latency_min']}-{stats['latency_max']} "
+                    f"cycles, {stats['slverr']} SLVERR, bridge waits {stats['subordinate_wait_cycles']} cycles, "
+                    f"driver idle {stats['manager_idle_cycles']} cycles")
+
+        results_file = os.path.join(os.getenv("RESULTS_DIR", "."), "axi_fifo_bridge_performance.json")
+        results = {}
+        if os.path.exists(results_file):
+            with open(results_file) as f:
+                results = json.load(f)
+        results[name] = result
+        with open(results_file, "w") as f:
+            json.dump(results, f, indent=2)
+        return result
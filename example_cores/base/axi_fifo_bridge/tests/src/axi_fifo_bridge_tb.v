@@ -0,0 +1,100 @@
+`timescale 1 ns / 1 ps
+
+// Test wrapper: axi_fifo_bridge driving a fifo_sync, connected like the FIFO module of ex02_axi_interface
+// (both share one clock and one active-low reset). The FIFO status is brought out for the testbench.
+module axi_fifo_bridge_tb #(
+  parameter integer AXI_ADDR_WIDTH  = 8,
+  parameter integer AXI_DATA_WIDTH  = 32,
+  parameter integer FIFO_ADDR_WIDTH = 4,
+  parameter         ENABLE_WRITE    = 1,
+  parameter         ENABLE_READ     = 1
+)(
+  input  wire                        aclk,
+  input  wire                        aresetn,
+
+  // AXI4-Lite subordinate interface
+  input  wire [AXI_ADDR_WIDTH-1:0]   s_axi_awaddr,
+  input  wire                        s_axi_awvalid,
+  output wire                        s_axi_awready,
+  input  wire [AXI_DATA_WIDTH-1:0]   s_axi_wdata,
+  input  wire [AXI_DATA_WIDTH/8-1:0] s_axi_wstrb,
+  input  wire                        s_axi_wvalid,
+  output wire                        s_axi_wready,
+  output wire [1:0]                  s_axi_bresp,
+  output wire                        s_axi_bvalid,
+  input  wire                        s_axi_bready,
+  input  wire [AXI_ADDR_WIDTH-1:0]   s_axi_araddr,
+  input  wire                        s_axi_arvalid,
+  output wire                        s_axi_arready,
+  output wire [AXI_DATA_WIDTH-1:0]   s_axi_rdata,
+  output wire [1:0]                  s_axi_rresp,
+  output wire                        s_axi_rvalid,
+  input  wire                        s_axi_rready,
+
+  // FIFO status
+  output wire [FIFO_ADDR_WIDTH:0]    fifo_count,
+  output wire                        fifo_full,
+  output wire                        fifo_empty,
+  output wire                        fifo_wr_en,
+  output wire                        fifo_rd_en,
+  output wire                        fifo_overflow,
+  output wire                        fifo_underflow
+);
+
+  wire [AXI_DATA_WIDTH-1:0] fifo_wr_data;
+  wire [AXI_DATA_WIDTH-1:0] fifo_rd_data;
+
+  axi_fifo_bridge #(
+    .AXI_ADDR_WIDTH(AXI_ADDR_WIDTH),
+    .AXI_DATA_WIDTH(AXI_DATA_WIDTH),
+    .ENABLE_WRITE(ENABLE_WRITE),
+    .ENABLE_READ(ENABLE_READ)
+  ) bridge (
+    .aclk(aclk),
+    .wr_resetn(aresetn),
+    .rd_resetn(aresetn),
+    .s_axi_awaddr(s_axi_awaddr),
+    .s_axi_awvalid(s_axi_awvalid),
+    .s_axi_awready(s_axi_awready),
+    .s_axi_wdata(s_axi_wdata),
+    .s_axi_wstrb(s_axi_wstrb),
+    .s_axi_wvalid(s_axi_wvalid),
+    .s_axi_wready(s_axi_wready),
+    .s_axi_bresp(s_axi_bresp),
+    .s_axi_bvalid(s_axi_bvalid),
+    .s_axi_bready(s_axi_bready),
+    .s_axi_araddr(s_axi_araddr),
+    .s_axi_arvalid(s_axi_arvalid),
+    .s_axi_arready(s_axi_arready),
+    .s_axi_rdata(s_axi_rdata),
+    .s_axi_rresp(s_axi_rresp),
+    .s_axi_rvalid(s_axi_rvalid),
+    .s_axi_rready(s_axi_rready),
+    .fifo_wr_data(fifo_wr_data),
+    .fifo_wr_en(fifo_wr_en),
+    .fifo_full(fifo_full),
+    .fifo_rd_data(fifo_rd_data),
+    .fifo_rd_en(fifo_rd_en),
+    .fifo_empty(fifo_empty),
+    .fifo_underflow(fifo_underflow),
+    .fifo_overflow(fifo_overflow)
+  );
+
+  fifo_sync #(
+    .DATA_WIDTH(AXI_DATA_WIDTH),
+    .ADDR_WIDTH(FIFO_ADDR_WIDTH)
+  ) fifo (
+    .clk(aclk),
+    .resetn(aresetn),
+    .wr_data(fifo_wr_data),
+    .wr_en(fifo_wr_en),
+    .full(fifo_full),
+    .almost_full(),
+    .fifo_count(fifo_count),
+    .rd_data(fifo_rd_data),
+    .rd_en(fifo_rd_en),
+    .empty(fifo_empty),
+    .almost_empty()
+  );
+
+endmodule
@@ -0,0 +1,4 @@
+# Test the bridge the way ex02 uses it: driving a fifo_sync instance, inside the axi_fifo_bridge_tb wrapper
+VERILOG_SOURCES += $(CORE_DIR)/../fifo_sync/fifo_sync.v
+VERILOG_SOURCES += $(CURDIR)/axi_fifo_bridge_tb.v
+TOPLEVEL_MODULE := axi_fifo_bridge_tb
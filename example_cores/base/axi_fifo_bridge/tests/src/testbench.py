@@ -0,0 +1,263 @@
+import cocotb
+from cocotb.triggers import RisingEdge, ReadOnly
+from axi_fifo_bridge_base import axi_fifo_bridge_base
+from axi_lite_bfm import RESP_OKAY, RESP_SLVERR
+
+# Tests for axi_fifo_bridge driving a fifo_sync (see axi_fifo_bridge_tb.v), through the pipelined
+# AXI4-Lite manager in scripts/cocotb/axi_lite_bfm.py. Throughput, latency and stall statistics are
+# written to $RESULTS_DIR/axi_fifo_bridge_performance.json.
+#
+# fifo_sync forwards a word written to the address it reads in the same cycle to rd_data, so a read accepted
+# right after a write gets the word just written, both into an empty FIFO (test_read_after_write_empty) and
+# while the FIFO's last word is read (test_read_after_last_word).
+
+# Number of words streamed through the bridge in the streaming tests
+STREAM_WORDS = 256
+# Number of cycles the reads start behind the writes in the streaming tests
+STREAM_LEAD = 4
+
+# Create a setup function that can be called by each test
+async def setup_testbench(dut, max_outstanding=0):
+    tb = axi_fifo_bridge_base(dut, clk_period=4, time_unit="ns", max_outstanding=max_outstanding)
+    return tb
+
+# Test the reset state: no responses pending, FIFO empty, no overflow/underflow
+@cocotb.test()
+async def test_reset(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Reset")
+
+    status = await tb.fifo_status()
+    assert int(dut.s_axi_bvalid.value) == 0, "No write response should be valid after reset"
+    assert int(dut.s_axi_rvalid.value) == 0, "No read response should be valid after reset"
+    assert status["fifo_empty"] == 1 and status["fifo_count"] == 0, "FIFO should be empty after reset"
+    assert status["fifo_overflow"] == 0 and status["fifo_underflow"] == 0, "Overflow/underflow should be clear after reset"
+
+# Single writes and reads through AXI, with data checks
+@cocotb.test()
+async def test_write_read(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Single Write/Read")
+
+    for data in tb.generate_random_data(tb.FIFO_DEPTH // 2):
+        txn = await tb.axi.write(0, data)
+        assert txn.resp == RESP_OKAY, f"Write of 0x{data:X} should succeed, got resp {txn.resp}"
+        tb.expected_data_q.append(data)
+    status = await tb.fifo_status()
+    assert status["fifo_count"] == tb.FIFO_DEPTH // 2, f"FIFO count should be {tb.FIFO_DEPTH // 2}, got {status['fifo_count']}"
+
+    reads = []
+    for _ in range(tb.FIFO_DEPTH // 2):
+        txn = await tb.axi.read(0)
+        assert txn.resp == RESP_OKAY, f"Read should succeed, got resp {txn.resp}"
+        reads.append(txn)
+    tb.check_reads(reads)
+    status = await tb.fifo_status()
+    assert status["fifo_empty"] == 1, "FIFO should be empty after reading everything back"
+    assert status["fifo_overflow"] == 0 and status["fifo_underflow"] == 0, "No overflow/underflow expected"
+    tb.record_performance("single_write_read", writes=None, reads=reads)
+
+# Latency of isolated writes and reads (address handshake to response handshake)
+@cocotb.test()
+async def test_latency(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Write/Read Latency")
+
+    writes = []
+    reads = []
+    for data in tb.generate_random_data(8):
+        writes.append(await tb.axi.write(0, data))
+        tb.expected_data_q.append(data)
+        await tb.wait_cycles(2)
+        reads.append(await tb.axi.read(0))
+        await tb.wait_cycles(2)
+    tb.check_reads(reads)
+
+    result = tb.record_performance("latency", writes=writes, reads=reads)
+    # The bridge registers both responses in the cycle after the handshake
+    for direction in ("write", "read"):
+        assert result[direction]["okay"] == 8, f"All {direction}s should succeed"
+        assert result[direction]["latency_max"] == 1, f"{direction} latency should be 1 cycle, got {result[direction]['latency_max']}"
+
+# Reads accepted in the cycle right after a write into an empty FIFO get the word just written
+@cocotb.test()
+async def test_read_after_write_empty(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Read Right After a Write Into an Empty FIFO")
+
+    writes = []
+    reads = []
+    for data in tb.generate_random_data(8):
+        writes += tb.queue_writes([data])
+        await RisingEdge(dut.aclk)
+        reads += tb.queue_reads(1)
+        await tb.axi.wait_idle()
+        await tb.wait_cycles(2)
+    for write, read in zip(writes, reads):
+        assert read.accept_cycle == write.accept_cycle + 1, \
+            f"Read should be accepted the cycle after the write (write at {write.accept_cycle}, read at {read.accept_cycle})"
+        assert read.resp == RESP_OKAY, f"Read should succeed, got resp {read.resp}"
+    assert tb.check_reads(reads) == len(writes), "Every word should be read back"
+
+    result = tb.record_performance("read_after_write_empty", writes=writes, reads=reads)
+    assert result["read"]["latency_max"] == 1, f"Read latency should be 1 cycle, got {result['read']['latency_max']}"
+    status = await tb.fifo_status()
+    assert status["fifo_empty"] == 1 and status["fifo_underflow"] == 0, "FIFO should be empty, with no underflow"
+
+# Reads accepted in the cycle right after a word is written while the FIFO's last word is read get that word
+@cocotb.test()
+async def test_read_after_last_word(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Read Right After a Write While Reading the Last Word")
+
+    first, second = tb.generate_random_data(2)
+    tb.queue_writes([first])
+    await tb.axi.wait_idle()
+    await tb.wait_cycles(2)
+
+    # Read the only word while writing the next one, then read that one back-to-back
+    write = tb.queue_writes([second])[0]
+    reads = tb.queue_reads(2)
+    await tb.axi.wait_idle()
+    assert reads[0].accept_cycle == write.accept_cycle and reads[1].accept_cycle == write.accept_cycle + 1, \
+        f"Reads should be accepted with the write and the cycle after (write at {write.accept_cycle}, " \
+        f"reads at {reads[0].accept_cycle} and {reads[1].accept_cycle})"
+    assert tb.check_reads(reads) == 2, "Both words should be read back"
+
+# Back-to-back writes until full, then back-to-back reads until empty
+@cocotb.test()
+async def test_burst_throughput(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Burst Throughput")
+
+    writes = tb.queue_writes(tb.generate_random_data(tb.FIFO_DEPTH))
+    await tb.axi.wait_idle()
+    status = await tb.fifo_status()
+    assert status["fifo_full"] == 1, "FIFO should be full after FIFO_DEPTH back-to-back writes"
+
+    await RisingEdge(dut.aclk)
+    reads = tb.queue_reads(tb.FIFO_DEPTH)
+    await tb.axi.wait_idle()
+    tb.check_reads(reads)
+
+    result = tb.record_performance("burst", writes=writes, reads=reads)
+    for direction in ("write", "read"):
+        stats = result[direction]
+        assert stats["okay"] == tb.FIFO_DEPTH, f"All {direction}s should succeed, got {stats}"
+        assert stats["words_per_cycle"] == 1.0, f"Back-to-back {direction}s should sustain 1 word/cycle, got {stats['words_per_cycle']:.3f}"
+        assert stats["subordinate_wait_cycles"] == 0, f"The bridge should never stall {direction}s"
+
+# Simultaneous streaming writes and reads, with the reads STREAM_LEAD cycles behind the writes
+@cocotb.test()
+async def test_streaming_throughput(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Streaming Throughput")
+
+    writes = tb.queue_writes(tb.generate_random_data(STREAM_WORDS))
+    await tb.wait_cycles(STREAM_LEAD)
+    reads = tb.queue_reads(STREAM_WORDS)
+    await tb.axi.wait_idle()
+    tb.check_reads(reads)
+
+    result = tb.record_performance("streaming", writes=writes, reads=reads, lead_cycles=STREAM_LEAD)
+    for direction in ("write", "read"):
+        stats = result[direction]
+        assert stats["okay"] == STREAM_WORDS, f"All streamed {direction}s should succeed, got {stats}"
+        assert stats["words_per_cycle"] == 1.0, f"Streaming {direction}s should sustain 1 word/cycle, got {stats['words_per_cycle']:.3f}"
+    status = await tb.fifo_status()
+    assert status["fifo_empty"] == 1, "FIFO should be empty after the stream"
+    assert status["fifo_overflow"] == 0 and status["fifo_underflow"] == 0, "No overflow/underflow expected while streaming"
+
+# Same stream with one transaction in flight at a time (like a blocking driver), to compare with the pipelined manager
+@cocotb.test()
+async def test_streaming_unpipelined(dut):
+    tb = await setup_testbench(dut, max_outstanding=1)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Streaming Throughput, One Transaction In Flight")
+
+    writes = tb.queue_writes(tb.generate_random_data(STREAM_WORDS))
+    await tb.wait_cycles(2 * STREAM_LEAD)
+    reads = tb.queue_reads(STREAM_WORDS)
+    await tb.axi.wait_idle()
+    tb.check_reads(reads)
+
+    result = tb.record_performance("streaming_unpipelined", writes=writes, reads=reads, max_outstanding=1)
+    for direction in ("write", "read"):
+        stats = result[direction]
+        assert stats["okay"] == STREAM_WORDS, f"All streamed {direction}s should succeed, got {stats}"
+        # Waiting for each response halves the throughput; the bridge itself never stalls
+        assert stats["subordinate_wait_cycles"] == 0, f"The bridge should never stall {direction}s"
+        assert stats["words_per_cycle"] < 1.0, f"One transaction in flight can't sustain 1 word/cycle, got {stats['words_per_cycle']:.3f}"
+
+# Writes to a full FIFO get SLVERR and set the sticky fifo_overflow flag, without corrupting the FIFO contents
+@cocotb.test()
+async def test_overflow(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Overflow")
+
+    extra = 4
+    writes = tb.queue_writes(tb.generate_random_data(tb.FIFO_DEPTH + extra))
+    await tb.axi.wait_idle()
+    for index, txn in enumerate(writes):
+        expected = RESP_OKAY if index < tb.FIFO_DEPTH else RESP_SLVERR
+        assert txn.resp == expected, f"Write {index} should get resp {expected}, got {txn.resp}"
+        if txn.resp == RESP_SLVERR:
+            tb.forget_write(txn)
+    status = await tb.fifo_status()
+    assert status["fifo_overflow"] == 1, "fifo_overflow should be set after writing to a full FIFO"
+    assert status["fifo_full"] == 1 and status["fifo_count"] == tb.FIFO_DEPTH, "FIFO should still hold FIFO_DEPTH words"
+
+    # The accepted words are intact, and the flag stays set
+    await RisingEdge(dut.aclk)
+    reads = tb.queue_reads(tb.FIFO_DEPTH)
+    await tb.axi.wait_idle()
+    assert tb.check_reads(reads) == tb.FIFO_DEPTH, "All accepted words should be read back"
+    status = await tb.fifo_status()
+    assert status["fifo_overflow"] == 1, "fifo_overflow should be sticky until reset"
+    tb.record_performance("overflow", writes=writes, reads=reads)
+
+    await tb.reset()
+    status = await tb.fifo_status()
+    assert status["fifo_overflow"] == 0, "fifo_overflow should be cleared by reset"
+
+# Reads from an empty FIFO get SLVERR with zero data and set the sticky fifo_underflow flag
+@cocotb.test()
+async def test_underflow(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Underflow")
+
+    txn = await tb.axi.read(0)
+    assert txn.resp == RESP_SLVERR and txn.data == 0, f"Read from an empty FIFO should get SLVERR with zero data, got {txn}"
+    status = await tb.fifo_status()
+    assert status["fifo_underflow"] == 1, "fifo_underflow should be set after reading an empty FIFO"
+
+    # Back-to-back reads past the end of the data: the first words succeed, the rest get SLVERR
+    count = tb.FIFO_DEPTH // 2
+    extra = 4
+    writes = tb.queue_writes(tb.generate_random_data(count))
+    await tb.axi.wait_idle()
+    await RisingEdge(dut.aclk)
+    reads = tb.queue_reads(count + extra)
+    await tb.axi.wait_idle()
+    for index, txn in enumerate(reads):
+        expected = RESP_OKAY if index < count else RESP_SLVERR
+        assert txn.resp == expected, f"Read {index} should get resp {expected}, got {txn.resp}"
+        if txn.resp == RESP_SLVERR:
+            assert txn.data == 0, f"Read {index} with SLVERR should return zero data, got 0x{txn.data:X}"
+    assert tb.check_reads(reads) == count, "All written words should be read back"
+
+    # Writes still work, and the flag stays set
+    txn = await tb.axi.write(0, 0)
+    assert txn.resp == RESP_OKAY, "Writes should still succeed after an underflow"
+    await ReadOnly()
+    assert int(dut.fifo_underflow.value) == 1, "fifo_underflow should be sticky until reset"
+    tb.record_performance("underflow", writes=writes, reads=reads)
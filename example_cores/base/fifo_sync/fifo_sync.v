@@ -46,6 +46,7 @@ module fifo_sync #(
   reg  [ADDR_WIDTH:0] wr_ptr_bin;
   reg  [ADDR_WIDTH:0] rd_ptr_bin;
   wire [ADDR_WIDTH:0] rd_ptr_bin_nxt;
+  wire [DATA_WIDTH-1:0] mem_rd_data;
 
   // FIFO memory (BRAM instance)
   mem_sync #(
@@ -58,7 +59,7 @@ module fifo_sync #(
     .wr_data(wr_data),
     .wr_en(wr_en),
     .rd_addr(rd_ptr_bin_nxt[ADDR_WIDTH-1:0]),
-    .rd_data(rd_data)
+    .rd_data(mem_rd_data)
   );
 
   // Write logic
@@ -81,6 +82,17 @@ module fifo_sync #(
     end
   end
 
+  // Write-first read data, so rd_data always holds the oldest word while the FIFO isn't empty
+  // The memory returns the old contents when the address it reads is written in the same cycle (a write into an
+  //   empty FIFO, or while its last word is read), so the written word is forwarded to rd_data instead
+  reg                  rd_bypass;
+  reg [DATA_WIDTH-1:0] rd_bypass_data;
+  always @(posedge clk) begin
+    rd_bypass      <= wr_en && (wr_ptr_bin[ADDR_WIDTH-1:0] == rd_ptr_bin_nxt[ADDR_WIDTH-1:0]);
+    rd_bypass_data <= wr_data;
+  end
+  assign rd_data = rd_bypass ? rd_bypass_data : mem_rd_data;
+
   // Generate full and empty flags
   assign full  = ( (wr_ptr_bin[ADDR_WIDTH] != rd_ptr_bin[ADDR_WIDTH]) &&
            (wr_ptr_bin[ADDR_WIDTH-1:0] == rd_ptr_bin[ADDR_WIDTH-1:0]) );
@@ -0,0 +1,92 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.utils import get_sim_time
+import inspect
+import json
+import os
+import testbench
+from fifo_sync_batch import fifo_sync_instances, read_batch_config
+from transaction_recorder import dump_transactions, release_transaction_recorders
+from testbench_profiler import profile_test
+
+# Batch testbench for fifo_sync: runs the tests of testbench.py against every instance of a batch top,
+# i.e. several parameter sets of the core simulated side by side in one build (see fifo_sync_batch.py).
+# Run with BATCH=1 (see scripts/make/batch_sim.mk, which sets TESTBENCH=batch), or through
+# scripts/make/sweep_core.py --batch to sweep the sets of parameter_sweep.json.
+#
+# Every test of testbench.py has a batch test of the same name, which starts the shared clock and runs the
+# test on all the instances concurrently, each through its own view of the DUT. A failing instance doesn't
+# stop the others: its error and recent transactions are logged, and the batch test fails once all the
+# instances are done, listing the failing instances. The per-instance results of every test are logged
+# and written to $RESULTS_DIR/batch_results.json.
+
+CLK_PERIOD = 4  # ns, like setup_testbench
+
+# Per-instance results of the tests run in this simulation, written to batch_results.json after every test
+_results = {"instances": [], "tests": {}}
+
+
+async def run_instance(test_function, view):
+    """
+    Runs a test on one instance, catching its failure so the other instances keep running.
+    Returns:
+        dict: Status ("PASSED" or "FAILED"), error message and simulated time of the instance's run.
+    """
+    start_ns = get_sim_time("ns")
+    try:
+        await test_function(view)
+    except Exception as error:
+        view._log.error(f"{view._name} FAILED: {type(error).__name__}: {error}")
+        dump_transactions(view)
+        return {"status": "FAILED", "message": f"{type(error).__name__}: {error}",
+                "sim_time_ns": get_sim_time("ns") - start_ns}
+    return {"status": "PASSED", "message": "", "sim_time_ns": get_sim_time("ns") - start_ns}
+
+
+def record_results(dut, test_name, results):
+    """
+    Logs the per-instance results of a test and writes them to $RESULTS_DIR/batch_results.json.
+    """
+    for name, result in results.items():
+        dut._log.info(f"BATCH {test_name} {name}: {result['status']} in {result['sim_time_ns']:.0f} ns"
+                      + (f" -- {result['message']}" if result["message"] else ""))
+    _results["tests"][test_name] = results
+    results_dir = os.getenv("RESULTS_DIR", ".")
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "batch_results.json"), "w") as f:
+        json.dump(_results, f, indent=2)
+
+
+def batch_test(test):
+    """
+    Creates the batch version of a cocotb test of testbench.py, with the same name and options.
+    """
+    # The undecorated test, so the per-test wrappers (profiling, transaction dumps) aren't applied per instance.
+    # Failing instances dump their own transactions, so the batch test only releases the recorders.
+    test_function = inspect.unwrap(test._func)
+
+    async def run_batch(dut):
+        config = read_batch_config()
+        if not _results["instances"]:
+            _results["instances"] = [{"name": instance["name"], "parameters": instance["parameters"]}
+                                     for instance in config["instances"]]
+        views = fifo_sync_instances(dut, config)
+        cocotb.start_soon(Clock(dut.clk, CLK_PERIOD, units="ns").start())
+
+        tasks = [cocotb.start_soon(run_instance(test_function, view)) for view in views]
+        results = {view._name: await task for view, task in zip(views, tasks)}
+        record_results(dut, test.name, results)
+
+        failed = [name for name, result in results.items() if result["status"] != "PASSED"]
+        assert not failed, f"{len(failed)}/{len(results)} instances failed {test.name}: {', '.join(failed)}"
+
+    run_batch.__name__ = run_batch.__qualname__ = test.name
+    return cocotb.test(timeout_time=test.timeout_time, timeout_unit=test.timeout_unit, skip=test.skip,
+                       stage=test.stage)(profile_test(release_transaction_recorders(run_batch)))
+
+
+# Batch tests, in the order of testbench.py (cocotb runs the tests found in this module's namespace)
+for _test in sorted((value for value in vars(testbench).values() if isinstance(value, cocotb.test)),
+                    key=lambda value: value._id):
+    globals()[_test.name] = batch_test(_test)
+del _test  # Otherwise the last original test would be found here too
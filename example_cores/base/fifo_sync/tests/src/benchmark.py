@@ -0,0 +1,210 @@
+import cocotb
+from cocotb.utils import get_sim_time
+import json
+import os
+import random
+import time
+import numpy as np
+from fifo_sync_base import fifo_sync_base, duty_cycle_mask
+from testbench_profiler import profile_test, PROFILE_MODE
+
+# Simulation performance benchmarks for the fifo_sync testbench:
+# - The per-item burst driver (write_burst/read_burst) against the schedule-driven driver
+#     (run_schedule) on the test_random_simultaneous_read_write workload
+# - Standardized workloads of BENCH_CYCLES cycles each: saturated writes, saturated reads,
+#     50/50 simultaneous traffic, and reset-heavy traffic
+# Run with TESTBENCH=benchmark (see scripts/make/cocotb.mk), or through scripts/make/benchmark_core.py
+# to track the results against a baseline. Results are logged and written to $RESULTS_DIR/benchmark.json.
+# The simulator's peak RSS is a high-water mark of the whole process, so it isn't recorded here:
+# benchmark_core.py runs each test in its own simulator process and measures it from outside.
+
+CLK_PERIOD = 4  # ns
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+CYCLES = int(os.getenv("BENCH_CYCLES", "100000"))
+SEED = int(os.getenv("BENCH_SEED", "1"))
+RESET_INTERVAL = 32  # Cycles of traffic between resets in the reset-heavy workload
+
+
+def make_workload(max_data_value, iterations, seed):
+    """
+    Generates the same kind of random iterations as test_random_simultaneous_read_write,
+    deterministically from a seed so both drivers run identical stimulus.
+    Returns:
+        list: One (initial_data, write_data, read_count) tuple per iteration.
+    """
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(iterations):
+        number_of_initial_data = rng.randint(2, 10)
+        number_of_random_writes = rng.randint(50, 300)
+        number_of_random_reads = rng.randint(50, 300)
+        initial_data = [rng.randint(0, max_data_value) for _ in range(number_of_initial_data)]
+        write_data = [rng.randint(0, max_data_value) for _ in range(number_of_random_writes)]
+        workload.append((initial_data, write_data, number_of_random_reads))
+    return workload
+
+
+def random_data(rng, tb, count):
+    """
+    Generates `count` random data words for the DUT's DATA_WIDTH.
+    """
+    return rng.integers(0, tb.MAX_DATA_VALUE, size=count, endpoint=True, dtype=np.uint64)
+
+
+def check_schedule(result):
+    """
+    Asserts that every read of a schedule run returned the expected data.
+    """
+    mismatches = np.flatnonzero(result.rd_data[result.rd_done] != result.expected[result.rd_done])
+    assert mismatches.size == 0, f"Data mismatch: read=0x{int(result.rd_data[result.rd_done][mismatches[0]]):X}, expected=0x{int(result.expected[result.rd_done][mismatches[0]]):X} at read {mismatches[0] + 1}"
+
+
+def record_result(dut, name, cycles, wall_time, **workload):
+    """
+    Logs a benchmark result and merges it into $RESULTS_DIR/benchmark.json.
+    Args:
+        workload: Workload parameters stored with the result (e.g. iterations=20).
+    """
+    cycles_per_sec = cycles / wall_time if wall_time > 0 else float("inf")
+    dut._log.info(f"BENCHMARK {name}: {cycles} cycles in {wall_time:.3f} s wall ({cycles_per_sec:.0f} cycles/s)")
+
+    results_dir = os.getenv("RESULTS_DIR", ".")
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, "benchmark.json")
+    results = {}
+    if os.path.exists(results_file):
+        with open(results_file) as f:
+            results = json.load(f)
+    results[name] = dict(workload, **{
+        "waves": os.getenv("WAVES", "vcd"),
+        "profile": PROFILE_MODE,  # Profiled runs are slower, so they shouldn't be compared with plain ones
+        "seed": SEED,
+        "cycles": cycles,
+        "wall_time_s": wall_time,
+        "cycles_per_sec": cycles_per_sec,
+    })
+    with open(results_file, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+# Per-item driver: the current write_burst/read_burst flow from testbench.py
+@cocotb.test()
+@profile_test
+async def bench_burst_random_simultaneous_read_write(dut):
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns")
+    workload = make_workload(tb.MAX_DATA_VALUE, ITERATIONS, SEED)
+
+    start_cycle = get_sim_time("ns") // CLK_PERIOD
+    start_wall = time.perf_counter()
+
+    for initial_data, write_data, read_count in workload:
+        await tb.reset()
+        for data in initial_data:
+            await tb.write(data)
+
+        write_task = cocotb.start_soon(tb.write_burst(write_data))
+        read_task = cocotb.start_soon(tb.read_burst(read_count))
+        await write_task
+        read_results = await read_task
+
+        for read_number, (read_value, expected_value) in enumerate(read_results, start=1):
+            assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at read {read_number}"
+
+    wall_time = time.perf_counter() - start_wall
+    cycles = get_sim_time("ns") // CLK_PERIOD - start_cycle
+    record_result(dut, "burst", cycles, wall_time, iterations=ITERATIONS)
+
+
+# Schedule-driven driver: the same workload described up front as per-cycle arrays
+@cocotb.test()
+@profile_test
+async def bench_schedule_random_simultaneous_read_write(dut):
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns")
+    workload = make_workload(tb.MAX_DATA_VALUE, ITERATIONS, SEED)
+
+    start_cycle = get_sim_time("ns") // CLK_PERIOD
+    start_wall = time.perf_counter()
+
+    for initial_data, write_data, read_count in workload:
+        await tb.reset()
+
+        # Initial fill, then simultaneous writes and reads
+        number_of_initial_data = len(initial_data)
+        cycles = number_of_initial_data + max(len(write_data), read_count)
+        wr_en = np.zeros(cycles, dtype=bool)
+        wr_en[:number_of_initial_data + len(write_data)] = True
+        wr_data = np.zeros(cycles, dtype=np.uint64)
+        wr_data[:number_of_initial_data + len(write_data)] = initial_data + write_data
+        rd_en = np.zeros(cycles, dtype=bool)
+        rd_en[number_of_initial_data:number_of_initial_data + read_count] = True
+
+        result = await tb.run_schedule(wr_en, wr_data, rd_en)
+        check_schedule(result)
+
+    wall_time = time.perf_counter() - start_wall
+    cycles = get_sim_time("ns") // CLK_PERIOD - start_cycle
+    record_result(dut, "schedule", cycles, wall_time, iterations=ITERATIONS)
+
+
+async def run_workload(dut, name, wr_en, rd_en, **workload):
+    """
+    Runs a standardized workload of per-cycle write/read enables with the schedule-driven driver,
+    after a single reset, and records its performance.
+    """
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns")
+    rng = np.random.default_rng(SEED)
+    await tb.reset()
+
+    start_cycle = get_sim_time("ns") // CLK_PERIOD
+    start_wall = time.perf_counter()
+    result = await tb.run_schedule(wr_en, random_data(rng, tb, len(wr_en)), rd_en)
+    wall_time = time.perf_counter() - start_wall
+    cycles = get_sim_time("ns") // CLK_PERIOD - start_cycle
+
+    check_schedule(result)
+    record_result(dut, name, cycles, wall_time, workload_cycles=len(wr_en), **workload)
+
+
+# Writes every cycle, reads one cycle in four: the FIFO stays full and most writes are held off
+@cocotb.test()
+@profile_test
+async def bench_saturated_writes(dut):
+    await run_workload(dut, "saturated_writes", np.ones(CYCLES, dtype=bool), duty_cycle_mask(CYCLES, 1, 3))
+
+
+# Reads every cycle, writes one cycle in four: the FIFO stays empty and most reads are held off
+@cocotb.test()
+@profile_test
+async def bench_saturated_reads(dut):
+    await run_workload(dut, "saturated_reads", duty_cycle_mask(CYCLES, 1, 3), np.ones(CYCLES, dtype=bool))
+
+
+# Independent random writes and reads, each enabled half of the time
+@cocotb.test()
+@profile_test
+async def bench_simultaneous_50_50(dut):
+    rng = np.random.default_rng(SEED)
+    await run_workload(dut, "simultaneous_50_50", rng.random(CYCLES) < 0.5, rng.random(CYCLES) < 0.5)
+
+
+# 50/50 traffic with a reset every RESET_INTERVAL cycles
+@cocotb.test()
+@profile_test
+async def bench_reset_heavy(dut):
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns")
+    rng = np.random.default_rng(SEED)
+    # Only the traffic cycles count towards CYCLES (each reset adds a few more)
+    resets = max(1, CYCLES // RESET_INTERVAL)
+
+    start_cycle = get_sim_time("ns") // CLK_PERIOD
+    start_wall = time.perf_counter()
+    for _ in range(resets):
+        await tb.reset()
+        result = await tb.run_schedule(rng.random(RESET_INTERVAL) < 0.5, random_data(rng, tb, RESET_INTERVAL),
+                                       rng.random(RESET_INTERVAL) < 0.5)
+        check_schedule(result)
+    wall_time = time.perf_counter() - start_wall
+    cycles = get_sim_time("ns") // CLK_PERIOD - start_cycle
+
+    record_result(dut, "reset_heavy", cycles, wall_time, workload_cycles=resets * RESET_INTERVAL,
+                  resets=resets, reset_interval=RESET_INTERVAL)
@@ -0,0 +1,228 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, ReadOnly
+import csv
+import itertools
+import os
+import numpy as np
+from fifo_sync_base import fifo_sync_base
+from fifo_sync_batch import BATCH_CONFIG, fifo_sync_instances
+from fifo_sync_stimulus import fifo_sync_stimulus
+from testbench_profiler import profile_test
+
+# Latency and throughput characterization of fifo_sync under different producer/consumer traffic profiles.
+# Run with TESTBENCH=characterize (see scripts/make/cocotb.mk). To sweep the depth too, run it on a batch of
+# ADDR_WIDTH values, e.g. BATCH=1 TESTBENCH=characterize BATCH_SWEEP=characterize_sweep.json (see
+# scripts/make/batch_sim.mk): every instance is then characterized at the same time, from the shared clock.
+#
+# Every traffic point drives random writes and reads with the schedule-driven driver (fifo_sync_base.run_schedule)
+# for CHAR_CYCLES cycles after a reset. The producer and consumer enables are drawn by fifo_sync_stimulus.enables,
+# with the point's write and read rates (fraction of cycles with the enable high) and burst length (mean length of
+# the runs of enabled cycles, 1 for independent cycles). Points are the combinations of:
+# - CHAR_WRITE_RATES: Producer rates, comma-separated (default "0.25,0.5,0.75,1")
+# - CHAR_READ_RATES: Consumer rates, comma-separated (default "0.25,0.5,0.75,1")
+# - CHAR_BURST_LENGTHS: Burst lengths, comma-separated (default "1,8")
+# Other settings: CHAR_CYCLES (cycles per point, default 20000) and CHAR_SEED (default 1).
+#
+# For every point, this records:
+# - Latency: cycles from the cycle a word's write is accepted to the cycle it's read (min, mean, percentiles, max),
+#     over the words read during the point (words still in the FIFO at the end aren't counted)
+# - Throughput: accepted writes and reads per cycle, and the fraction of write (read) requests held off while full (empty)
+# - Occupancy: fraction of cycles full and empty, and mean and maximum fifo_count
+# The results are logged as a table and written to $RESULTS_DIR:
+# - characterization.txt: The table
+# - characterization.csv: One row per instance and point
+# - characterization_latency.csv: Latency histograms, one row per instance, point and latency value
+
+CLK_PERIOD = 4  # ns
+CYCLES = int(os.getenv("CHAR_CYCLES", "20000"))
+WRITE_RATES = [float(rate) for rate in os.getenv("CHAR_WRITE_RATES", "0.25,0.5,0.75,1").split(",")]
+READ_RATES = [float(rate) for rate in os.getenv("CHAR_READ_RATES", "0.25,0.5,0.75,1").split(",")]
+BURST_LENGTHS = [float(length) for length in os.getenv("CHAR_BURST_LENGTHS", "1,8").split(",")]
+SEED = int(os.getenv("CHAR_SEED", "1"))
+
+# Columns of characterization.csv (and the table)
+COLUMNS = ["instance", "addr_width", "depth", "data_width", "write_rate", "read_rate", "burst_length", "cycles",
+           "offered_write_rate", "offered_read_rate", "writes", "reads", "write_throughput", "read_throughput",
+           "write_stall_fraction", "read_stall_fraction", "full_fraction", "empty_fraction", "mean_occupancy", "max_occupancy",
+           "latency_min", "latency_mean", "latency_p50", "latency_p90", "latency_p99", "latency_max"]
+
+
+class occupancy_sampler:
+
+    def __init__(self, dut, cycles):
+        """
+        Samples full, empty and fifo_count every cycle into preallocated arrays.
+        Args:
+            dut: DUT (or batch instance view) to sample.
+            cycles (int): Maximum number of samples.
+        """
+        self.dut = dut
+        self.full = np.zeros(cycles, dtype=bool)
+        self.empty = np.zeros(cycles, dtype=bool)
+        self.fifo_count = np.zeros(cycles, dtype=np.uint32)
+        self.samples = 0
+        self._task = None
+
+    async def _run(self):
+        full_sig, empty_sig, count_sig = self.dut.full, self.dut.empty, self.dut.fifo_count
+        clk_edge = RisingEdge(self.dut.clk)
+        read_only = ReadOnly()
+        while self.samples < len(self.full):
+            await clk_edge
+            await read_only
+            index = self.samples
+            self.full[index] = int(full_sig.value)
+            self.empty[index] = int(empty_sig.value)
+            self.fifo_count[index] = int(count_sig.value)
+            self.samples = index + 1
+
+    def start(self):
+        self._task = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+
+def point_metrics(tb, wr_en, rd_en, result, sampler):
+    """
+    Computes the metrics of a traffic point from its schedule result and occupancy samples.
+    Returns:
+        tuple: (row of characterization.csv without the point settings, latencies as a NumPy array)
+    """
+    cycles = len(wr_en)
+    write_cycles = np.flatnonzero(result.wr_done)
+    read_cycles = np.flatnonzero(result.rd_done)
+    # Words are read in the order they're written
+    latency = read_cycles - write_cycles[:len(read_cycles)]
+    full = sampler.full[:sampler.samples]
+    empty = sampler.empty[:sampler.samples]
+    fifo_count = sampler.fifo_count[:sampler.samples]
+    write_requests = int(np.count_nonzero(wr_en))
+    read_requests = int(np.count_nonzero(rd_en))
+
+    row = {
+        "addr_width": tb.ADDR_WIDTH,
+        "depth": tb.FIFO_DEPTH,
+        "data_width": tb.DATA_WIDTH,
+        "cycles": cycles,
+        # Fraction of cycles with the enable high (the point's rates are only met on average)
+        "offered_write_rate": write_requests / cycles,
+        "offered_read_rate": read_requests / cycles,
+        "writes": len(write_cycles),
+        "reads": len(read_cycles),
+        "write_throughput": len(write_cycles) / cycles,
+        "read_throughput": len(read_cycles) / cycles,
+        "write_stall_fraction": 1 - len(write_cycles) / write_requests if write_requests else 0.0,
+        "read_stall_fraction": 1 - len(read_cycles) / read_requests if read_requests else 0.0,
+        "full_fraction": float(full.mean()) if full.size else 0.0,
+        "empty_fraction": float(empty.mean()) if empty.size else 0.0,
+        "mean_occupancy": float(fifo_count.mean()) if fifo_count.size else 0.0,
+        "max_occupancy": int(fifo_count.max()) if fifo_count.size else 0,
+    }
+    if latency.size:
+        p50, p90, p99 = np.percentile(latency, [50, 90, 99])
+        row.update(latency_min=int(latency.min()), latency_mean=float(latency.mean()), latency_p50=float(p50),
+                   latency_p90=float(p90), latency_p99=float(p99), latency_max=int(latency.max()))
+    else:
+        row.update(latency_min=None, latency_mean=None, latency_p50=None, latency_p90=None, latency_p99=None,
+                   latency_max=None)
+    return row, latency
+
+
+async def characterize(dut):
+    """
+    Runs every traffic point on a DUT (or batch instance view).
+    Returns:
+        tuple: (rows of characterization.csv, rows of characterization_latency.csv)
+    """
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns", test_name="characterize")
+    name = dut._name
+    rows = []
+    histogram_rows = []
+    points = list(itertools.product(WRITE_RATES, READ_RATES, BURST_LENGTHS))
+    for index, (write_rate, read_rate, burst_length) in enumerate(points):
+        # Seeded per point, so a point's traffic doesn't depend on the other points or the instance
+        stimulus = fifo_sync_stimulus(tb.MAX_DATA_VALUE, "characterize", index + 1, master_seed=SEED)
+        wr_en = stimulus.enables(CYCLES, write_rate, burst_length)
+        rd_en = stimulus.enables(CYCLES, read_rate, burst_length)
+        wr_data = stimulus.data(CYCLES)
+
+        await tb.reset()
+        sampler = occupancy_sampler(dut, CYCLES)
+        sampler.start()
+        result = await tb.run_schedule(wr_en, wr_data, rd_en)
+        sampler.stop()
+
+        mismatches = np.flatnonzero(result.rd_data[result.rd_done] != result.expected[result.rd_done])
+        assert mismatches.size == 0, (f"{name}: data mismatch at read {mismatches[0] + 1} of point {index} "
+                                      f"(write rate {write_rate}, read rate {read_rate}, burst length {burst_length})")
+
+        row, latency = point_metrics(tb, wr_en, rd_en, result, sampler)
+        rows.append(dict(row, instance=name, write_rate=write_rate, read_rate=read_rate, burst_length=burst_length))
+        values, counts = np.unique(latency, return_counts=True)
+        histogram_rows.extend({"instance": name, "addr_width": tb.ADDR_WIDTH, "write_rate": write_rate,
+                               "read_rate": read_rate, "burst_length": burst_length, "latency": int(value),
+                               "count": int(count)} for value, count in zip(values, counts))
+    return rows, histogram_rows
+
+
+def _format(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def write_results(log, rows, histogram_rows):
+    """
+    Logs the characterization table and writes it, the CSV and the latency histograms to $RESULTS_DIR.
+    """
+    table_columns = ["instance", "depth", "write_rate", "read_rate", "burst_length", "write_throughput",
+                     "read_throughput", "full_fraction", "empty_fraction", "max_occupancy", "latency_min",
+                     "latency_mean", "latency_p99", "latency_max"]
+    widths = [max(len(column), *(len(_format(row[column])) for row in rows)) for column in table_columns]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(table_columns, widths))]
+    lines += ["  ".join(_format(row[column]).rjust(width) for column, width in zip(table_columns, widths))
+              for row in rows]
+    for line in lines:
+        log.info(f"CHARACTERIZE {line}")
+
+    results_dir = os.getenv("RESULTS_DIR", ".")
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "characterization.txt"), "w") as f:
+        f.write(f"fifo_sync characterization: {CYCLES} cycles per point, seed {SEED}, latency in cycles\n\n")
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(results_dir, "characterization.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(results_dir, "characterization_latency.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["instance", "addr_width", "write_rate", "read_rate", "burst_length",
+                                               "latency", "count"])
+        writer.writeheader()
+        writer.writerows(histogram_rows)
+    log.info(f"CHARACTERIZE results written to {os.path.join(results_dir, 'characterization.csv')}")
+
+
+# Characterizes the DUT, or every instance of a batch top concurrently (BATCH=1)
+@cocotb.test()
+@profile_test
+async def characterize_traffic(dut):
+    if BATCH_CONFIG:
+        duts = fifo_sync_instances(dut)
+        cocotb.start_soon(Clock(dut.clk, CLK_PERIOD, units="ns").start())
+    else:
+        duts = [dut]
+
+    tasks = [cocotb.start_soon(characterize(instance)) for instance in duts]
+    rows = []
+    histogram_rows = []
+    for task in tasks:
+        instance_rows, instance_histogram_rows = await task
+        rows += instance_rows
+        histogram_rows += instance_histogram_rows
+    write_results(dut._log, rows, histogram_rows)
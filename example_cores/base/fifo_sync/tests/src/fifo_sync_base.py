@@ -1,13 +1,55 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ReadOnly, ReadWrite
-import random
-from collections import deque
+from cocotb.utils import get_sim_time
+import time
+from collections import deque, namedtuple
+import numpy as np
+from transaction_recorder import transaction_recorder, OP_WRITE, OP_READ, OP_WRITE_SKIPPED, OP_READ_SKIPPED, OP_RESET
+from fifo_sync_model import fifo_sync_model, fifo_sync_monitor
+from waveform_capture import waveform_capture
+from fifo_sync_stimulus import fifo_sync_stimulus
+from fifo_sync_batch import fifo_sync_instance
+
+
+# Per-cycle results of a schedule run (see fifo_sync_base.run_schedule)
+# - wr_done: Cycles where the write was accepted (wr_en asserted and FIFO not full)
+# - rd_done: Cycles where the read was accepted (rd_en asserted and FIFO not empty)
+# - rd_data: Data presented on rd_data in cycles where the read was accepted (0 otherwise)
+# - expected: Expected data in cycles where the read was accepted (0 otherwise)
+ScheduleResult = namedtuple("ScheduleResult", ["wr_done", "rd_done", "rd_data", "expected"])
+
+# Totals of a streamed run (see fifo_sync_base.run_stream)
+# - cycles: Clock cycles driven
+# - writes, reads: Accepted writes and reads
+# - wall_time: Wall-clock time of the run in seconds
+StreamResult = namedtuple("StreamResult", ["cycles", "writes", "reads", "wall_time"])
+
+# Cycles between wall-clock checks in run_stream (the budget and progress reports)
+STREAM_CHECK_CYCLES = 1024
+
+# Signals captured by the testbench-side waveform modes (see waveform_capture.py)
+WAVE_SIGNALS = ["resetn", "wr_en", "wr_data", "full", "almost_full", "rd_en", "rd_data", "empty", "almost_empty",
+                "fifo_count", "wr_ptr_bin", "rd_ptr_bin", "rd_ptr_bin_nxt"]
+
+
+def duty_cycle_mask(cycles, on, off, offset=0):
+    """
+    Builds a periodic enable mask, high for `on` cycles then low for `off` cycles.
+    Args:
+        cycles (int): Length of the mask in clock cycles.
+        on (int): Number of enabled cycles per period.
+        off (int): Number of disabled cycles per period.
+        offset (int): Number of cycles to shift the pattern by.
+    Returns:
+        numpy.ndarray: Boolean mask of length `cycles`.
+    """
+    return ((np.arange(cycles) + offset) % (on + off)) < on
 
 
 class fifo_sync_base:
 
-    def __init__(self, dut, clk_period=4, time_unit="ns"):
+    def __init__(self, dut, clk_period=4, time_unit="ns", check_model=True, waves=None, test_name=""):
         self.dut = dut
 
         # Get parameters from the DUT
@@ -25,8 +67,26 @@ class fifo_sync_base:
         # Queue to store expected data for verification
         self.expected_data_q = deque()
 
-        # Start the clock
-        cocotb.start_soon(Clock(self.dut.clk, clk_period, units=time_unit).start())
+        # Seeded random stimulus of the test (see fifo_sync_stimulus.py), replaced per iteration by the random tests
+        self.stimulus = fifo_sync_stimulus(self.MAX_DATA_VALUE, test_name)
+
+        # Ring-buffered transaction log, formatted only when dumped (see transaction_recorder.py)
+        self.recorder = transaction_recorder(self.dut)
+
+        # Windowed or triggered waveform capture (mode from WAVES unless overridden, see waveform_capture.py)
+        self.waves = waveform_capture(self.dut, WAVE_SIGNALS, mode=waves)
+        self.waves.start()
+
+        # Cycle-accurate reference model, checked against the DUT every cycle (see fifo_sync_model.py)
+        self.model = fifo_sync_model(self.DATA_WIDTH, self.ADDR_WIDTH, self.ALMOST_FULL_THRESHOLD, self.ALMOST_EMPTY_THRESHOLD)
+        self.monitor = fifo_sync_monitor(self.dut, self.model, recorder=self.recorder, waves=self.waves)
+        if check_model:
+            self.monitor.start()
+
+        # Start the clock, unless the DUT is an instance of a batch simulation, whose clock is shared by all
+        # the instances and started by the batch testbench (see fifo_sync_batch.py)
+        if not isinstance(self.dut, fifo_sync_instance):
+            cocotb.start_soon(Clock(self.dut.clk, clk_period, units=time_unit).start())
 
         # Initialize input signals
         self.dut.wr_en.value = 0
@@ -41,6 +101,7 @@ class fifo_sync_base:
         await RisingEdge(self.dut.clk)
         self.dut._log.info("STARTING RESET")
         self.dut.resetn.value = 0  # Assert active-low reset
+        self.recorder.record(OP_RESET)
         self.expected_data_q.clear()  # Clear expected data queue on reset
         await RisingEdge(self.dut.clk)
         await RisingEdge(self.dut.clk)
@@ -60,10 +121,10 @@ class fifo_sync_base:
         await ReadWrite()
 
         if self.dut.full.value == 1:
-            self.dut._log.info(f"Attempted to write 0x{data:X} but FIFO is full. Skipping write.")
+            self.recorder.record(OP_WRITE_SKIPPED, data)
             return False
 
-        self.dut._log.info(f"Writing data: 0x{data:X}")
+        self.recorder.record(OP_WRITE, data)
         self.dut.wr_data.value = data
         self.dut.wr_en.value = 1
 
@@ -85,7 +146,7 @@ class fifo_sync_base:
         await ReadWrite()
 
         if self.dut.empty.value == 1:
-            self.dut._log.info("Attempted to read but FIFO is empty. Skipping read.")
+            self.recorder.record(OP_READ_SKIPPED)
             return (None, None, False)
 
         self.dut.rd_en.value = 1
@@ -96,9 +157,7 @@ class fifo_sync_base:
         read_val = self.dut.rd_data.value
         expected_val = self.expected_data_q.popleft() # Pop from expected queue before asserting rd_en
 
-        self.dut._log.info(f"Reading data. Expected: 0x{expected_val:X}, Actual: 0x{int(read_val):X}")
-
-
+        self.recorder.record(OP_READ, int(read_val), expected_val)
 
         await RisingEdge(self.dut.clk) # Wait for the read enable to take effect (pointer update)
         self.dut.rd_en.value = 0 # Deassert read enable
@@ -123,10 +182,11 @@ class fifo_sync_base:
 
             if self.dut.full.value == 1:
                 self.dut._log.info(f"FIFO full during burst write after {written_count} items. Skipping remaining writes including 0x{data:X}.")
+                self.recorder.record(OP_WRITE_SKIPPED, data)
                 self.dut.wr_en.value = 0
                 break
 
-            self.dut._log.info(f"Writing data: 0x{data:X}")
+            self.recorder.record(OP_WRITE, data)
             self.dut.wr_data.value = data
             self.dut.wr_en.value = 1
             self.expected_data_q.append(data)  # Add to expected queue immediately
@@ -155,23 +215,215 @@ class fifo_sync_base:
 
             if self.dut.empty.value == 1:
                 self.dut._log.info("FIFO empty during burst read. Stopping reads.")
+                self.recorder.record(OP_READ_SKIPPED)
                 self.dut.rd_en.value = 0
                 break
 
             self.dut.rd_en.value = 1
 
             await ReadOnly()
-            read_value = self.dut.rd_data.value
+            read_value = int(self.dut.rd_data.value)
             expected_value = self.expected_data_q.popleft()
-            read_items.append((int(read_value), expected_value))
-
-            self.dut._log.info(f"Reading data. Expected: 0x{expected_value:X}, Actual: 0x{int(read_value):X}")
+            read_items.append((read_value, expected_value))
+            self.recorder.record(OP_READ, read_value, expected_value)
 
         await RisingEdge(self.dut.clk)
         self.dut.rd_en.value = 0  # Deassert read enable after burst read
         self.dut._log.info(f"Burst read complete. Total items read: {len(read_items)}")
         return read_items
 
+    async def run_schedule(self, wr_en, wr_data, rd_en):
+        """
+        Applies a precomputed per-cycle schedule of writes and reads in a single driver loop.
+        Writes are skipped in cycles where the FIFO is full. rd_en is driven as given, and a read is taken
+        from rd_data in every cycle where it's high and the FIFO isn't empty (like the DUT accepts it),
+        without any per-item logging. All arrays must have the same length (one entry per cycle).
+        Args:
+            wr_en (array-like): Per-cycle write enable mask.
+            wr_data (array-like): Per-cycle write data (ignored where wr_en is low).
+            rd_en (array-like): Per-cycle read enable mask.
+        Returns:
+            ScheduleResult: Preallocated per-cycle result arrays.
+        """
+        cycles = len(wr_en)
+        if len(wr_data) != cycles or len(rd_en) != cycles:
+            raise ValueError(f"Schedule arrays must have equal lengths (wr_en={len(wr_en)}, "
+                             f"wr_data={len(wr_data)}, rd_en={len(rd_en)})")
+
+        data_dtype = np.uint64 if self.DATA_WIDTH <= 64 else object
+        result = ScheduleResult(
+            wr_done=np.zeros(cycles, dtype=bool),
+            rd_done=np.zeros(cycles, dtype=bool),
+            rd_data=np.zeros(cycles, dtype=data_dtype),
+            expected=np.zeros(cycles, dtype=data_dtype),
+        )
+
+        # Plain Python lists index much faster than NumPy arrays in the per-cycle loop
+        wr_en_list = np.asarray(wr_en, dtype=bool).tolist()
+        wr_data_list = [int(data) for data in wr_data]
+        rd_en_list = np.asarray(rd_en, dtype=bool).tolist()
+        wr_done = [False] * cycles
+        rd_done = [False] * cycles
+        rd_data = [0] * cycles
+        expected = [0] * cycles
+
+        # Hoist the handles and triggers out of the loop
+        dut = self.dut
+        full_sig, empty_sig, rd_data_sig = dut.full, dut.empty, dut.rd_data
+        wr_en_sig, wr_data_sig, rd_en_sig = dut.wr_en, dut.wr_data, dut.rd_en
+        expected_q = self.expected_data_q
+        clk_edge = RisingEdge(dut.clk)
+        settle = ReadWrite()
+        wr_en_driven = None
+        rd_en_driven = None
+
+        self.dut._log.info(f"Starting schedule with {cycles} cycles "
+                           f"({sum(wr_en_list)} write cycles, {sum(rd_en_list)} read cycles).")
+
+        for cycle in range(cycles):
+            await clk_edge
+            await settle
+
+            do_write = wr_en_list[cycle] and not int(full_sig.value)
+            rd_en = rd_en_list[cycle]
+            do_read = rd_en and not int(empty_sig.value)
+
+            if do_read:
+                # FWFT: rd_data already presents the head item before rd_en is asserted
+                rd_done[cycle] = True
+                rd_data[cycle] = int(rd_data_sig.value)
+                expected[cycle] = expected_q.popleft()
+            if do_write:
+                wr_done[cycle] = True
+                wr_data_sig.value = wr_data_list[cycle]
+                expected_q.append(wr_data_list[cycle])
+
+            # Only touch the enables through the GPI when they change
+            if do_write != wr_en_driven:
+                wr_en_sig.value = int(do_write)
+                wr_en_driven = do_write
+            if rd_en != rd_en_driven:
+                rd_en_sig.value = int(rd_en)
+                rd_en_driven = rd_en
+
+        await clk_edge
+        wr_en_sig.value = 0
+        rd_en_sig.value = 0
+
+        result.wr_done[:] = wr_done
+        result.rd_done[:] = rd_done
+        result.rd_data[:] = rd_data
+        result.expected[:] = expected
+        self.dut._log.info(f"Schedule complete. Total items written: {int(result.wr_done.sum())}, "
+                           f"read: {int(result.rd_done.sum())}")
+        return result
+
+    def stream_checker(self):
+        """
+        Checker stage of run_stream: a generator that is sent (cycle, read_value, expected_value) for every
+        accepted read, and raises on the first mismatch, triggering the waveform capture first.
+        The recorder isn't dumped here; use the dump_transactions_on_failure decorator on the test.
+        """
+        while True:
+            cycle, read_value, expected_value = yield
+            if read_value != expected_value:
+                message = (f"Data mismatch at {get_sim_time('ns')} ns (stream cycle {cycle}): "
+                           f"read=0x{read_value:X}, expected=0x{expected_value:X}")
+                self.waves.trigger(message)
+                raise AssertionError(message)
+
+    async def run_stream(self, stimulus, checker=None, max_transactions=0, max_seconds=0, report_interval=10.0):
+        """
+        Streams per-cycle stimulus through the FIFO in constant memory: the stimulus is consumed one cycle at a
+        time, accepted writes and reads are sampled as they happen (like run_schedule), and every read is sent to
+        the checker immediately, so a mismatch fails the run in the cycle it happens. Only the expected queue
+        (at most FIFO_DEPTH items) and the recorder's ring buffer are kept.
+        Like in run_schedule, rd_en is driven as given, and writes are skipped while the FIFO is full.
+        Stops when the stimulus is exhausted, or when either budget is reached.
+        Args:
+            stimulus (iterator): Per-cycle (wr_en, wr_data, rd_en) tuples, e.g. from a generator.
+            checker (generator): Checker stage, stream_checker() by default.
+            max_transactions (int): Number of accepted writes and reads to stop after (0 for no limit).
+            max_seconds (float): Wall-clock time to stop after (0 for no limit).
+            report_interval (float): Wall-clock seconds between progress logs (0 for none).
+        Returns:
+            StreamResult: Totals of the run.
+        """
+        if checker is None:
+            checker = self.stream_checker()
+        next(checker)
+        check = checker.send
+
+        # Hoist the handles and triggers out of the loop
+        dut = self.dut
+        full_sig, empty_sig, rd_data_sig = dut.full, dut.empty, dut.rd_data
+        wr_en_sig, wr_data_sig, rd_en_sig = dut.wr_en, dut.wr_data, dut.rd_en
+        expected_q = self.expected_data_q
+        record = self.recorder.record
+        clk_edge = RisingEdge(dut.clk)
+        settle = ReadWrite()
+        wr_en_driven = None
+        rd_en_driven = None
+
+        cycles = writes = reads = 0
+        next_check = STREAM_CHECK_CYCLES
+        start_wall = time.perf_counter()
+        deadline = start_wall + max_seconds if max_seconds else None
+        next_report = start_wall + report_interval if report_interval else None
+        last_report = (start_wall, 0, 0)  # (wall time, cycles, transactions) of the last report
+
+        for wr_en, wr_data, rd_en in stimulus:
+            await clk_edge
+            await settle
+
+            do_write = wr_en and not int(full_sig.value)
+            do_read = rd_en and not int(empty_sig.value)
+
+            if do_read:
+                # FWFT: rd_data already presents the head item before rd_en is asserted
+                read_value = int(rd_data_sig.value)
+                expected_value = expected_q.popleft()
+                record(OP_READ, read_value, expected_value)
+                check((cycles, read_value, expected_value))
+                reads += 1
+            if do_write:
+                wr_data_sig.value = wr_data
+                expected_q.append(wr_data)
+                record(OP_WRITE, wr_data)
+                writes += 1
+
+            # Only touch the enables through the GPI when they change
+            if do_write != wr_en_driven:
+                wr_en_sig.value = int(do_write)
+                wr_en_driven = do_write
+            if rd_en != rd_en_driven:
+                rd_en_sig.value = int(rd_en)
+                rd_en_driven = rd_en
+
+            cycles += 1
+            if max_transactions and writes + reads >= max_transactions:
+                break
+            if cycles >= next_check:
+                next_check += STREAM_CHECK_CYCLES
+                now = time.perf_counter()
+                if next_report is not None and now >= next_report:
+                    last_wall, last_cycles, last_transactions = last_report
+                    interval = now - last_wall
+                    dut._log.info(f"Stream progress: {writes + reads} transactions in {cycles} cycles, "
+                                  f"{now - start_wall:.0f} s ({(writes + reads - last_transactions) / interval:.0f} "
+                                  f"transactions/s, {(cycles - last_cycles) / interval:.0f} cycles/s)")
+                    last_report = (now, cycles, writes + reads)
+                    next_report = now + report_interval
+                if deadline is not None and now >= deadline:
+                    break
+
+        await clk_edge
+        wr_en_sig.value = 0
+        rd_en_sig.value = 0
+        checker.close()
+
+        return StreamResult(cycles=cycles, writes=writes, reads=reads, wall_time=time.perf_counter() - start_wall)
+
     async def print_fifo_status(self):
         """
         Prints the current status of the FIFO including full, empty, almost full, and almost empty flags.
@@ -183,15 +435,16 @@ class fifo_sync_base:
         self.dut._log.info(f"FIFO Status - Almost Empty: {self.dut.almost_empty.value}")
         self.dut._log.info(f"FIFO Status - Number of items left in the FIFO: {len(self.expected_data_q)}")
 
-    async def generate_random_data(self, count):
+    def generate_random_data(self, count, corner_fraction=None):
         """
-        Generates a list of random data values within the DATA_WIDTH range.
+        Generates a list of random data values within the DATA_WIDTH range, from the test's seeded stimulus.
         Args:
             count (int): The number of random data values to generate.
+            corner_fraction (float): Fraction of the values replaced by 0 or MAX_DATA_VALUE (the stimulus default if None).
         Returns:
             list: A list of random integers.
         """
-        return [random.randint(0, self.MAX_DATA_VALUE) for _ in range(count)]
+        return self.stimulus.data(count, corner_fraction).tolist()
 
     def print_expected_data(self):
         """
@@ -0,0 +1,88 @@
+import json
+import os
+
+# Views of the fifo_sync instances of a batch simulation (BATCH=1, see scripts/make/batch_sim.mk), so the
+# testbench classes and tests can drive every instance as if it was a single fifo_sync DUT.
+#
+# The batch top (generated by scripts/make/gen_batch_top.py) has one fifo_sync instance per parameter set,
+# fifo_sync_<N>, with its ports brought out as i<N>_<port> and a single clk shared by all of them. Its
+# config (BATCH_CONFIG, batch.json next to the generated top) lists the instances, their port prefixes
+# and resolved parameters. Through a view:
+# - Ports are the top-level ports of the instance (e.g. view.wr_en is dut.i0_wr_en), and clk is the shared clock.
+# - Parameters (e.g. view.DATA_WIDTH) are read from the config, so they don't depend on the simulator
+#     exposing the parameters of a sub-instance.
+# - Anything else (e.g. internal signals like fifo_count or wr_ptr_bin) is looked up in the instance.
+# - _name is the instance name and _log is a child logger of the top's, so log lines say which instance they're from.
+
+BATCH_CONFIG = os.getenv("BATCH_CONFIG", "")
+
+
+class _parameter:
+    """
+    Stand-in for a parameter handle (e.g. dut.DATA_WIDTH), with the value from the batch config.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+class fifo_sync_instance:
+
+    def __init__(self, dut, instance, shared):
+        """
+        Args:
+            dut: cocotb handle of the batch top.
+            instance (dict): Instance entry of the batch config (name, prefix, parameters, ports).
+            shared (list): Names of the ports shared by all the instances (e.g. clk).
+        """
+        self._dut = dut
+        self._name = instance["name"]
+        self._log = dut._log.getChild(instance["name"])
+        self._prefix = instance["prefix"]
+        self._ports = set(instance["ports"])
+        self._shared = set(shared)
+        self.parameters = dict(instance["parameters"])
+
+    def __getattr__(self, name):
+        # Only called for names that aren't set yet: handles are cached as attributes on first use
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self.parameters:
+            handle = _parameter(self.parameters[name])
+        elif name in self._shared:
+            handle = getattr(self._dut, name)
+        elif name in self._ports:
+            handle = getattr(self._dut, self._prefix + name)
+        else:
+            handle = getattr(getattr(self._dut, self._name), name)
+        self.__dict__[name] = handle
+        return handle
+
+    def __repr__(self):
+        return f"<fifo_sync_instance {self._name} of {self._dut._name}>"
+
+
+def read_batch_config(path=None):
+    """
+    Reads the batch config written by gen_batch_top.py.
+    Args:
+        path (str): Path of batch.json. Defaults to BATCH_CONFIG.
+    Returns:
+        dict: The batch config (module, top, shared, instances).
+    Raises:
+        RuntimeError: If there's no batch config (the simulation wasn't run with BATCH=1).
+    """
+    path = path or BATCH_CONFIG
+    if not path or not os.path.isfile(path):
+        raise RuntimeError("No batch config found (BATCH_CONFIG is not set): run the batch testbench with BATCH=1")
+    with open(path) as f:
+        return json.load(f)
+
+
+def fifo_sync_instances(dut, config=None):
+    """
+    Returns:
+        list: A view of every instance of the batch top, in parameter set order.
+    """
+    config = config if config is not None else read_batch_config()
+    return [fifo_sync_instance(dut, instance, config["shared"]) for instance in config["instances"]]
@@ -0,0 +1,159 @@
+from cocotb.triggers import RisingEdge, ReadOnly
+from cocotb.utils import get_sim_time
+import json
+import os
+import numpy as np
+from fifo_sync_stimulus import fifo_sync_stimulus
+
+# Checkpoints of the fifo_sync testbench, to resume a long run or to branch several random continuations
+# from a warmed-up FIFO, without re-simulating everything that led to that state.
+#
+# Verilator can save and restore its model (--savable and VerilatedSave/VerilatedRestore), but under cocotb
+# the model is owned by cocotb's simulator main and that isn't reachable from Python. The DUT state is
+# fast-forwarded to instead: all the state of a FIFO that's visible at its outputs is its read and write
+# pointers and the words between them, so restore_checkpoint resets the DUT, moves both pointers to the
+# checkpoint's read pointer with dummy writes and reads, and writes the saved words back. That takes at
+# most about 3*FIFO_DEPTH cycles, however long the run before the checkpoint was. The reference model is
+# rebuilt the same way, by its monitor, which sees the reset and the refill like any other traffic.
+#
+# Along with the DUT pointers, a checkpoint holds:
+# - The scoreboard queue (the expected data, which are also the words written back)
+# - The state of the test's seeded stimulus, and of any other NumPy generators given by the caller
+# - The bin counts and closure of a coverage collector, if one is given (see fifo_sync_coverage.py)
+# - Counters given by the caller (e.g. the cycles and transactions run so far)
+# The collector doesn't sample the fast-forward, so its dummy traffic is never counted as coverage.
+#
+# Checkpoints are taken between transactions, with the write and read enables low, and are plain JSON
+# (see save_checkpoint and load_checkpoint). The DUT parameters are stored too, and checked on restore.
+
+
+def _stimulus_state(stimulus):
+    return {
+        "test_name": stimulus.test_name,
+        "iteration": stimulus.iteration,
+        "master_seed": stimulus.master_seed,
+        "corner_fraction": stimulus.corner_fraction,
+        "rng": stimulus.rng.bit_generator.state,
+    }
+
+
+def _parameters(tb):
+    return {"DATA_WIDTH": tb.DATA_WIDTH, "ADDR_WIDTH": tb.ADDR_WIDTH,
+            "ALMOST_FULL_THRESHOLD": tb.ALMOST_FULL_THRESHOLD, "ALMOST_EMPTY_THRESHOLD": tb.ALMOST_EMPTY_THRESHOLD}
+
+
+async def save_checkpoint(tb, path=None, coverage=None, rngs=None, **counters):
+    """
+    Takes a checkpoint of the testbench. Must be called between transactions (enables low), and lets one
+    clock cycle go by, to sample the DUT pointers.
+    Args:
+        tb (fifo_sync_base): Testbench to checkpoint.
+        path (str): JSON file to write the checkpoint to (relative paths are relative to RESULTS_DIR), or None.
+        coverage (coverage_collector): Coverage collector whose state to save.
+        rngs (dict): Other NumPy generators whose state to save, by name.
+        counters: Values saved as is and returned by restore_checkpoint (e.g. cycles=1000).
+    Returns:
+        dict: The checkpoint.
+    """
+    dut = tb.dut
+    await ReadOnly()
+    checkpoint = {
+        "sim_time_ns": get_sim_time("ns"),
+        "parameters": _parameters(tb),
+        "rd_ptr_bin": int(dut.rd_ptr_bin.value),
+        "wr_ptr_bin": int(dut.wr_ptr_bin.value),
+        "expected": [int(data) for data in tb.expected_data_q],
+        "stimulus": _stimulus_state(tb.stimulus),
+        "rngs": {name: rng.bit_generator.state for name, rng in (rngs or {}).items()},
+        "coverage": coverage.state() if coverage is not None else None,
+        "counters": counters,
+    }
+    await RisingEdge(dut.clk)
+
+    fifo_count = (checkpoint["wr_ptr_bin"] - checkpoint["rd_ptr_bin"]) % (2 * tb.FIFO_DEPTH)
+    if fifo_count != len(checkpoint["expected"]):
+        raise RuntimeError(f"Can't checkpoint: the FIFO holds {fifo_count} words but the scoreboard expects "
+                           f"{len(checkpoint['expected'])} (is a transaction in progress?)")
+    if path is not None:
+        if not os.path.isabs(path):
+            path = os.path.join(os.getenv("RESULTS_DIR", "."), path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+        dut._log.info(f"CHECKPOINT at {checkpoint['sim_time_ns']} ns ({fifo_count} words) saved to {path}")
+    return checkpoint
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by save_checkpoint (relative paths are relative to RESULTS_DIR).
+    """
+    if not os.path.isabs(path) and not os.path.isfile(path):
+        path = os.path.join(os.getenv("RESULTS_DIR", "."), path)
+    with open(path) as f:
+        return json.load(f)
+
+
+async def restore_checkpoint(tb, checkpoint, coverage=None, rngs=None, stimulus=True, restore_coverage=True):
+    """
+    Fast-forwards the DUT to the state of a checkpoint and restores the testbench state.
+    Args:
+        tb (fifo_sync_base): Testbench to restore, with the same DUT parameters as the checkpoint.
+        checkpoint (dict): Checkpoint from save_checkpoint or load_checkpoint.
+        coverage (coverage_collector): Coverage collector of the DUT, paused during the fast-forward.
+        rngs (dict): NumPy generators to restore, by name (as given to save_checkpoint).
+        stimulus (bool): Restore the test's stimulus (False to keep the one set by the caller, e.g. a new branch's).
+        restore_coverage (bool): Restore the collector's counts saved with the checkpoint (False to keep adding up,
+            e.g. the coverage of several branches from the same checkpoint).
+    Returns:
+        dict: The counters saved with the checkpoint.
+    Raises:
+        ValueError: If the DUT parameters don't match the checkpoint's.
+        AssertionError: If the DUT didn't reach the checkpoint's state.
+    """
+    if checkpoint["parameters"] != _parameters(tb):
+        raise ValueError(f"Checkpoint parameters {checkpoint['parameters']} don't match the DUT's {_parameters(tb)}")
+    dut = tb.dut
+    rd_ptr_bin = checkpoint["rd_ptr_bin"]
+    words = checkpoint["expected"]
+    dut._log.info(f"RESTORING CHECKPOINT of {checkpoint['sim_time_ns']} ns: read pointer {rd_ptr_bin}, {len(words)} words")
+
+    if coverage is not None:
+        coverage.pause()
+    await tb.reset()
+    # Move both pointers to the checkpoint's read pointer, a FIFO's worth at a time
+    remaining = rd_ptr_bin
+    while remaining:
+        count = min(remaining, tb.FIFO_DEPTH)
+        written = await tb.run_schedule(np.ones(count, dtype=bool), np.zeros(count, dtype=np.uint64),
+                                        np.zeros(count, dtype=bool))
+        # Reads stop by themselves once the FIFO is empty
+        read = await tb.run_schedule(np.zeros(count + 2, dtype=bool), np.zeros(count + 2, dtype=np.uint64),
+                                     np.ones(count + 2, dtype=bool))
+        assert written.wr_done.sum() == count and read.rd_done.sum() == count, \
+            f"Fast-forward of {count} words wrote {int(written.wr_done.sum())} and read {int(read.rd_done.sum())}"
+        remaining -= count
+    # Write the saved words back (which also refills the scoreboard queue)
+    if words:
+        written = await tb.run_schedule(np.ones(len(words), dtype=bool), words, np.zeros(len(words), dtype=bool))
+        assert written.wr_done.sum() == len(words), f"Refill wrote {int(written.wr_done.sum())} of {len(words)} words"
+    # Let rd_data load the head word
+    await RisingEdge(dut.clk)
+    await ReadOnly()
+    state = (int(dut.rd_ptr_bin.value), int(dut.wr_ptr_bin.value), int(dut.fifo_count.value))
+    expected = (rd_ptr_bin, checkpoint["wr_ptr_bin"], len(words))
+    assert state == expected, f"Restored DUT state (rd_ptr_bin, wr_ptr_bin, fifo_count) is {state}, expected {expected}"
+    await RisingEdge(dut.clk)
+    if coverage is not None:
+        if restore_coverage and checkpoint["coverage"] is not None:
+            coverage.restore_state(checkpoint["coverage"])
+        coverage.resume()
+
+    if stimulus:
+        saved = checkpoint["stimulus"]
+        tb.stimulus = fifo_sync_stimulus(tb.MAX_DATA_VALUE, saved["test_name"], saved["iteration"],
+                                         saved["master_seed"], saved["corner_fraction"])
+        tb.stimulus.rng.bit_generator.state = saved["rng"]
+    for name, rng in (rngs or {}).items():
+        rng.bit_generator.state = checkpoint["rngs"][name]
+    return dict(checkpoint["counters"])
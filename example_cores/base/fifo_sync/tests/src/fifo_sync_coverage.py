@@ -1,75 +1,316 @@
 import cocotb
 from cocotb.triggers import RisingEdge, ReadOnly
-from cocotb_coverage.coverage import *
+from cocotb_coverage.coverage import coverage_db, CoverPoint, CoverCross
+from cocotb.utils import get_sim_time
 import atexit
+import importlib.metadata
+import json
 import os
+import numpy as np
 
-# FIFO_DEPTH = 2**ADDR_WIDTH, and should be changed according to the DUT parameters for correct coverage.
-FIFO_DEPTH = 16
-
-# Coverage points for full, empty, almost full, and almost empty outputs
-@CoverPoint("fifo_sync.full",
-            xf=lambda dut: int(dut.full.value),
-            bins=[0, 1],
-            at_least=1)
-@CoverPoint("fifo_sync.empty",
-            xf=lambda dut: int(dut.empty.value),
-            bins=[0, 1],
-            at_least=1)
-@CoverPoint("fifo_sync.almost_full",
-            xf=lambda dut: int(dut.almost_full.value),
-            bins=[0, 1],
-            at_least=1)
-@CoverPoint("fifo_sync.almost_empty",
-            xf=lambda dut: int(dut.almost_empty.value),
-            bins=[0, 1],
-            at_least=1)
-def sample_fifo_status_outputs(dut):
-    pass
-
-# Coverage points for rd_en and wr_en signals
-@CoverPoint("fifo_sync.rd_en",
-            xf=lambda dut: int(dut.rd_en.value),
-            bins=[0, 1],
-            at_least=1)
-@CoverPoint("fifo_sync.wr_en",
-            xf=lambda dut: int(dut.wr_en.value),
-            bins=[0, 1],
-            at_least=1)
-def sample_read_write_enable(dut):
-    pass
-
-# Coverage points for read and write pointers
-@CoverPoint("fifo_sync.rd_ptr_bin",
-            xf=lambda dut: int(dut.rd_ptr_bin.value),
-            bins=range(0, FIFO_DEPTH),
-            at_least=1)
-@CoverPoint("fifo_sync.wr_ptr_bin",
-            xf=lambda dut: int(dut.wr_ptr_bin.value),
-            bins=range(0, FIFO_DEPTH),
-            at_least=1)
-@CoverPoint("fifo_sync.rd_ptr_bin_nxt",
-            xf=lambda dut: int(dut.rd_ptr_bin_nxt.value),
-            bins=range(0, FIFO_DEPTH),
-            at_least=1)
-def sample_read_write_pointers(dut):
-    pass
-
-async def _coverage_monitor(dut):
-    await RisingEdge(dut.clk)
+# Coverage of the fifo_sync outputs, enables, pointers and occupancy.
+#
+# Instead of evaluating cocotb_coverage sampling functions every clock cycle, the monitor
+# appends raw signal samples to preallocated arrays, which are binned in bulk with NumPy
+# at checkpoints (every COVERAGE_CHECKPOINT_CYCLES samples, and before the report is written).
+# The bin counts are added to regular cocotb_coverage CoverPoints/CoverCrosses (see _set_bin_hits),
+# so the coverage_db XML/YAML export in write_report is unchanged.
+#
+# Bins are sized from the DUT parameters (FIFO depth, almost full/empty thresholds), and cover items
+# are named after the DUT (e.g. fifo_sync.full), so every instance of a batch simulation (see
+# fifo_sync_batch.py) has its own collector and cover items.
+#
+# The collector also tracks coverage closure: at each checkpoint, bins that reached their
+# at_least count are attributed to the current context (test, seed, iteration, set with
+# set_context), so closure-driven tests can stop once open_bins() is empty. The closing context
+# of every bin is written to fifo_sync_coverage_closure.json with the report.
+#
+# The bin counts and closure can be saved and restored with state() and restore_state(), e.g. in the
+# testbench checkpoints (see fifo_sync_checkpoint.py), and sampling can be paused while the DUT is
+# fast-forwarded to a checkpoint, so that traffic isn't counted as coverage.
+
+CHECKPOINT_CYCLES = int(os.getenv("COVERAGE_CHECKPOINT_CYCLES", "65536"))
+
+# cocotb_coverage only counts hits one sample at a time, through the sampling functions of its cover items,
+# so bulk counts can't be added through its public API. _set_bin_hits is the only place that writes its
+# private state instead, the same way the sampling functions do. It's written against this version of
+# cocotb_coverage (pinned in the top-level README), and any other version is refused on import rather than
+# risking silently wrong coverage.
+COCOTB_COVERAGE_VERSION = "1.2.0"
+if importlib.metadata.version("cocotb-coverage") != COCOTB_COVERAGE_VERSION:
+    raise ImportError(f"fifo_sync_coverage needs cocotb_coverage {COCOTB_COVERAGE_VERSION}, found "
+                      f"{importlib.metadata.version('cocotb-coverage')} (pip install cocotb_coverage=={COCOTB_COVERAGE_VERSION})")
+
+
+def _set_bin_hits(name, hits):
+    """
+    Sets the hit counts of bins of a cover item, and updates the coverage of its parents.
+    Args:
+        name (str): Name of the CoverPoint or CoverCross in coverage_db.
+        hits (dict): New hit count by bin (bins the item doesn't have are ignored).
+    """
+    item = coverage_db[name]
+    coverage_before = item.coverage
+    for bin_key, count in hits.items():
+        if bin_key in item._hits:
+            item._hits[bin_key] = count
+    item._parent._update_coverage(item.coverage - coverage_before)
+
+# 1-bit signals, packed into one byte per sample (bit index = position in this tuple)
+FLAG_SIGNALS = ("full", "empty", "almost_full", "almost_empty", "rd_en", "wr_en")
+# Pointer signals (ADDR_WIDTH+1 bits, including the wrap bit)
+POINTER_SIGNALS = ("rd_ptr_bin", "wr_ptr_bin", "rd_ptr_bin_nxt")
+
+
+def _bin_to_json(bin_key):
+    return list(bin_key) if isinstance(bin_key, tuple) else bin_key
+
+
+def _bin_from_json(bin_key):
+    return tuple(bin_key) if isinstance(bin_key, list) else bin_key
+
+
+class coverage_collector:
+
+    def __init__(self, dut, checkpoint_cycles=CHECKPOINT_CYCLES):
+        self.dut = dut
+        self.name = dut._name  # Prefix of the cover item names
+
+        # Get parameters from the DUT
+        self.ADDR_WIDTH = int(self.dut.ADDR_WIDTH.value)
+        self.ALMOST_FULL_THRESHOLD = int(self.dut.ALMOST_FULL_THRESHOLD.value)
+        self.ALMOST_EMPTY_THRESHOLD = int(self.dut.ALMOST_EMPTY_THRESHOLD.value)
+        self.FIFO_DEPTH = 2**self.ADDR_WIDTH
+        self.POINTER_RANGE = 2 * self.FIFO_DEPTH  # Pointers carry an extra wrap bit
+
+        # Preallocated sample arrays
+        self.checkpoint_cycles = checkpoint_cycles
+        self._flags = np.zeros(checkpoint_cycles, dtype=np.uint8)
+        self._pointers = {name: np.zeros(checkpoint_cycles, dtype=np.uint32) for name in POINTER_SIGNALS}
+        self._fifo_count = np.zeros(checkpoint_cycles, dtype=np.uint32)
+        self._samples = 0  # Number of samples waiting to be binned
+        self.total_samples = 0
+        self.paused = False  # Cycles aren't sampled while paused (see pause)
+
+        # Coverage closure tracking
+        self.context = {}  # Attributed to the bins closed at the next checkpoint
+        self.closed_bins = {}  # (item name, bin) -> context and sim time when the bin reached at_least
+
+        self._define_cover_items()
+
+    def _define_cover_items(self):
+        """
+        Creates the cover items in coverage_db (only once per simulation, as cocotb_coverage
+        returns the existing item when a name is reused).
+        """
+        for name in FLAG_SIGNALS:
+            CoverPoint(f"{self.name}.{name}", bins=[0, 1], at_least=1)
+        for name in POINTER_SIGNALS:
+            CoverPoint(f"{self.name}.{name}", bins=list(range(self.POINTER_RANGE)), at_least=1)
+        CoverPoint(f"{self.name}.fifo_count", bins=list(range(self.FIFO_DEPTH + 1)), at_least=1)
+
+        # Enables crossed with full/empty (the testbench never writes while full, but reads while empty
+        # are driven by test_read_while_empty)
+        CoverCross(f"{self.name}.wr_en_x_rd_en_x_full",
+                   items=[f"{self.name}.wr_en", f"{self.name}.rd_en", f"{self.name}.full"],
+                   ign_bins=[(1, None, 1)], at_least=1)
+        CoverCross(f"{self.name}.wr_en_x_rd_en_x_empty",
+                   items=[f"{self.name}.wr_en", f"{self.name}.rd_en", f"{self.name}.empty"],
+                   at_least=1)
+
+        # Occupancy crossed with the almost flags (ignoring flag values that are illegal for a count)
+        CoverCross(f"{self.name}.fifo_count_x_almost_full",
+                   items=[f"{self.name}.fifo_count", f"{self.name}.almost_full"],
+                   ign_bins=[(count, 1 - self._almost_full(count)) for count in range(self.FIFO_DEPTH + 1)],
+                   at_least=1)
+        CoverCross(f"{self.name}.fifo_count_x_almost_empty",
+                   items=[f"{self.name}.fifo_count", f"{self.name}.almost_empty"],
+                   ign_bins=[(count, 1 - self._almost_empty(count)) for count in range(self.FIFO_DEPTH + 1)],
+                   at_least=1)
+
+        self.item_names = [f"{self.name}.{name}" for name in FLAG_SIGNALS + POINTER_SIGNALS + (
+            "fifo_count", "wr_en_x_rd_en_x_full", "wr_en_x_rd_en_x_empty",
+            "fifo_count_x_almost_full", "fifo_count_x_almost_empty")]
+
+    def _almost_full(self, count):
+        return int(count >= self.FIFO_DEPTH - self.ALMOST_FULL_THRESHOLD)
+
+    def _almost_empty(self, count):
+        return int(count <= self.ALMOST_EMPTY_THRESHOLD)
+
+    def sample(self):
+        """
+        Stores one sample of the DUT signals. Must be called in the ReadOnly phase.
+        """
+        dut = self.dut
+        index = self._samples
+        self._flags[index] = (int(dut.full.value)
+                              | int(dut.empty.value) << 1
+                              | int(dut.almost_full.value) << 2
+                              | int(dut.almost_empty.value) << 3
+                              | int(dut.rd_en.value) << 4
+                              | int(dut.wr_en.value) << 5)
+        self._pointers["rd_ptr_bin"][index] = int(dut.rd_ptr_bin.value)
+        self._pointers["wr_ptr_bin"][index] = int(dut.wr_ptr_bin.value)
+        self._pointers["rd_ptr_bin_nxt"][index] = int(dut.rd_ptr_bin_nxt.value)
+        self._fifo_count[index] = int(dut.fifo_count.value)
+        self._samples = index + 1
+        if self._samples == self.checkpoint_cycles:
+            self.checkpoint()
+
+    @staticmethod
+    def _add_hits(name, bins, counts):
+        """
+        Adds bulk bin counts to a cover item.
+        """
+        current = coverage_db[name].detailed_coverage
+        _set_bin_hits(name, {bin_key: current[bin_key] + count for bin_key, count in zip(bins, counts.tolist())
+                             if count and bin_key in current})
+
+    def checkpoint(self):
+        """
+        Bins all pending samples into the cover items and clears the sample arrays.
+        """
+        samples = self._samples
+        if samples == 0:
+            return
+        flags = self._flags[:samples]
+        bits = {name: (flags >> bit) & 1 for bit, name in enumerate(FLAG_SIGNALS)}
+        fifo_count = self._fifo_count[:samples]
+
+        for name in FLAG_SIGNALS:
+            self._add_hits(f"{self.name}.{name}", [0, 1], np.bincount(bits[name], minlength=2))
+        for name in POINTER_SIGNALS:
+            self._add_hits(f"{self.name}.{name}", range(self.POINTER_RANGE),
+                           np.bincount(self._pointers[name][:samples], minlength=self.POINTER_RANGE))
+        self._add_hits(f"{self.name}.fifo_count", range(self.FIFO_DEPTH + 1),
+                       np.bincount(fifo_count, minlength=self.FIFO_DEPTH + 1))
+
+        # Crosses are binned on a combined index, then mapped back to their bin tuples
+        enables = bits["wr_en"] * 4 + bits["rd_en"] * 2
+        enable_bins = [(wr_en, rd_en, flag) for wr_en in (0, 1) for rd_en in (0, 1) for flag in (0, 1)]
+        self._add_hits(f"{self.name}.wr_en_x_rd_en_x_full", enable_bins,
+                       np.bincount(enables + bits["full"], minlength=8))
+        self._add_hits(f"{self.name}.wr_en_x_rd_en_x_empty", enable_bins,
+                       np.bincount(enables + bits["empty"], minlength=8))
+
+        count_bins = [(count, flag) for count in range(self.FIFO_DEPTH + 1) for flag in (0, 1)]
+        self._add_hits(f"{self.name}.fifo_count_x_almost_full", count_bins,
+                       np.bincount(fifo_count.astype(np.int64) * 2 + bits["almost_full"], minlength=len(count_bins)))
+        self._add_hits(f"{self.name}.fifo_count_x_almost_empty", count_bins,
+                       np.bincount(fifo_count.astype(np.int64) * 2 + bits["almost_empty"], minlength=len(count_bins)))
+
+        self.total_samples += samples
+        self._samples = 0
+        self._update_closure()
+
+    def pause(self):
+        """
+        Stops sampling until resume() (e.g. while the DUT is fast-forwarded to a checkpoint).
+        """
+        self.paused = True
+
+    def resume(self):
+        """
+        Samples every cycle again after pause().
+        """
+        self.paused = False
+
+    def state(self):
+        """
+        Returns the bin counts of the collector's cover items, its closure and its sample count, in a
+        JSON-serializable form (bins as lists), e.g. for a checkpoint. Pending samples are binned first.
+        """
+        self.checkpoint()
+        return {
+            "hits": {name: [[_bin_to_json(bin_key), hits] for bin_key, hits in coverage_db[name].detailed_coverage.items()]
+                     for name in self.item_names},
+            "closed_bins": [[name, _bin_to_json(bin_key), context] for (name, bin_key), context in self.closed_bins.items()],
+            "total_samples": self.total_samples,
+        }
+
+    def restore_state(self, state):
+        """
+        Restores the bin counts, closure and sample count returned by state(), dropping any pending samples.
+        """
+        self._samples = 0
+        for name, bins in state["hits"].items():
+            _set_bin_hits(name, {_bin_from_json(bin_key): hits for bin_key, hits in bins})
+        self.closed_bins = {(name, _bin_from_json(bin_key)): context for name, bin_key, context in state["closed_bins"]}
+        self.total_samples = state["total_samples"]
+
+    def set_context(self, **context):
+        """
+        Sets the context (e.g. test, seed, iteration) that bins closed at the next checkpoint are attributed to.
+        """
+        self.context = context
+
+    def _update_closure(self):
+        """
+        Records the bins that reached their at_least count since the last checkpoint.
+        """
+        try:
+            sim_time_ns = get_sim_time("ns")
+        except Exception:  # Final checkpoint after the simulator has finished
+            sim_time_ns = None
+        for name in self.item_names:
+            item = coverage_db[name]
+            for bin_key, hits in item.detailed_coverage.items():
+                if hits >= item.at_least and (name, bin_key) not in self.closed_bins:
+                    self.closed_bins[(name, bin_key)] = dict(self.context, sim_time_ns=sim_time_ns)
+
+    def open_bins(self):
+        """
+        Returns the (item name, bin) pairs that haven't reached their at_least count yet
+        (as of the last checkpoint).
+        """
+        return [(name, bin_key) for name in self.item_names for bin_key in coverage_db[name].detailed_coverage
+                if (name, bin_key) not in self.closed_bins]
+
+    def closure_report(self):
+        """
+        Returns the closing context of every bin (None for bins still open), by item name.
+        """
+        return {name: {str(bin_key): self.closed_bins.get((name, bin_key)) for bin_key in coverage_db[name].detailed_coverage}
+                for name in self.item_names}
+
+    def write_closure_report(self, path):
+        """
+        Writes the closing context of every bin (null for bins still open) to a JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.closure_report(), f, indent=2)
+
+
+# One collector per DUT (per instance in a batch simulation) and simulation, shared by the monitors
+# started in each test (pending samples survive a test's monitor being killed at the end of the test)
+_collectors = {}
+
+
+async def _coverage_monitor(collector):
+    clk_edge = RisingEdge(collector.dut.clk)
+    read_only = ReadOnly()
+    await clk_edge
     while True:
-        await RisingEdge(dut.clk)
-        await ReadOnly()
-        sample_fifo_status_outputs(dut)
-        sample_read_write_enable(dut)
-        sample_read_write_pointers(dut)
+        await clk_edge
+        await read_only
+        if not collector.paused:
+            collector.sample()
 
 def start_coverage_monitor(dut):
-    cocotb.start_soon(_coverage_monitor(dut))
+    collector = _collectors.get(dut._name)
+    if collector is None:
+        collector = _collectors[dut._name] = coverage_collector(dut)
+    cocotb.start_soon(_coverage_monitor(collector))
+    return collector
 
 def write_report():
     results_dir = os.getenv("RESULTS_DIR", ".") # Default to current dir if not set
 
+    # Bin any samples still waiting in the collectors
+    for collector in _collectors.values():
+        collector.checkpoint()
+
     original_cwd = os.getcwd() # Store the original working directory
 
     try:
@@ -82,6 +323,12 @@ def write_report():
         # These functions will write to the new current working directory.
         coverage_db.export_to_xml("fifo_sync_coverage.xml")
         coverage_db.export_to_yaml("fifo_sync_coverage.yaml")
+        if _collectors:
+            closure = {}
+            for collector in _collectors.values():
+                closure.update(collector.closure_report())
+            with open("fifo_sync_coverage_closure.json", "w") as f:
+                json.dump(closure, f, indent=2)
 
     finally:
         # Change back to the original working directory to avoid affecting other parts
@@ -0,0 +1,161 @@
+import cocotb
+from cocotb.triggers import RisingEdge, ReadOnly
+from cocotb.utils import get_sim_time
+
+# Cycle-accurate reference model of fifo_sync, and a monitor comparing it against the DUT.
+#
+# The model keeps the FIFO memory in a fixed-size ring buffer and mirrors the RTL pointer
+# arithmetic (ADDR_WIDTH+1 bit binary pointers with a wrap bit). rd_data is loaded from
+# mem[rd_ptr_bin_nxt] on every clock edge, after that edge's write lands (the RTL forwards a
+# word written to the address being read), so it holds the oldest word whenever the FIFO isn't
+# empty. Memory locations that were never written are None (undefined), and rd_data is not
+# checked while it holds an undefined value.
+#
+# The monitor steps the model once per clock cycle and checks every output (and the pointers)
+# in constant time and memory, so it can run alongside arbitrarily long tests.
+
+
+class fifo_sync_model:
+
+    def __init__(self, data_width, addr_width, almost_full_threshold, almost_empty_threshold):
+        self.DATA_WIDTH = data_width
+        self.ADDR_WIDTH = addr_width
+        self.FIFO_DEPTH = 2**addr_width
+        self.DATA_MASK = (1 << data_width) - 1
+        self.ADDR_MASK = self.FIFO_DEPTH - 1
+        self.PTR_MASK = (1 << (addr_width + 1)) - 1
+        # The RTL truncates the thresholds to ADDR_WIDTH+1 bits
+        self.ALMOST_FULL_LEVEL = (self.FIFO_DEPTH - (almost_full_threshold & self.PTR_MASK)) & self.PTR_MASK
+        self.ALMOST_EMPTY_LEVEL = almost_empty_threshold & self.PTR_MASK
+
+        self.mem = [None] * self.FIFO_DEPTH
+        self.wr_ptr_bin = 0
+        self.rd_ptr_bin = 0
+        self.rd_data = None
+
+    @classmethod
+    def from_dut(cls, dut):
+        """
+        Creates a model with the parameters of a fifo_sync DUT.
+        """
+        return cls(int(dut.DATA_WIDTH.value), int(dut.ADDR_WIDTH.value),
+                   int(dut.ALMOST_FULL_THRESHOLD.value), int(dut.ALMOST_EMPTY_THRESHOLD.value))
+
+    @property
+    def fifo_count(self):
+        return (self.wr_ptr_bin - self.rd_ptr_bin) & self.PTR_MASK
+
+    @property
+    def empty(self):
+        return int(self.wr_ptr_bin == self.rd_ptr_bin)
+
+    @property
+    def full(self):
+        return int(self.fifo_count == self.FIFO_DEPTH)
+
+    @property
+    def almost_full(self):
+        return int(self.fifo_count >= self.ALMOST_FULL_LEVEL)
+
+    @property
+    def almost_empty(self):
+        return int(self.fifo_count <= self.ALMOST_EMPTY_LEVEL)
+
+    def rd_ptr_bin_nxt(self, rd_en):
+        """
+        Combinational next read pointer for the given rd_en.
+        """
+        return (self.rd_ptr_bin + (1 if rd_en and not self.empty else 0)) & self.PTR_MASK
+
+    def step(self, resetn, wr_en, wr_data, rd_en):
+        """
+        Advances the model by one rising clock edge, with the inputs sampled just before the edge.
+        Like the RTL, writes are not gated by full (the testbench must not write while full).
+        """
+        rd_ptr_bin_nxt = self.rd_ptr_bin_nxt(rd_en)
+        if wr_en:
+            self.mem[self.wr_ptr_bin & self.ADDR_MASK] = wr_data & self.DATA_MASK
+        self.rd_data = self.mem[rd_ptr_bin_nxt & self.ADDR_MASK]  # New data on a same-cycle write
+        if not resetn:
+            self.wr_ptr_bin = 0
+            self.rd_ptr_bin = 0
+        else:
+            if wr_en:
+                self.wr_ptr_bin = (self.wr_ptr_bin + 1) & self.PTR_MASK
+            self.rd_ptr_bin = rd_ptr_bin_nxt
+
+
+class fifo_sync_monitor:
+
+    # Outputs compared every cycle (all are plain integers in the model)
+    CHECKED_SIGNALS = ("full", "empty", "almost_full", "almost_empty", "fifo_count", "wr_ptr_bin", "rd_ptr_bin")
+
+    def __init__(self, dut, model=None, recorder=None, waves=None):
+        self.dut = dut
+        self.model = model if model is not None else fifo_sync_model.from_dut(dut)
+        self.recorder = recorder  # Optional transaction_recorder dumped on a mismatch
+        self.waves = waves  # Optional waveform_capture triggered on a mismatch
+        self.synced = False  # The model is only valid once a reset has been observed
+        self.cycles = 0  # Number of cycles checked
+        self._task = None
+
+    def start(self):
+        """
+        Starts the monitor coroutine. The checks begin after the first observed reset.
+        """
+        if self._task is None:
+            self._task = cocotb.start_soon(self._run())
+        return self._task
+
+    def _mismatch(self, signal, expected, actual):
+        message = (f"Model mismatch on {signal} at {get_sim_time('ns')} ns "
+                   f"(cycle {self.cycles} after reset): expected=0x{expected:X}, actual=0x{actual:X}")
+        if self.recorder is not None:
+            self.recorder.dump()
+        if self.waves is not None:
+            self.waves.trigger(message)
+        raise AssertionError(message)
+
+    async def _run(self):
+        dut = self.dut
+        model = self.model
+        checked = [(name, getattr(dut, name)) for name in self.CHECKED_SIGNALS]
+        resetn_sig, wr_en_sig, wr_data_sig, rd_en_sig = dut.resetn, dut.wr_en, dut.wr_data, dut.rd_en
+        rd_data_sig, rd_ptr_bin_nxt_sig = dut.rd_data, dut.rd_ptr_bin_nxt
+        clk_edge = RisingEdge(dut.clk)
+        read_only = ReadOnly()
+
+        while True:
+            await clk_edge
+            await read_only
+
+            # Outputs after this edge
+            if self.synced:
+                for name, handle in checked:
+                    actual = int(handle.value)
+                    expected = getattr(model, name)
+                    if actual != expected:
+                        self._mismatch(name, expected, actual)
+                if model.rd_data is not None:
+                    actual = int(rd_data_sig.value)
+                    if actual != model.rd_data:
+                        self._mismatch("rd_data", model.rd_data, actual)
+                self.cycles += 1
+
+            # Inputs sampled by the next edge
+            if not resetn_sig.value.is_resolvable:
+                continue
+            resetn = int(resetn_sig.value)
+            if not self.synced and resetn:
+                continue
+            wr_en = int(wr_en_sig.value)
+            rd_en = int(rd_en_sig.value)
+            if self.synced:
+                actual = int(rd_ptr_bin_nxt_sig.value)
+                expected = model.rd_ptr_bin_nxt(rd_en)
+                if actual != expected:
+                    self._mismatch("rd_ptr_bin_nxt", expected, actual)
+            model.step(resetn, wr_en, int(wr_data_sig.value) if wr_en else 0, rd_en)
+            if not resetn:
+                self.synced = True
+                self.cycles = 0
@@ -0,0 +1,126 @@
+import cocotb
+import os
+import zlib
+import numpy as np
+
+# Seeded, vectorized random stimulus for the fifo_sync testbench.
+#
+# Every test (and every iteration of the random tests) draws from its own NumPy generator, seeded
+# with a SeedSequence derived from the master seed (cocotb's RANDOM_SEED) and the test name and
+# iteration number. The stimulus of an iteration doesn't depend on what ran before it, so a
+# failing iteration can be replayed on its own with the seed and iteration logged on failure:
+#     RANDOM_SEED=<seed> TESTCASE=<test> STIMULUS_ITERATION=<iteration> make tests ...
+#
+# Data, burst lengths and enable patterns are generated in bulk as arrays, with optional corner
+# values (0 and MAX_DATA_VALUE) mixed into the data, and either sparse (independent per cycle)
+# or bursty (runs of enabled cycles) enables.
+
+# Only run this iteration (1-based) of the random tests, to replay it
+REPLAY_ITERATION = int(os.getenv("STIMULUS_ITERATION", "0"))
+
+
+class fifo_sync_stimulus:
+
+    def __init__(self, max_data_value, test_name="", iteration=0, master_seed=None, corner_fraction=0.0):
+        """
+        Args:
+            max_data_value (int): Largest data word (2**DATA_WIDTH - 1).
+            test_name (str): Name of the test the stimulus is for (part of the seed).
+            iteration (int): Iteration of the test (1-based, 0 outside of iterations, part of the seed).
+            master_seed (int): Master seed, cocotb's RANDOM_SEED by default.
+            corner_fraction (float): Default fraction of data words replaced by 0 or max_data_value.
+        """
+        self.max_data_value = max_data_value
+        self.test_name = test_name
+        self.iteration = iteration
+        self.master_seed = int(master_seed if master_seed is not None else cocotb.RANDOM_SEED)
+        self.corner_fraction = corner_fraction
+        self.seed_sequence = np.random.SeedSequence(self.master_seed, spawn_key=(zlib.crc32(test_name.encode()), iteration))
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+    def for_iteration(self, iteration):
+        """
+        Returns:
+            fifo_sync_stimulus: Stimulus of another iteration of the same test and master seed.
+        """
+        return fifo_sync_stimulus(self.max_data_value, self.test_name, iteration, self.master_seed, self.corner_fraction)
+
+    def replay_hint(self):
+        """
+        Returns:
+            str: How to rerun this stimulus on its own.
+        """
+        hint = f"RANDOM_SEED={self.master_seed}"
+        if self.test_name:
+            hint += f" TESTCASE={self.test_name}"
+        if self.iteration:
+            hint += f" STIMULUS_ITERATION={self.iteration}"
+        return hint
+
+    def data(self, count, corner_fraction=None):
+        """
+        Generates `count` random data words.
+        Args:
+            count (int): Number of words.
+            corner_fraction (float): Fraction of the words replaced by 0 or max_data_value (the default if None).
+        Returns:
+            numpy.ndarray: uint64 words (object array of ints for data wider than 64 bits).
+        """
+        corner_fraction = self.corner_fraction if corner_fraction is None else corner_fraction
+        if self.max_data_value < 2**64:
+            data = self.rng.integers(0, self.max_data_value, size=count, endpoint=True, dtype=np.uint64)
+        else:
+            nbytes = (self.max_data_value.bit_length() + 7) // 8
+            raw = self.rng.bytes(nbytes * count)
+            data = np.array([int.from_bytes(raw[i * nbytes:(i + 1) * nbytes], "little") & self.max_data_value
+                             for i in range(count)], dtype=object)
+        if corner_fraction:
+            corners = self.rng.random(count) < corner_fraction
+            corner_values = np.array([0, self.max_data_value], dtype=data.dtype)
+            data[corners] = corner_values[self.rng.integers(0, 2, size=int(corners.sum()))]
+        return data
+
+    def word(self):
+        """
+        Returns:
+            int: A single random data word.
+        """
+        return int(self.data(1)[0])
+
+    def lengths(self, low, high, size=None):
+        """
+        Generates random burst lengths between `low` and `high` (inclusive).
+        Returns:
+            int or numpy.ndarray: A single length, or an array of `size` lengths.
+        """
+        lengths = self.rng.integers(low, high, size=size, endpoint=True)
+        return int(lengths) if size is None else lengths
+
+    def enables(self, cycles, density=0.5, burst_length=1.0):
+        """
+        Generates a per-cycle enable pattern.
+        Args:
+            cycles (int): Length of the pattern in clock cycles.
+            density (float): Fraction of enabled cycles.
+            burst_length (float): Mean length of the runs of enabled cycles. 1 gives sparse enables, drawn
+                independently every cycle; longer runs give bursty enables, with geometrically distributed
+                on and off runs (off runs are at least 1 cycle long on average, which caps the density).
+        Returns:
+            numpy.ndarray: Boolean mask of length `cycles`.
+        """
+        if density <= 0 or density >= 1 or burst_length <= 1:
+            return self.rng.random(cycles) < density
+        mean_off = max(1.0, burst_length * (1 - density) / density)
+        pairs = max(1, int(np.ceil(cycles / (burst_length + mean_off))))
+        while True:
+            on = self.rng.geometric(1 / burst_length, size=pairs)
+            off = self.rng.geometric(1 / mean_off, size=pairs)
+            if on.sum() + off.sum() >= cycles:
+                break
+            pairs *= 2
+        # Alternate on and off runs, starting in either with the pattern's density
+        values = np.tile([True, False], pairs)
+        if self.rng.random() >= density:
+            values = ~values
+            on, off = off, on
+        return np.repeat(values, np.column_stack((on, off)).ravel())[:cycles]
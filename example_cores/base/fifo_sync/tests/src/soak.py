@@ -0,0 +1,162 @@
+import cocotb
+from cocotb.utils import get_sim_time
+import itertools
+import json
+import os
+import resource
+import time
+import numpy as np
+from fifo_sync_base import fifo_sync_base, StreamResult
+from fifo_sync_checkpoint import save_checkpoint, load_checkpoint, restore_checkpoint
+from transaction_recorder import dump_transactions_on_failure
+from testbench_profiler import profile_test
+
+# Constant-memory soak test for the fifo_sync testbench: random traffic streams through a generator
+# pipeline (stimulus producer -> driver and monitor -> checker, see fifo_sync_base.run_stream) with
+# nothing stored per transaction, so the run can go on for tens of millions of transactions. The
+# first mismatched read fails the test in the cycle it happens.
+# Run with TESTBENCH=soak (see scripts/make/cocotb.mk). The budget is set with environment variables:
+# - SOAK_TRANSACTIONS: Accepted writes and reads to run (default 1000000, 0 for no limit)
+# - SOAK_SECONDS: Wall-clock seconds to run (default 0, no limit)
+# - SOAK_REPORT_INTERVAL: Wall-clock seconds between throughput reports (default 10)
+# - SOAK_SEED: Seed of the stimulus (default 1)
+# Results are logged and written to $RESULTS_DIR/soak.json.
+#
+# Checkpoints (see fifo_sync_checkpoint.py), so a failure deep into a soak can be replayed without re-running
+# everything before it:
+# - SOAK_CHECKPOINT_CYCLES: Cycles of traffic between checkpoints (rounded up to whole stimulus blocks, default 0
+#     for none). The soak then runs in segments of that many cycles, and saves a checkpoint after every one to
+#     $RESULTS_DIR/checkpoints/soak_<cycles>.json. A failure logs how to resume from the last one.
+# - SOAK_CHECKPOINT_KEEP: Number of checkpoints kept (default 4, the older ones are deleted)
+# - CHECKPOINT_RESTORE: Checkpoint to resume from. The traffic after it is the same as in the run that saved it
+#     (the segment length comes from the checkpoint), and the budget counts the transactions before it.
+
+CLK_PERIOD = 4  # ns
+TRANSACTIONS = int(os.getenv("SOAK_TRANSACTIONS", "1000000"))
+SECONDS = float(os.getenv("SOAK_SECONDS", "0"))
+REPORT_INTERVAL = float(os.getenv("SOAK_REPORT_INTERVAL", "10"))
+SEED = int(os.getenv("SOAK_SEED", "1"))
+BLOCK_CYCLES = 4096  # Cycles of stimulus generated at a time (the write/read rates change every block)
+CHECKPOINT_CYCLES = -(-int(os.getenv("SOAK_CHECKPOINT_CYCLES", "0")) // BLOCK_CYCLES) * BLOCK_CYCLES
+CHECKPOINT_KEEP = int(os.getenv("SOAK_CHECKPOINT_KEEP", "4"))
+CHECKPOINT_RESTORE = os.getenv("CHECKPOINT_RESTORE", "")
+
+
+def random_stimulus(rng, max_data_value):
+    """
+    Endless random per-cycle stimulus, generated in blocks of BLOCK_CYCLES cycles. Each block draws its own
+    write and read rates, so the FIFO drifts between full, empty and everything in between.
+    Yields:
+        tuple: (wr_en, wr_data, rd_en) for one cycle.
+    """
+    while True:
+        write_rate, read_rate = rng.random(2)
+        wr_en = (rng.random(BLOCK_CYCLES) < write_rate).tolist()
+        wr_data = rng.integers(0, max_data_value, size=BLOCK_CYCLES, endpoint=True, dtype=np.uint64).tolist()
+        rd_en = (rng.random(BLOCK_CYCLES) < read_rate).tolist()
+        yield from zip(wr_en, wr_data, rd_en)
+
+
+def record_result(dut, result, **workload):
+    """
+    Logs a soak result and writes it to $RESULTS_DIR/soak.json.
+    Args:
+        result (StreamResult): Totals of the run.
+        workload: Workload parameters stored with the result (e.g. seed=1).
+    """
+    transactions = result.writes + result.reads
+    wall_time = result.wall_time
+    transactions_per_sec = transactions / wall_time if wall_time > 0 else float("inf")
+    cycles_per_sec = result.cycles / wall_time if wall_time > 0 else float("inf")
+    # Peak resident set size of the simulator process so far (kB on Linux)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    dut._log.info(f"SOAK: {transactions} transactions ({result.writes} writes, {result.reads} reads) in "
+                  f"{result.cycles} cycles, {wall_time:.3f} s wall ({transactions_per_sec:.0f} transactions/s, "
+                  f"{cycles_per_sec:.0f} cycles/s, peak RSS {peak_rss_kb / 1024:.1f} MiB)")
+
+    results_dir = os.getenv("RESULTS_DIR", ".")
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "soak.json"), "w") as f:
+        json.dump(dict(workload, **{
+            "transactions": transactions,
+            "writes": result.writes,
+            "reads": result.reads,
+            "cycles": result.cycles,
+            "wall_time_s": wall_time,
+            "transactions_per_sec": transactions_per_sec,
+            "cycles_per_sec": cycles_per_sec,
+            "peak_rss_kb": peak_rss_kb,
+        }), f, indent=2)
+
+
+# Random traffic until the transaction or wall-clock budget runs out, then drain the FIFO
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def soak_random_read_write(dut):
+    # The reference model is checked every cycle by the other tests; the soak only checks the data
+    tb = fifo_sync_base(dut, clk_period=CLK_PERIOD, time_unit="ns", check_model=False)
+    await tb.reset()
+    if not TRANSACTIONS and not SECONDS:
+        tb.dut._log.info("No SOAK_TRANSACTIONS or SOAK_SECONDS budget: running until a mismatch or interrupt.")
+    tb.dut._log.info(f"STARTING SOAK: {TRANSACTIONS or 'unlimited'} transactions, "
+                     f"{SECONDS or 'unlimited'} s, seed {SEED}")
+
+    # Resume from a checkpoint: the stimulus generator continues from the checkpoint's state
+    rng = np.random.default_rng(SEED)
+    segment_cycles = CHECKPOINT_CYCLES
+    restored = {"cycles": 0, "writes": 0, "reads": 0}
+    if CHECKPOINT_RESTORE:
+        counters = await restore_checkpoint(tb, load_checkpoint(CHECKPOINT_RESTORE), rngs={"soak": rng})
+        segment_cycles = counters["segment_cycles"]
+        restored = {name: counters[name] for name in restored}
+        tb.dut._log.info(f"RESUMING SOAK after {restored['cycles']} cycles "
+                         f"({restored['writes'] + restored['reads']} transactions) of seed {counters['seed']}")
+    stimulus = random_stimulus(rng, tb.MAX_DATA_VALUE)
+
+    # Run in segments of segment_cycles cycles (or all at once), checkpointing after every segment
+    cycles, writes, reads = restored["cycles"], restored["writes"], restored["reads"]
+    checkpoints = []  # Checkpoint paths (relative to RESULTS_DIR), oldest first
+    last_checkpoint = CHECKPOINT_RESTORE
+    start_wall = time.perf_counter()
+    try:
+        while True:
+            transactions_left = TRANSACTIONS - (writes + reads) if TRANSACTIONS else 0
+            seconds_left = SECONDS - (time.perf_counter() - start_wall) if SECONDS else 0
+            if (TRANSACTIONS and transactions_left <= 0) or (SECONDS and seconds_left <= 0):
+                break
+            segment = itertools.islice(stimulus, segment_cycles) if segment_cycles else stimulus
+            segment_result = await tb.run_stream(segment, max_transactions=transactions_left,
+                                                 max_seconds=seconds_left, report_interval=REPORT_INTERVAL)
+            cycles += segment_result.cycles
+            writes += segment_result.writes
+            reads += segment_result.reads
+            if not segment_cycles or segment_result.cycles < segment_cycles:
+                break  # A budget ran out
+
+            last_checkpoint = os.path.join("checkpoints", f"soak_{cycles}.json")
+            await save_checkpoint(tb, last_checkpoint, rngs={"soak": rng}, cycles=cycles, writes=writes, reads=reads,
+                                  segment_cycles=segment_cycles, seed=SEED)
+            checkpoints.append(last_checkpoint)
+            if len(checkpoints) > CHECKPOINT_KEEP:
+                os.remove(os.path.join(os.getenv("RESULTS_DIR", "."), checkpoints.pop(0)))
+    except Exception:
+        if last_checkpoint:
+            if last_checkpoint != CHECKPOINT_RESTORE:
+                last_checkpoint = os.path.join(os.getenv("RESULTS_DIR", "."), last_checkpoint)
+            tb.dut._log.error(f"Soak failed after cycle {cycles}. Replay from the last checkpoint with: "
+                              f"TESTBENCH=soak SOAK_SEED={SEED} CHECKPOINT_RESTORE={last_checkpoint}")
+        raise
+    # Totals of this run only (the wall time doesn't include the run before a restored checkpoint)
+    result = StreamResult(cycles=cycles - restored["cycles"], writes=writes - restored["writes"],
+                          reads=reads - restored["reads"], wall_time=time.perf_counter() - start_wall)
+
+    # Read back whatever is left, so every written item has been checked
+    remaining = len(tb.expected_data_q)
+    drain = await tb.run_stream(itertools.repeat((False, 0, True), remaining + 2), report_interval=0)
+    assert drain.reads == remaining and not tb.expected_data_q, \
+        f"FIFO drain returned {drain.reads} of {remaining} items at {get_sim_time('ns')} ns"
+
+    record_result(dut, result, seed=SEED, transaction_budget=TRANSACTIONS, seconds_budget=SECONDS,
+                  drained=remaining, checkpoint_cycles=segment_cycles, restored_from=CHECKPOINT_RESTORE or None,
+                  total_cycles=cycles, total_transactions=writes + reads)
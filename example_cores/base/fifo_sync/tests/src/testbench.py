@@ -1,19 +1,40 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ReadOnly, ReadWrite
-import random
+from cocotb.utils import get_sim_time
+import os
 from fifo_sync_base import fifo_sync_base
+from fifo_sync_checkpoint import save_checkpoint, load_checkpoint, restore_checkpoint
 from fifo_sync_coverage import start_coverage_monitor
+from fifo_sync_stimulus import REPLAY_ITERATION
+import transaction_recorder as recorders
+from transaction_recorder import transaction_recorder, dump_transactions_on_failure
+from testbench_profiler import profile_test
+
+# Coverage-closure mode for the random tests: with COVERAGE_CLOSURE=1, they run random iterations until
+# every coverage bin is closed (see fifo_sync_coverage.py), capped at COVERAGE_MAX_ITERATIONS iterations
+# and COVERAGE_MAX_SIM_TIME_NS ns of simulated time (0 for no limit), instead of a fixed number of iterations
+COVERAGE_CLOSURE = os.getenv("COVERAGE_CLOSURE", "0") == "1"
+COVERAGE_MAX_ITERATIONS = int(os.getenv("COVERAGE_MAX_ITERATIONS", "200"))
+COVERAGE_MAX_SIM_TIME_NS = float(os.getenv("COVERAGE_MAX_SIM_TIME_NS", "0"))
+
+# Random stimulus is seeded per test and per iteration from RANDOM_SEED (see fifo_sync_stimulus.py).
+# A failing iteration logs how to replay it on its own, with STIMULUS_ITERATION.
+
+# Number of random continuations branched from the warmed-up checkpoint of test_checkpoint_branches
+CHECKPOINT_BRANCHES = int(os.getenv("CHECKPOINT_BRANCHES", "8"))
 
 # Create a setup function that can be called by each test
-async def setup_testbench(dut):
-    tb = fifo_sync_base(dut, clk_period=4, time_unit="ns")
+async def setup_testbench(dut, test_name=""):
+    tb = fifo_sync_base(dut, clk_period=4, time_unit="ns", test_name=test_name)
     return tb
 
 # Test for FIFO with synchronous reset, FIFO should be empty after reset and not full
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def test_fifo_sync_reset(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "test_fifo_sync_reset")
     start_coverage_monitor(dut)  # Start coverage monitoring
     tb.dut._log.info("STARTING TEST: FIFO Synchronous Reset")
 
@@ -27,16 +48,62 @@ async def test_fifo_sync_reset(dut):
     assert dut.almost_empty.value == 1, "FIFO should be almost empty after reset"
     assert dut.almost_full.value == 0, "FIFO should not be almost full after reset"
 
+# Test that transaction log depths below 1 (given directly or through TRANSACTION_LOG_DEPTH) are rejected
+@cocotb.test()
+async def test_transaction_log_depth_validation(dut):
+    for depth in (0, -1):
+        try:
+            transaction_recorder(dut, depth=depth)
+        except ValueError as error:
+            assert "TRANSACTION_LOG_DEPTH" in str(error), f"Unclear error for depth {depth}: {error}"
+        else:
+            assert False, f"A transaction log depth of {depth} should be rejected"
+
+    saved = os.environ.get("TRANSACTION_LOG_DEPTH")
+    try:
+        for value in ("0", "-8", "many"):
+            os.environ["TRANSACTION_LOG_DEPTH"] = value
+            try:
+                transaction_recorder(dut)
+            except ValueError as error:
+                assert "TRANSACTION_LOG_DEPTH" in str(error), f"Unclear error for TRANSACTION_LOG_DEPTH={value}: {error}"
+            else:
+                assert False, f"TRANSACTION_LOG_DEPTH={value} should be rejected"
+        os.environ["TRANSACTION_LOG_DEPTH"] = "1"
+        assert transaction_recorder(dut).depth == 1
+    finally:
+        if saved is None:
+            del os.environ["TRANSACTION_LOG_DEPTH"]
+        else:
+            os.environ["TRANSACTION_LOG_DEPTH"] = saved
+
+# The recorders created during a test are closed and released when it ends, so they don't pile up over the tests
+@cocotb.test()
+async def test_transaction_recorders_released(dut):
+    registered = list(recorders._recorders)
+
+    @dump_transactions_on_failure
+    async def run(dut):
+        tb = fifo_sync_base(dut, clk_period=4, time_unit="ns", test_name="test_transaction_recorders_released")
+        assert tb.recorder in recorders._recorders, "The testbench's recorder should be registered during the test"
+        return tb.recorder
+
+    recorder = await run(dut)
+    assert recorders._recorders == registered, "The recorders created during the test should be unregistered"
+    assert recorder._stream is None, "The recorder's stream file should be closed"
+
 # Test for basic write and read operation
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def test_basic_write_read(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "test_basic_write_read")
     start_coverage_monitor(dut)  # Start coverage monitoring
     await tb.reset()
     tb.dut._log.info("STARTING TEST: Basic Write/Read Operation")
 
     # Test single write/read
-    test_data = random.randint(0, tb.MAX_DATA_VALUE)
+    test_data = tb.stimulus.word()
     success = await tb.write(test_data)
     assert success, "Write should succeed on empty FIFO"
 
@@ -50,13 +117,15 @@ async def test_basic_write_read(dut):
 
 # Direct back to back read after write
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def back_to_back_read_after_write(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "back_to_back_read_after_write")
     start_coverage_monitor(dut)  # Start coverage monitoring
     await tb.reset()
     tb.dut._log.info("STARTING TEST: Back-to-Back Read After Write")
 
-    test_data = random.randint(0, tb.MAX_DATA_VALUE)
+    test_data = tb.stimulus.word()
 
     # Write single data item
     await RisingEdge(dut.clk)
@@ -88,15 +157,17 @@ async def back_to_back_read_after_write(dut):
 
 #Test First Word Fall Through (FWFT) behavior
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def test_fwft_behavior(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "test_fwft_behavior")
     start_coverage_monitor(dut)  # Start coverage monitoring
     await tb.reset()
     tb.dut._log.info("STARTING TEST: First Word Fall Through (FWFT) Behavior")
 
     # Write first data item
-    test_data1 = random.randint(0, tb.MAX_DATA_VALUE)
-    test_data2 = random.randint(0, tb.MAX_DATA_VALUE)
+    test_data1 = tb.stimulus.word()
+    test_data2 = tb.stimulus.word()
 
     await tb.write(test_data1)
     # In FWFT mode, data should be immediately available on rd_data
@@ -125,13 +196,15 @@ async def test_fwft_behavior(dut):
 
 #Test FIFO full and empty conditions, filling the FIFO to capacity and then reading it until it is empty
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def test_full_and_empty_conditions(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "test_full_and_empty_conditions")
     start_coverage_monitor(dut)  # Start coverage monitoring
     await tb.reset()
     tb.dut._log.info("STARTING TEST: Full and Empty Conditions")
 
-    fill_data = await tb.generate_random_data(tb.FIFO_DEPTH)
+    fill_data = tb.generate_random_data(tb.FIFO_DEPTH)
     written_count = await tb.write_burst(fill_data)
     assert written_count == tb.FIFO_DEPTH, f"Expected to write {tb.FIFO_DEPTH} items, but wrote {written_count}"
 
@@ -151,16 +224,81 @@ async def test_full_and_empty_conditions(dut):
     assert dut.full.value == 0, "FIFO should not be full after reading all items"
     tb.dut._log.info(f"FIFO empty status: {dut.empty.value}, full status: {dut.full.value}")
 
+# Test reads while the FIFO is empty (underflow attempts), which must not move the pointers or change the flags,
+# both right after reset and with the pointers away from zero, alone and together with a write
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def test_read_while_empty(dut):
+    tb = await setup_testbench(dut, "test_read_while_empty")
+    start_coverage_monitor(dut)  # Start coverage monitoring
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Read While Empty")
+
+    state_signals = ("rd_ptr_bin", "wr_ptr_bin", "fifo_count", "empty", "full", "almost_empty", "almost_full")
+
+    async def read_while_empty(cycles):
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        assert dut.empty.value == 1, "FIFO should be empty before reading while empty"
+        state = {name: int(getattr(dut, name).value) for name in state_signals}
+        await RisingEdge(dut.clk)
+        dut.rd_en.value = 1
+        for _ in range(cycles):
+            await ReadOnly()
+            assert int(dut.rd_ptr_bin_nxt.value) == state["rd_ptr_bin"], "Next read pointer should not advance while empty"
+            await RisingEdge(dut.clk)
+            await ReadOnly()
+            for name in state_signals:
+                assert int(getattr(dut, name).value) == state[name], \
+                    f"{name} changed on a read while empty: {state[name]} -> {int(getattr(dut, name).value)}"
+        await RisingEdge(dut.clk)
+        dut.rd_en.value = 0
+
+    # Right after reset
+    await read_while_empty(4)
+
+    # With the pointers moved away from zero
+    for data in tb.generate_random_data(3):
+        assert await tb.write(data), "Write should succeed on empty FIFO"
+        read_data, expected_data, success = await tb.read()
+        assert success and read_data == expected_data, f"Data mismatch: read=0x{int(read_data):X}, expected=0x{expected_data:X}"
+    await read_while_empty(4)
+
+    # Together with a write: the write goes in, the read is ignored and the word is still read back afterwards
+    test_data = tb.stimulus.word()
+    await RisingEdge(dut.clk)
+    await ReadWrite()
+    assert dut.empty.value == 1, "FIFO should be empty before writing and reading while empty"
+    rd_ptr = int(dut.rd_ptr_bin.value)
+    dut.wr_data.value = test_data
+    dut.wr_en.value = 1
+    dut.rd_en.value = 1
+    tb.expected_data_q.append(test_data)
+    await RisingEdge(dut.clk)
+    dut.wr_en.value = 0
+    dut.rd_en.value = 0
+    await ReadOnly()
+    assert int(dut.rd_ptr_bin.value) == rd_ptr, "Read pointer should not advance on a read while empty"
+    assert dut.empty.value == 0 and int(dut.fifo_count.value) == 1, "The write should go in despite the read"
+
+    read_data, expected_data, success = await tb.read()
+    assert success and read_data == expected_data == test_data, f"Data mismatch: read=0x{int(read_data):X}, expected=0x{test_data:X}"
+    await RisingEdge(dut.clk)
+    await ReadOnly()
+    assert dut.empty.value == 1, "FIFO should be empty after reading the word back"
 
 # Test FIFO almost full and almost empty conditions
 @cocotb.test()
+@dump_transactions_on_failure
+@profile_test
 async def test_almost_full_empty_conditions(dut):
-    tb = await setup_testbench(dut)
+    tb = await setup_testbench(dut, "test_almost_full_empty_conditions")
     await tb.reset()
     tb.dut._log.info("STARTING TEST: Almost Full and Almost Empty Conditions")
 
     # Fill FIFO to almost full
-    fill_data = await tb.generate_random_data(tb.FIFO_DEPTH - tb.ALMOST_FULL_THRESHOLD)
+    fill_data = tb.generate_random_data(tb.FIFO_DEPTH - tb.ALMOST_FULL_THRESHOLD)
     written_count = await tb.write_burst(fill_data)
     assert written_count == tb.FIFO_DEPTH - tb.ALMOST_FULL_THRESHOLD, f"Expected to write {tb.FIFO_DEPTH - tb.ALMOST_FULL_THRESHOLD} items, but wrote {written_count}"
 
@@ -182,100 +320,218 @@ async def test_almost_full_empty_conditions(dut):
     assert dut.empty.value == 0, "FIFO should not be empty after reading items"
     tb.dut._log.info(f"FIFO almost empty status: {dut.almost_empty.value}, empty status: {dut.empty.value}")
 
+# Runs the iterations of a random test: a fixed number of them, or in coverage-closure mode
+# until every coverage bin is closed or the iteration/sim-time budget runs out
+async def run_random_iterations(tb, coverage, test_name, iteration, iterations=20):
+    if REPLAY_ITERATION:
+        await run_seeded_iteration(tb, iteration, REPLAY_ITERATION - 1)
+        return
+    if not COVERAGE_CLOSURE:
+        for i in range(iterations):
+            await run_seeded_iteration(tb, iteration, i)
+        return
+
+    start_time = get_sim_time("ns")
+    i = 0
+    while True:
+        coverage.set_context(test=test_name, seed=tb.stimulus.master_seed, iteration=i + 1)
+        await run_seeded_iteration(tb, iteration, i)
+        coverage.checkpoint()  # Bin this iteration's samples, attributing newly closed bins to it
+        i += 1
+
+        open_bins = coverage.open_bins()
+        if not open_bins:
+            tb.dut._log.info(f"COVERAGE CLOSED after {i} iterations of {test_name}")
+            break
+        if i >= COVERAGE_MAX_ITERATIONS or (COVERAGE_MAX_SIM_TIME_NS and get_sim_time("ns") - start_time >= COVERAGE_MAX_SIM_TIME_NS):
+            tb.dut._log.warning(f"Coverage budget reached after {i} iterations of {test_name} with {len(open_bins)} bins open, "
+                                f"e.g. {', '.join(f'{name} {bin_key}' for name, bin_key in open_bins[:5])}")
+            break
+
+# Runs one iteration with its own seeded stimulus, logging how to replay it if it fails
+async def run_seeded_iteration(tb, iteration, i):
+    tb.stimulus = tb.stimulus.for_iteration(i + 1)
+    try:
+        await iteration(tb, i)
+    except Exception:
+        tb.dut._log.error(f"Iteration {i + 1} failed. Replay it with: {tb.stimulus.replay_hint()}")
+        raise
+
 # Test simultaneous read and write operations
-@cocotb.test()
-async def test_random_simultaneous_read_write(dut):
-    tb = await setup_testbench(dut)
-    start_coverage_monitor(dut)  # Start coverage monitoring
+async def random_simultaneous_read_write_iteration(tb, i):
+    await tb.reset()
+    tb.dut._log.info(f"STARTING TEST: Random Simultaneous Read and Write Operations Iteration: {i + 1}")
 
-    # Random test setup
-    iterations = 20
+    number_of_initial_data = tb.stimulus.lengths(2, 10)  # Random number of initial data items
+    number_of_random_writes = tb.stimulus.lengths(50, 300)  # Random number of writes in the burst
+    number_of_random_reads = tb.stimulus.lengths(50, 300)  # Random number of reads in the burst
+    tb.dut._log.info(f"Initial data count: {number_of_initial_data}, Random writes: {number_of_random_writes}, Random reads: {number_of_random_reads}")
 
-    for i in range(iterations):
-        await tb.reset()
-        tb.dut._log.info(f"STARTING TEST: Random Simultaneous Read and Write Operations Iteration: {i + 1}")
+    # Write the initial data to the FIFO
+    initial_data = tb.generate_random_data(number_of_initial_data)
+    for data in initial_data:
+        await tb.write(data)
 
-        number_of_initial_data = random.randint(2,10)  # Random number of initial data items
-        number_of_random_writes = random.randint(50, 300)  # Random number of writes in the burst
-        number_of_random_reads = random.randint(50, 300)  # Random number of reads in the burst
-        tb.dut._log.info(f"Initial data count: {number_of_initial_data}, Random writes: {number_of_random_writes}, Random reads: {number_of_random_reads}")
+    # Create random data for additional writes
+    random_data = tb.generate_random_data(number_of_random_writes)
 
-        # Write the initial data to the FIFO
-        initial_data = await tb.generate_random_data(number_of_initial_data)
-        for data in initial_data:
-            await tb.write(data)
+    # Start simultaneous writes
+    write_task = cocotb.start_soon(tb.write_burst(random_data))
 
-        # Create random data for additional writes
-        random_data = await tb.generate_random_data(number_of_random_writes)
+    # Start simultaneous reads
+    read_task = cocotb.start_soon(tb.read_burst(number_of_random_reads))
 
-        # Start simultaneous writes
-        write_task = cocotb.start_soon(tb.write_burst(random_data))
+    # Wait for the write task to complete
+    await write_task
 
-        # Start simultaneous reads
-        read_task = cocotb.start_soon(tb.read_burst(number_of_random_reads))
+    # Wait for the read task to complete
+    read_results = await read_task
 
-        # Wait for the write task to complete
-        await write_task
+    # Verify the read results
+    for read_number, (read_value, expected_value) in enumerate(read_results, start=1):
+        #assert read_value in initial_data or read_value in random_data, f"Unexpected read value: 0x{read_value:X}"
+        assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at read {read_number}"
 
-        # Wait for the read task to complete
-        read_results = await read_task
+    # Final FIFO status
+    tb.dut._log.info(f"Final FIFO status after iteration {i + 1}:")
+    await tb.print_fifo_status()
 
-        # Verify the read results
-        for read_value, expected_value in read_results:
-            #assert read_value in initial_data or read_value in random_data, f"Unexpected read value: 0x{read_value:X}"
-            assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at {read_results.index((read_value, expected_value)) + 1}. read"
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def test_random_simultaneous_read_write(dut):
+    tb = await setup_testbench(dut, "test_random_simultaneous_read_write")
+    coverage = start_coverage_monitor(dut)  # Start coverage monitoring
 
-        # Final FIFO status
-        tb.dut._log.info(f"Final FIFO status after iteration {i + 1}:")
-        await tb.print_fifo_status()
+    await run_random_iterations(tb, coverage, "test_random_simultaneous_read_write", random_simultaneous_read_write_iteration)
 
 # Test simultaneous read and write operations with one initial data in the FIFO
-@cocotb.test()
-async def test_random_simultaneous_read_write_w_one_initial_data(dut):
-    tb = await setup_testbench(dut)
-    start_coverage_monitor(dut)  # Start coverage monitoring
+async def random_simultaneous_read_write_w_one_initial_data_iteration(tb, i):
+    dut = tb.dut
+    await tb.reset()
+    tb.dut._log.info(f"STARTING TEST: Random Simultaneous Read and Write Operations with Initial. Iteration: {i + 1}")
 
-    # Random test setup
-    iterations = 20
+    number_of_random_writes = tb.stimulus.lengths(50, 300)  # Random number of writes in the burst
+    number_of_random_reads = tb.stimulus.lengths(50, 300)  # Random number of reads in the burst
+    tb.dut._log.info(f"Initial data count: 0, Random writes: {number_of_random_writes}, Random reads: {number_of_random_reads}")
 
-    for i in range(iterations):
-        await tb.reset()
-        tb.dut._log.info(f"STARTING TEST: Random Simultaneous Read and Write Operations with Initial. Iteration: {i + 1}")
+    initial_data = tb.stimulus.word()  # Drawn like the other data, so it fits in DATA_WIDTH
 
-        number_of_random_writes = random.randint(50, 300)  # Random number of writes in the burst
-        number_of_random_reads = random.randint(50, 300)  # Random number of reads in the burst
-        tb.dut._log.info(f"Initial data count: 0, Random writes: {number_of_random_writes}, Random reads: {number_of_random_reads}")
+    await RisingEdge(dut.clk)
+    dut.wr_data.value = initial_data
+    dut.wr_en.value = 1
+    tb.dut._log.info(f"Writing initial data: 0x{initial_data:X}")
+    tb.expected_data_q.append(initial_data)  # Add to expected queue immediately
 
-        await RisingEdge(dut.clk)
-        dut.wr_data.value = 0x1234  # Hand-written initial data
-        dut.wr_en.value = 1
-        tb.dut._log.info(f"Writing initial data: 0x{int(dut.wr_data.value):X}")
-        tb.expected_data_q.append(0x1234)  # Add to expected queue immediately
+    await RisingEdge(dut.clk)
+    dut.wr_en.value = 0
 
-        await RisingEdge(dut.clk)
-        dut.wr_en.value = 0
+    # Create random data for additional writes
+    random_data = tb.generate_random_data(number_of_random_writes)
 
-        # Create random data for additional writes
-        random_data = await tb.generate_random_data(number_of_random_writes)
+    # Start simultaneous writes
+    write_task = cocotb.start_soon(tb.write_burst(random_data))
 
-        # Start simultaneous writes
-        write_task = cocotb.start_soon(tb.write_burst(random_data))
+    # Start simultaneous reads
+    await RisingEdge(dut.clk)
+    read_task = cocotb.start_soon(tb.read_burst(number_of_random_reads))
 
-        # Start simultaneous reads
-        await RisingEdge(dut.clk)
-        read_task = cocotb.start_soon(tb.read_burst(number_of_random_reads))
+    # Wait for the write task to complete
+    await write_task
 
-        # Wait for the write task to complete
-        await write_task
+    # Wait for the read task to complete
+    read_results = await read_task
 
-        # Wait for the read task to complete
-        read_results = await read_task
+    # Verify the read results
+    for read_number, (read_value, expected_value) in enumerate(read_results, start=1):
+        #assert read_value in initial_data or read_value in random_data, f"Unexpected read value: 0x{read_value:X}"
+        assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at read {read_number}"
+
+    # Final FIFO status
+    tb.dut._log.info(f"Final FIFO status after iteration {i + 1}:")
+    await tb.print_fifo_status()
+
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def test_random_simultaneous_read_write_w_one_initial_data(dut):
+    tb = await setup_testbench(dut, "test_random_simultaneous_read_write_w_one_initial_data")
+    coverage = start_coverage_monitor(dut)  # Start coverage monitoring
 
-        # Verify the read results
-        for read_value, expected_value in read_results:
-            #assert read_value in initial_data or read_value in random_data, f"Unexpected read value: 0x{read_value:X}"
-            assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at {read_results.index((read_value, expected_value)) + 1}th read"
+    await run_random_iterations(tb, coverage, "test_random_simultaneous_read_write_w_one_initial_data",
+                                random_simultaneous_read_write_w_one_initial_data_iteration)
 
-        # Final FIFO status
-        tb.dut._log.info(f"Final FIFO status after iteration {i + 1}:")
-        await tb.print_fifo_status()
+# Test random per-cycle enable schedules: sparse or bursty writes and reads at random densities,
+# with corner data values mixed in
+async def random_schedule_iteration(tb, i):
+    await tb.reset()
+    tb.dut._log.info(f"STARTING TEST: Random Schedule Iteration: {i + 1}")
+    await run_random_schedule(tb, i)
+
+async def run_random_schedule(tb, i):
+    stimulus = tb.stimulus
+    cycles = stimulus.lengths(200, 1000)
+    write_density, read_density = stimulus.rng.uniform(0.2, 0.8, size=2)
+    burst_length = 1.0 if i % 2 == 0 else float(stimulus.lengths(2, 2 * tb.FIFO_DEPTH))  # Alternate sparse and bursty
+    tb.dut._log.info(f"Cycles: {cycles}, write density: {write_density:.2f}, read density: {read_density:.2f}, "
+                     f"burst length: {burst_length:.0f}")
+
+    wr_en = stimulus.enables(cycles, write_density, burst_length)
+    rd_en = stimulus.enables(cycles, read_density, burst_length)
+    wr_data = stimulus.data(cycles, corner_fraction=0.1)
+    result = await tb.run_schedule(wr_en, wr_data, rd_en)
+
+    # Verify the read results
+    read_values = result.rd_data[result.rd_done]
+    expected_values = result.expected[result.rd_done]
+    for read_number, (read_value, expected_value) in enumerate(zip(read_values.tolist(), expected_values.tolist()), start=1):
+        assert read_value == expected_value, f"Data mismatch: read=0x{read_value:X}, expected=0x{expected_value:X} at read {read_number}"
+
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def test_random_schedule(dut):
+    tb = await setup_testbench(dut, "test_random_schedule")
+    coverage = start_coverage_monitor(dut)  # Start coverage monitoring
+
+    await run_random_iterations(tb, coverage, "test_random_schedule", random_schedule_iteration)
+
+# Test random schedules branched from one warmed-up FIFO state: the FIFO is filled by random traffic once,
+# checkpointed, and every iteration is restored from the checkpoint (see fifo_sync_checkpoint.py) instead
+# of starting from a reset, which also checks that restoring reaches the checkpointed state
+@cocotb.test()
+@dump_transactions_on_failure
+@profile_test
+async def test_checkpoint_branches(dut):
+    tb = await setup_testbench(dut, "test_checkpoint_branches")
+    coverage = start_coverage_monitor(dut)  # Start coverage monitoring
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Checkpoint Branches")
+
+    # Warm up with more writes than reads, so the checkpoint has data and wrapped pointers
+    cycles = 8 * tb.FIFO_DEPTH
+    result = await tb.run_schedule(tb.stimulus.enables(cycles, 0.7, 4), tb.stimulus.data(cycles),
+                                   tb.stimulus.enables(cycles, 0.4, 4))
+    assert (result.rd_data[result.rd_done] == result.expected[result.rd_done]).all(), "Data mismatch during warm-up"
+    path = os.path.join("checkpoints", f"test_checkpoint_branches_{dut._name}.json")
+    await save_checkpoint(tb, path, coverage=coverage)
+    checkpoint = load_checkpoint(path)
+
+    async def branch_iteration(tb, i):
+        # The fast-forward isn't sampled, and the coverage of the branches adds up
+        coverage.checkpoint()
+        samples = coverage.total_samples
+        await restore_checkpoint(tb, checkpoint, coverage=coverage, stimulus=False, restore_coverage=False)
+        coverage.checkpoint()
+        assert coverage.total_samples == samples, \
+            f"The fast-forward shouldn't be sampled for coverage ({coverage.total_samples - samples} samples)"
+        tb.dut._log.info(f"STARTING TEST: Checkpoint Branch {i + 1} ({len(tb.expected_data_q)} words in the FIFO)")
+        await run_random_schedule(tb, i)
+
+    await run_random_iterations(tb, coverage, "test_checkpoint_branches", branch_iteration, iterations=CHECKPOINT_BRANCHES)
+
+    # Restoring the coverage too brings the counts back to the checkpoint's
+    branches_state = coverage.state()
+    await restore_checkpoint(tb, checkpoint, coverage=coverage)
+    assert coverage.state() == checkpoint["coverage"], "Coverage should be restored to the checkpoint's counts"
+    coverage.restore_state(branches_state)  # Keep the coverage of the branches for the report
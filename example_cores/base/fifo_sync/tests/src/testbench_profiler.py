@@ -0,0 +1,255 @@
+import cocotb
+import cocotb.handle
+import cocotb.triggers
+from cocotb.handle import SimHandleBase
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import time
+
+# Opt-in profiling of the fifo_sync testbench, to tell whether a slow run is spent in the simulator, in
+# GPI signal accesses, in trigger scheduling or in logging.
+#
+# Enabled with the TB_PROFILE environment variable:
+# - "0" (default): Disabled. profile_test returns the test unchanged, so there's no overhead at all.
+# - "1": Counts, per coroutine, the triggers it awaited, its signal reads and writes, its log calls, and
+#     the wall time spent running it. The test's wall time is split between the testbench's coroutines
+#     and the rest (the simulator and the cocotb scheduler).
+# - "cprofile": Also runs cProfile for the whole test, and writes profile_<test>.pstat.
+#
+# The test gets the DUT itself (triggers must be created on the real handles: the GPI keeps one edge callback
+# per signal). While a test is profiled, the value property of cocotb's handle classes and the __await__ of its
+# trigger classes are wrapped to count signal accesses and trigger awaits, and both are restored when the
+# test ends. Nothing in the scheduler is touched. A coroutine runs from the trigger that resumed it to the
+# next trigger it awaits, so that time and the accesses made meanwhile are counted for the coroutine awaiting
+# the trigger. Coroutines are identified by their function's qualified name, so all the instances of a
+# coroutine (e.g. every fifo_sync_monitor._run) are added together.
+#
+# Each test logs a profile table, and the profiles of all the tests are written to profile.json in
+# RESULTS_DIR (next to results.xml). The pstats dumps can be read with python3 -m pstats.
+
+PROFILE_MODE = os.getenv("TB_PROFILE", "0").lower()
+PROFILE_ENABLED = PROFILE_MODE not in ("", "0", "off")
+
+# Profiles of the tests run in this simulation, written to profile.json after every test
+_profiles = {}
+# Profiler of the running test
+_active = None
+
+
+def _count(counter):
+    if _active is not None:
+        _active.count(counter)
+
+
+def _counted(function, counter):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _count(counter)
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def _profiled_await(original):
+    """
+    Wraps a trigger's __await__ to count the await for the awaiting coroutine, and to time it from there.
+    """
+    @functools.wraps(original)
+    def __await__(trigger):
+        if _active is not None:
+            # This generator is run by the awaiting coroutine's send, so that's the previous frame
+            _active.suspend(sys._getframe(1).f_code, trigger)
+        result = yield from original(trigger)
+        if _active is not None:
+            _active.resume()
+        return result
+    return __await__
+
+
+def _instrumented_attributes():
+    """
+    Returns:
+        list: (class, name, original attribute, counting attribute) for the value property and setimmediatevalue
+        of cocotb's handle classes, and the __await__ of its trigger classes (those that define them).
+    """
+    attributes = []
+    for cls in vars(cocotb.handle).values():
+        if not isinstance(cls, type) or not issubclass(cls, SimHandleBase):
+            continue
+        value = cls.__dict__.get("value")
+        if isinstance(value, property):
+            counting = property(_counted(value.fget, "reads"),
+                                _counted(value.fset, "writes") if value.fset is not None else None,
+                                doc=value.__doc__)
+            attributes.append((cls, "value", value, counting))
+        if "setimmediatevalue" in cls.__dict__:
+            setimmediatevalue = cls.__dict__["setimmediatevalue"]
+            attributes.append((cls, "setimmediatevalue", setimmediatevalue, _counted(setimmediatevalue, "writes")))
+    for cls in vars(cocotb.triggers).values():
+        if isinstance(cls, type) and issubclass(cls, cocotb.triggers.Trigger) and "__await__" in cls.__dict__:
+            original = cls.__dict__["__await__"]
+            attributes.append((cls, "__await__", original, _profiled_await(original)))
+    return attributes
+
+
+class _log_counter(logging.Handler):
+
+    def emit(self, record):
+        _count("logs")
+
+
+class testbench_profiler:
+
+    def __init__(self, test_name, use_cprofile=False):
+        """
+        Args:
+            test_name (str): Name of the profiled test.
+            use_cprofile (bool): Also profile the Python functions run during the test with cProfile.
+        """
+        self.test_name = test_name
+        self.coroutines = {}  # Coroutine name -> counters
+        self.triggers = {}  # Trigger type -> times awaited
+        self.python_time = 0.0  # Wall time spent running the testbench's coroutines
+        self.wall_time = 0.0
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self._slice = None  # Counters of the coroutine running since the last resume
+        self._slice_start = 0.0
+        self._attributes = []
+        self._log_handler = _log_counter()
+
+    def _counters(self, name):
+        counters = self.coroutines.get(name)
+        if counters is None:
+            counters = self.coroutines[name] = {"triggers": 0, "reads": 0, "writes": 0, "logs": 0, "python_time_s": 0.0}
+        return counters
+
+    def _end_slice(self, name):
+        """
+        Counts the running time and the accesses since the last resume for a coroutine.
+        """
+        now = time.perf_counter()
+        counters = self._counters(name)
+        for counter, count in self._slice.items():
+            counters[counter] += count
+        elapsed = now - self._slice_start
+        counters["python_time_s"] += elapsed
+        self.python_time += elapsed
+        self._slice = {"reads": 0, "writes": 0, "logs": 0}
+        self._slice_start = now
+
+    def count(self, counter):
+        """
+        Counts a signal read or write or a log call for the running coroutine.
+        """
+        self._slice[counter] += 1
+
+    def suspend(self, code, trigger):
+        """
+        Ends the running time of a coroutine that awaits a trigger.
+        """
+        self._end_slice(code.co_qualname)
+        self.coroutines[code.co_qualname]["triggers"] += 1
+        trigger_type = type(trigger).__name__
+        self.triggers[trigger_type] = self.triggers.get(trigger_type, 0) + 1
+
+    def resume(self):
+        """
+        Starts the running time of a coroutine resumed by its trigger.
+        """
+        self._slice_start = time.perf_counter()
+
+    def start(self):
+        """
+        Wraps the handle and trigger attributes that count (see above). They're restored by stop().
+        """
+        global _active
+        self._attributes = _instrumented_attributes()
+        for cls, name, _, counting in self._attributes:
+            setattr(cls, name, counting)
+        logging.getLogger("cocotb").addHandler(self._log_handler)
+        self._slice = {"reads": 0, "writes": 0, "logs": 0}
+        _active = self
+        self._start_wall = self._slice_start = time.perf_counter()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        """
+        Restores the handle and trigger attributes. The rest of the test's running time is counted for the test.
+        """
+        global _active
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self._end_slice(self.test_name)
+        self.wall_time = time.perf_counter() - self._start_wall
+        _active = None
+        for cls, name, original, _ in reversed(self._attributes):
+            setattr(cls, name, original)
+        self._attributes = []
+        logging.getLogger("cocotb").removeHandler(self._log_handler)
+
+    def summary(self):
+        """
+        Returns:
+            dict: The profile of the test.
+        """
+        coroutines = dict(sorted(self.coroutines.items(), key=lambda item: item[1]["python_time_s"], reverse=True))
+        for counters in coroutines.values():
+            counters["python_time_s"] = round(counters["python_time_s"], 6)
+        return {
+            "wall_time_s": round(self.wall_time, 6),
+            "python_time_s": round(self.python_time, 6),
+            "simulator_time_s": round(max(self.wall_time - self.python_time, 0.0), 6),
+            "triggers": dict(sorted(self.triggers.items(), key=lambda item: item[1], reverse=True)),
+            "coroutines": coroutines,
+        }
+
+    def report(self, log):
+        """
+        Logs the profile table of the test, and writes profile.json (and the pstats dump) to RESULTS_DIR.
+        """
+        summary = self.summary()
+        wall_time = summary["wall_time_s"] or float("inf")
+        log.info(f"PROFILE {self.test_name}: {summary['wall_time_s']:.3f} s wall, "
+                 f"{summary['python_time_s']:.3f} s Python ({100 * summary['python_time_s'] / wall_time:.1f}%), "
+                 f"{summary['simulator_time_s']:.3f} s simulator and scheduler "
+                 f"({100 * summary['simulator_time_s'] / wall_time:.1f}%)")
+        log.info(f"PROFILE {'coroutine':<48} {'triggers':>10} {'reads':>10} {'writes':>10} {'logs':>8} {'python s':>10}")
+        for name, counters in summary["coroutines"].items():
+            log.info(f"PROFILE {name[:48]:<48} {counters['triggers']:>10} {counters['reads']:>10} "
+                     f"{counters['writes']:>10} {counters['logs']:>8} {counters['python_time_s']:>10.3f}")
+        log.info("PROFILE triggers: " + ", ".join(f"{name} {count}" for name, count in summary["triggers"].items()))
+
+        results_dir = os.getenv("RESULTS_DIR", ".")
+        os.makedirs(results_dir, exist_ok=True)
+        _profiles[self.test_name] = summary
+        with open(os.path.join(results_dir, "profile.json"), "w") as f:
+            json.dump(_profiles, f, indent=2)
+        if self.cprofile is not None:
+            path = os.path.join(results_dir, f"profile_{self.test_name}.pstat")
+            self.cprofile.dump_stats(path)
+            log.info(f"PROFILE cProfile stats written to {path}")
+
+
+def profile_test(test_function):
+    """
+    Decorator for cocotb test coroutines that profiles the test when TB_PROFILE is set (see above).
+    Returns the test unchanged when profiling is disabled.
+    Place it below the @cocotb.test() decorator.
+    """
+    if not PROFILE_ENABLED:
+        return test_function
+
+    @functools.wraps(test_function)
+    async def wrapper(dut, *args, **kwargs):
+        profiler = testbench_profiler(test_function.__name__, use_cprofile=PROFILE_MODE == "cprofile")
+        profiler.start()
+        try:
+            await test_function(dut, *args, **kwargs)
+        finally:
+            profiler.stop()
+            profiler.report(dut._log)
+    return wrapper
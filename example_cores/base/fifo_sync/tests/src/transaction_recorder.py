@@ -0,0 +1,242 @@
+from cocotb.utils import get_sim_time, get_time_from_sim_steps
+import atexit
+import functools
+import os
+import numpy as np
+
+# Bounded, lazily formatted transaction log for the fifo_sync testbench.
+#
+# Transactions are stored as raw fields in a preallocated ring buffer instead of being
+# formatted and logged one by one. Nothing is formatted unless it's dumped, which happens:
+# - For the last TRANSACTION_LOG_DEPTH transactions when a test fails an assertion
+#     (tests need the `dump_transactions_on_failure` decorator)
+# - For every transaction as it's recorded if TRANSACTION_LOG=full
+#
+# Environment variables:
+# - TRANSACTION_LOG: "failure" (default) to only dump on failure, "full" to log every transaction
+# - TRANSACTION_LOG_DEPTH: Size of the ring buffer, i.e. the number of transactions dumped on failure (default 64,
+#     at least 1)
+# - TRANSACTION_LOG_FILE: Optional file to stream every transaction to, bypassing the logging stack.
+#     ".csv" files are written as text, anything else as packed binary records (see STREAM_DTYPE).
+#     Relative paths are relative to RESULTS_DIR.
+#
+# Data and expected values are stored as 64-bit unsigned integers, so DATA_WIDTH must be at most 64.
+
+# Transaction operation codes
+OP_WRITE = 0
+OP_READ = 1
+OP_WRITE_SKIPPED = 2  # Write attempted while full
+OP_READ_SKIPPED = 3   # Read attempted while empty
+OP_RESET = 4
+OP_NAMES = ("WRITE", "READ", "WRITE SKIPPED (full)", "READ SKIPPED (empty)", "RESET")
+
+# Transaction flags
+FLAG_MISMATCH = 0x1  # Read data didn't match the expected data
+
+# Record layout of binary stream files
+STREAM_DTYPE = np.dtype([
+    ("sim_steps", "<u8"),
+    ("op", "u1"),
+    ("data", "<u8"),
+    ("expected", "<u8"),
+    ("flags", "u1"),
+])
+
+# Recorders of the running test, so failures can be dumped from all of them. They're closed and removed when the
+# test ends (see dump_transactions_on_failure and release_transaction_recorders), so their ring buffers and stream
+# files don't outlive it
+_recorders = []
+# Stream files already opened by this process (opened for writing once, then appended to)
+_opened_stream_files = set()
+
+
+class transaction_recorder:
+
+    def __init__(self, dut, depth=None, mode=None, stream_file=None):
+        self.dut = dut
+        depth = depth if depth is not None else os.getenv("TRANSACTION_LOG_DEPTH") or "64"
+        try:
+            self.depth = int(depth)
+        except ValueError:
+            raise ValueError(f"Invalid TRANSACTION_LOG_DEPTH: {depth}. Must be an integer of at least 1.") from None
+        if self.depth < 1:
+            raise ValueError(f"Invalid TRANSACTION_LOG_DEPTH: {self.depth}. Must be at least 1.")
+        self.mode = mode if mode is not None else os.getenv("TRANSACTION_LOG", "failure")
+        if self.mode not in ("failure", "full"):
+            raise ValueError(f"Invalid TRANSACTION_LOG mode: {self.mode}. Must be 'failure' or 'full'.")
+        self.full_trace = self.mode == "full"
+
+        # Ring buffer fields
+        self._sim_steps = np.zeros(self.depth, dtype=np.uint64)
+        self._op = np.zeros(self.depth, dtype=np.uint8)
+        self._data = np.zeros(self.depth, dtype=np.uint64)
+        self._expected = np.zeros(self.depth, dtype=np.uint64)
+        self._flags = np.zeros(self.depth, dtype=np.uint8)
+        self.count = 0  # Total number of transactions recorded
+
+        # Optional stream file
+        stream_file = stream_file if stream_file is not None else os.getenv("TRANSACTION_LOG_FILE")
+        self._stream = None
+        self._stream_csv = False
+        self._flushed = 0  # Total number of transactions written to the stream
+        if stream_file:
+            if not os.path.isabs(stream_file):
+                stream_file = os.path.join(os.getenv("RESULTS_DIR", "."), stream_file)
+            os.makedirs(os.path.dirname(os.path.abspath(stream_file)), exist_ok=True)
+            self._stream_csv = stream_file.endswith(".csv")
+            first_open = stream_file not in _opened_stream_files
+            _opened_stream_files.add(stream_file)
+            self._stream = open(stream_file, ("w" if first_open else "a") + ("" if self._stream_csv else "b"))
+            if first_open and self._stream_csv:
+                self._stream.write("sim_steps,op,data,expected,flags\n")
+
+        _recorders.append(self)
+
+    def record(self, op, data=0, expected=0, flags=0):
+        """
+        Records a single transaction at the current simulation time.
+        Args:
+            op (int): Operation code (one of the OP_* constants).
+            data (int): Written or read data.
+            expected (int): Expected data for reads.
+            flags (int): Transaction flags (FLAG_* constants). FLAG_MISMATCH is added for mismatched reads.
+        """
+        if op == OP_READ and data != expected:
+            flags |= FLAG_MISMATCH
+        index = self.count % self.depth
+        self._sim_steps[index] = get_sim_time("step")
+        self._op[index] = op
+        self._data[index] = data
+        self._expected[index] = expected
+        self._flags[index] = flags
+        self.count += 1
+
+        if self.full_trace:
+            self.dut._log.info("%s", self._format(index))
+        # Stream out the ring buffer before it's overwritten
+        if self._stream is not None and self.count - self._flushed == self.depth:
+            self.flush()
+
+    def _ordered_indices(self, last=None):
+        """
+        Returns the ring buffer indices of the last `last` transactions, oldest first.
+        """
+        available = min(self.count, self.depth)
+        last = available if last is None else min(last, available)
+        return [(self.count - last + i) % self.depth for i in range(last)]
+
+    def _format(self, index):
+        """
+        Formats a single ring buffer entry.
+        """
+        time_ns = get_time_from_sim_steps(int(self._sim_steps[index]), "ns")
+        op = int(self._op[index])
+        text = f"[{time_ns} ns] {OP_NAMES[op]}"
+        if op in (OP_WRITE, OP_WRITE_SKIPPED):
+            text += f" 0x{int(self._data[index]):X}"
+        elif op == OP_READ:
+            text += f" Expected: 0x{int(self._expected[index]):X}, Actual: 0x{int(self._data[index]):X}"
+            if self._flags[index] & FLAG_MISMATCH:
+                text += " MISMATCH"
+        return text
+
+    def dump(self, last=None):
+        """
+        Logs the last `last` recorded transactions (default: the whole ring buffer), oldest first.
+        """
+        indices = self._ordered_indices(last)
+        self.dut._log.info(f"Last {len(indices)} of {self.count} transactions:")
+        for index in indices:
+            self.dut._log.info(self._format(index))
+
+    def flush(self):
+        """
+        Writes all transactions not yet streamed to the stream file (if any).
+        """
+        if self._stream is None:
+            return
+        pending = self.count - self._flushed
+        if pending <= 0:
+            return
+        indices = self._ordered_indices(pending)
+        records = np.zeros(len(indices), dtype=STREAM_DTYPE)
+        records["sim_steps"] = self._sim_steps[indices]
+        records["op"] = self._op[indices]
+        records["data"] = self._data[indices]
+        records["expected"] = self._expected[indices]
+        records["flags"] = self._flags[indices]
+        if self._stream_csv:
+            np.savetxt(self._stream, records, fmt="%d", delimiter=",")
+        else:
+            records.tofile(self._stream)
+        self._flushed = self.count
+
+    def close(self):
+        """
+        Flushes and closes the stream file (if any).
+        """
+        if self._stream is not None:
+            self.flush()
+            self._stream.close()
+            self._stream = None
+
+
+def _release_recorders(first_recorder):
+    """
+    Closes the recorders created since _recorders had first_recorder entries, and unregisters them.
+    """
+    for recorder in _recorders[first_recorder:]:
+        recorder.close()
+    del _recorders[first_recorder:]
+
+
+def dump_transactions_on_failure(test_function):
+    """
+    Decorator for cocotb test coroutines that dumps the recent transactions of every
+    recorder created during the test if the test raises an exception (e.g. a failed assertion).
+    The recorders are closed and unregistered when the test ends.
+    Place it below the @cocotb.test() decorator.
+    """
+    @functools.wraps(test_function)
+    async def wrapper(dut, *args, **kwargs):
+        first_recorder = len(_recorders)
+        try:
+            return await test_function(dut, *args, **kwargs)
+        except Exception:
+            for recorder in _recorders[first_recorder:]:
+                recorder.dump()
+            raise
+        finally:
+            _release_recorders(first_recorder)
+    return wrapper
+
+
+def release_transaction_recorders(test_function):
+    """
+    Decorator for cocotb test coroutines that dump the transactions of failures themselves (with dump_transactions),
+    which only closes and unregisters the recorders created during the test when it ends.
+    """
+    @functools.wraps(test_function)
+    async def wrapper(dut, *args, **kwargs):
+        first_recorder = len(_recorders)
+        try:
+            return await test_function(dut, *args, **kwargs)
+        finally:
+            _release_recorders(first_recorder)
+    return wrapper
+
+
+def dump_transactions(dut):
+    """
+    Dumps the recent transactions of every recorder of a DUT, e.g. of a single failing instance of a batch
+    simulation (see batch.py), where dump_transactions_on_failure would dump all the instances.
+    """
+    for recorder in _recorders:
+        if recorder.dut is dut:
+            recorder.dump()
+
+
+@atexit.register
+def _close_recorders():
+    for recorder in _recorders:
+        recorder.close()
@@ -0,0 +1,192 @@
+import cocotb
+from cocotb.triggers import RisingEdge, ReadOnly, Timer
+from cocotb.utils import get_sim_time
+import atexit
+import os
+from collections import deque
+
+# Testbench-side waveform capture, used instead of a full Verilator trace for long runs.
+#
+# The waveform mode is selected with the WAVES variable of scripts/make/cocotb.mk (exported to the
+# testbench), or per testbench with the `mode` argument:
+# - "vcd"/"fst": Full trace written by Verilator (dump.vcd/dump.fst). Nothing is captured here.
+# - "off": No waveforms at all.
+# - "window": The selected signals are sampled every clock cycle inside a sim-time window
+#     (WAVES_WINDOW="<start_ns>:<end_ns>", either bound can be empty) and streamed to waves_window.vcd.
+#     Nothing is sampled outside the window: the capture sleeps until the start and stops after the end.
+# - "trigger": The last WAVES_DEPTH (default 1024) cycles are kept in a rolling buffer, and written
+#     to waves_trigger.vcd only when trigger() is called -- by the scoreboard on its first mismatch.
+#
+# Samples are taken once per clock cycle (after the rising edge, in the ReadOnly phase), so the
+# captured waveforms show the register-level state of each cycle rather than every delta.
+# Output files are placed in RESULTS_DIR.
+
+CAPTURE_MODES = ("window", "trigger")
+WAVES_MODES = ("off", "vcd", "fst") + CAPTURE_MODES
+
+# Shared by every capture in this simulation process
+_window_stream = None  # Open waves_window.vcd file (header written once)
+_triggered = False  # Only the first trigger is written
+
+
+def _parse_window(window):
+    """
+    Parses a "<start_ns>:<end_ns>" window. Missing bounds are open.
+    Returns:
+        tuple: (start_ns, end_ns) with None for open bounds.
+    """
+    if not window:
+        return (None, None)
+    start, _, end = window.partition(":")
+    return (float(start) if start.strip() else None, float(end) if end.strip() else None)
+
+
+class waveform_capture:
+
+    def __init__(self, dut, signals, mode=None, window=None, depth=None):
+        """
+        Args:
+            dut: cocotb DUT handle (must have a `clk` signal).
+            signals (list): Names of the DUT signals to capture.
+            mode (str): Waveform mode (see above). Defaults to the WAVES environment variable, or "vcd".
+            window (tuple): (start_ns, end_ns) for window mode. Defaults to WAVES_WINDOW.
+            depth (int): Rolling buffer depth in cycles for trigger mode. Defaults to WAVES_DEPTH.
+        """
+        self.dut = dut
+        self.mode = mode if mode is not None else os.getenv("WAVES", "vcd")
+        if self.mode not in WAVES_MODES:
+            raise ValueError(f"Invalid WAVES mode: {self.mode}. Must be one of {', '.join(WAVES_MODES)}.")
+        self.window = window if window is not None else _parse_window(os.getenv("WAVES_WINDOW", ""))
+        self.depth = depth if depth is not None else int(os.getenv("WAVES_DEPTH") or "1024")  # Exported empty by cocotb.mk when unset
+        self.results_dir = os.getenv("RESULTS_DIR", ".")
+
+        self._handles = [getattr(dut, name) for name in signals]
+        # VCD variables: (identifier code, name, width)
+        self._vars = [(self._identifier(i), name, len(handle)) for i, (name, handle) in enumerate(zip(signals, self._handles))]
+        self._buffer = deque(maxlen=self.depth)
+        self._previous = None  # Last values written to the window stream
+        self._task = None
+
+    @property
+    def active(self):
+        return self.mode in CAPTURE_MODES
+
+    @staticmethod
+    def _identifier(index):
+        """
+        Returns a short printable VCD identifier code for a variable index.
+        """
+        code = ""
+        index += 1
+        while index:
+            index, digit = divmod(index - 1, 94)
+            code += chr(33 + digit)
+        return code
+
+    def start(self):
+        """
+        Starts sampling (only in the window and trigger modes).
+        """
+        if self.active and self._task is None:
+            self._task = cocotb.start_soon(self._run())
+        return self._task
+
+    def set_window(self, start_ns=None, end_ns=None):
+        """
+        Changes the capture window (window mode). Open bounds are None.
+        Takes effect at the next sample, or at the old start if the capture is still waiting for it.
+        """
+        self.window = (start_ns, end_ns)
+        if self.mode == "window" and self._task is not None and self._task.done():
+            self._task = None
+            self.start()
+
+    async def _run(self):
+        if self.mode == "window":
+            await self._run_window()
+        else:
+            await self._run_trigger()
+
+    async def _run_window(self):
+        handles = self._handles
+        clk_edge = RisingEdge(self.dut.clk)
+        read_only = ReadOnly()
+
+        while True:
+            start_ns, end_ns = self.window
+            time_ns = get_sim_time("ns")
+            if end_ns is not None and time_ns > end_ns:
+                return
+            if start_ns is not None and time_ns < start_ns:
+                await Timer(start_ns - time_ns, "ns", round_mode="ceil")
+                continue
+            await clk_edge
+            await read_only
+            time_ps = int(get_sim_time("ps"))
+            if end_ns is not None and time_ps > end_ns * 1000:
+                return
+            self._write_window_sample(time_ps, tuple([handle.value.binstr for handle in handles]))
+
+    async def _run_trigger(self):
+        handles = self._handles
+        clk_edge = RisingEdge(self.dut.clk)
+        read_only = ReadOnly()
+        append = self._buffer.append
+
+        while True:
+            await clk_edge
+            await read_only
+            append((int(get_sim_time("ps")), tuple([handle.value.binstr for handle in handles])))
+
+    def _write_header(self, f):
+        f.write("$timescale 1ps $end\n")
+        f.write(f"$scope module {self.dut._name} $end\n")
+        for code, name, width in self._vars:
+            f.write(f"$var wire {width} {code} {name} $end\n")
+        f.write("$upscope $end\n$enddefinitions $end\n")
+
+    def _write_sample(self, f, time_ps, values, previous):
+        f.write(f"#{time_ps}\n")
+        for (code, _, width), value, previous_value in zip(self._vars, values, previous or [None] * len(values)):
+            if value == previous_value:
+                continue
+            f.write(f"{value.lower()}{code}\n" if width == 1 else f"b{value.lower()} {code}\n")
+
+    def _write_window_sample(self, time_ps, values):
+        global _window_stream
+        if _window_stream is None:
+            os.makedirs(self.results_dir, exist_ok=True)
+            _window_stream = open(os.path.join(self.results_dir, "waves_window.vcd"), "w")
+            self._write_header(_window_stream)
+        self._write_sample(_window_stream, time_ps, values, self._previous)
+        self._previous = values
+
+    def trigger(self, reason=""):
+        """
+        Writes the rolling buffer to waves_trigger.vcd (trigger mode, first trigger of the simulation only).
+        """
+        global _triggered
+        if self.mode != "trigger" or _triggered:
+            return
+        _triggered = True
+        # Include the current cycle if the sampling coroutine hasn't reached it yet
+        time_ps = int(get_sim_time("ps"))
+        if not self._buffer or self._buffer[-1][0] < time_ps:
+            self._buffer.append((time_ps, tuple(handle.value.binstr for handle in self._handles)))
+        os.makedirs(self.results_dir, exist_ok=True)
+        path = os.path.join(self.results_dir, "waves_trigger.vcd")
+        with open(path, "w") as f:
+            if reason:
+                f.write(f"$comment {reason} $end\n")
+            self._write_header(f)
+            previous = None
+            for time_ps, values in self._buffer:
+                self._write_sample(f, time_ps, values, previous)
+                previous = values
+        self.dut._log.info(f"Wrote the last {len(self._buffer)} cycles of waveforms to {path}")
+
+
+@atexit.register
+def _close_window_stream():
+    if _window_stream is not None:
+        _window_stream.close()
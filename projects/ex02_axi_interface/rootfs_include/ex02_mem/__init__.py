@@ -0,0 +1,3 @@
+# Python host library for the ex02 AXI interfaces (CFG/STS registers, FIFO and BRAM), see memory_map.py
+from .memory_map import (memory_map, cfg_register, sts_register, fifo_port, bram_port, decode_fifo_status, FifoStatus,
+                         AXI_CFG, AXI_STS, AXI_FIFO, AXI_BRAM, CFG_SIZE, STS_SIZE, FIFO_SIZE, BRAM_DEPTH, BRAM_SIZE)
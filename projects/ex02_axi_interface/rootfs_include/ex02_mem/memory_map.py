@@ -0,0 +1,314 @@
+import mmap
+import os
+import stat
+import time
+from collections import namedtuple
+import numpy as np
+
+# Python access to the ex02 AXI interfaces from the PS, like software/mem-test/mem-test.c: the
+# regions are mapped from /dev/mem, and exposed as NumPy uint32 views over the mappings.
+#
+# Access strategy: on a device mapping (a character device such as /dev/mem, opened O_SYNC), every
+# access is one aligned 32-bit load or store of a single uint32 element, in order, like mem-test.c's
+# volatile pointers. NumPy slice copies are never used there: they're memcpy, which doesn't guarantee
+# the width, number or order of its accesses, and may use overlapping, unaligned or wide (SIMD)
+# accesses that fault on device memory or drop and duplicate FIFO words. The price is a Python loop
+# per word: about 0.25 us per word on an x86 host (16 Ki BRAM words in 4 ms, against microseconds
+# for a copy), and more on the Zynq's Cortex-A9. On a plain file or anonymous memory, which are
+# ordinary memory, BRAM and register transfers are single NumPy copies (word_access=False). The FIFO
+# is always accessed one word at a time, since every access to it pops or pushes a word.
+#
+# The device path is configurable (device=..., or $EX02_MEM_DEVICE), so the library can be tried on
+# a development machine against a plain file, or against anonymous memory with device=None.
+
+# Addresses are defined in the hardware design Tcl file (block_design.tcl)
+AXI_CFG = 0x40000000
+AXI_STS = 0x41000000
+AXI_FIFO = 0x42000000
+AXI_BRAM = 0x43000000
+
+CFG_SIZE = 96 // 8  # Size of the configuration register in bytes
+STS_SIZE = 64 // 8  # Size of the status register in bytes
+FIFO_SIZE = 128  # Size of the FIFO's address range in bytes (every word of it is the FIFO)
+BRAM_DEPTH = 16384  # 16Ki 32-bit words of BRAM
+BRAM_SIZE = BRAM_DEPTH * 32 // 8  # Size of BRAM in bytes
+
+DEFAULT_DEVICE = "/dev/mem"
+
+# Decoded FIFO status word (STS bits 63:32)
+FifoStatus = namedtuple("FifoStatus", ["wr_count", "full", "overflow", "rd_count", "empty", "underflow"])
+
+
+def decode_fifo_status(word):
+    """
+    Decodes a FIFO status word, like mem-test.c's wr_count(), is_full(), etc.
+    Works on a single word or elementwise on a NumPy array of words.
+    """
+    return FifoStatus(
+        wr_count=word & 0b11111,
+        full=(word >> 5) & 0b1,
+        overflow=(word >> 6) & 0b1,
+        rd_count=(word >> 7) & 0b11111,
+        empty=(word >> 12) & 0b1,
+        underflow=(word >> 13) & 0b1,
+    )
+
+
+def _read_words(words, index, count, out, word_access):
+    """
+    Copies words[index:index + count] into out[:count], one 32-bit load per word if `word_access`.
+    """
+    if word_access:
+        for offset in range(count):
+            out[offset] = words[index + offset]
+    else:
+        out[:count] = words[index:index + count]
+
+
+def _write_words(words, index, values, word_access):
+    """
+    Copies `values` into words[index:], one 32-bit store per word if `word_access`.
+    """
+    if word_access:
+        for offset, value in enumerate(values):
+            words[index + offset] = value
+    else:
+        words[index:index + len(values)] = values
+
+
+class cfg_register:
+    """
+    CFG register: words 0 and 1 are the NAND inputs (software/reg-test), bit 0 of word 2 is the FIFO reset.
+    """
+
+    def __init__(self, words):
+        self.words = words  # uint32 view of the register
+
+    @property
+    def nand_inputs(self):
+        return int(self.words[0]), int(self.words[1])
+
+    @nand_inputs.setter
+    def nand_inputs(self, values):
+        self.words[0], self.words[1] = values  # Two 32-bit stores
+
+    def fifo_reset(self, hold=10e-6):
+        """
+        Resets the FIFO like mem-test.c's freset: sets the reset bit, waits `hold` seconds, and clears it.
+        """
+        self.words[2] |= 0b1
+        time.sleep(hold)
+        self.words[2] &= ~np.uint32(0b1)
+
+
+class sts_register:
+    """
+    STS register: word 0 is the NAND result, word 1 is the FIFO status word.
+    Each bitfield property reads the status word again; use fifo_status() for a consistent snapshot.
+    """
+
+    def __init__(self, words):
+        self.words = words  # uint32 view of the register
+
+    @property
+    def nand_result(self):
+        return int(self.words[0])
+
+    @property
+    def fifo_word(self):
+        return int(self.words[1])
+
+    def fifo_status(self):
+        """
+        Reads the FIFO status word once and decodes it.
+        """
+        return decode_fifo_status(self.fifo_word)
+
+    @property
+    def wr_count(self):
+        return self.fifo_status().wr_count
+
+    @property
+    def rd_count(self):
+        return self.fifo_status().rd_count
+
+    @property
+    def full(self):
+        return bool(self.fifo_status().full)
+
+    @property
+    def empty(self):
+        return bool(self.fifo_status().empty)
+
+    @property
+    def overflow(self):
+        return bool(self.fifo_status().overflow)
+
+    @property
+    def underflow(self):
+        return bool(self.fifo_status().underflow)
+
+
+class fifo_port:
+    """
+    FIFO through axi_fifo_bridge. The bridge ignores the address, so every word of the FIFO's address range
+    is the FIFO, and every 32-bit access pops (or pushes) one word.
+    Bulk copies (NumPy slice assignment, i.e. memcpy) aren't allowed here: memcpy doesn't guarantee the
+    width, number or order of its accesses, and may use overlapping or wide (SIMD) loads and stores, which
+    would drop or duplicate FIFO words, or fault on device memory. Each word is instead one aligned 32-bit
+    load (or store) of a uint32 element, in order, stepping through the address range.
+    Reads from an empty FIFO and writes to a full one get SLVERR on the bus (a bus error on the PS), so
+    read() and write() should stay within the counts given by the status register (see drain()).
+    """
+
+    def __init__(self, words, sts):
+        self.words = words  # uint32 view of the FIFO's address range
+        self.sts = sts
+        self.window = len(words)
+
+    def read(self, count, out=None):
+        """
+        Reads `count` words from the FIFO into `out` (a preallocated uint32 array, or a new one).
+        Returns:
+            numpy.ndarray: The words read (a view of `out`).
+        """
+        if out is None:
+            out = np.empty(count, dtype=np.uint32)
+        elif len(out) < count:
+            raise ValueError(f"Output buffer too small: {len(out)} words for {count}")
+        words = self.words
+        window = self.window
+        for index in range(count):
+            out[index] = words[index % window]  # One 32-bit load per word
+        return out[:count]
+
+    def write(self, values):
+        """
+        Writes an array of words to the FIFO, in order.
+        """
+        values = np.asarray(values, dtype=np.uint32)
+        words = self.words
+        window = self.window
+        for index, value in enumerate(values):
+            words[index % window] = value  # One 32-bit store per word
+
+    def drain(self, out=None):
+        """
+        Reads the status word once, and reads all the words it reports.
+        Returns:
+            numpy.ndarray: The words read (a view of `out` if given).
+        """
+        count = int(self.sts.fifo_status().rd_count)
+        return self.read(count, out)
+
+
+class bram_port:
+    """
+    BRAM through axi_bram_ctrl. Offsets are in bytes (like mem-test.c's bread/bwrite) and must be word aligned.
+    With `word_access`, transfers are one aligned 32-bit access per word (device mappings), otherwise NumPy copies.
+    """
+
+    def __init__(self, words, word_access=True):
+        self.words = words  # uint32 view of the BRAM
+        self.word_access = word_access
+
+    def _index(self, offset, count):
+        if offset % 4:
+            raise ValueError(f"BRAM offset {offset} is not word aligned")
+        index = offset // 4
+        if index < 0 or index + count > len(self.words):
+            raise ValueError(f"BRAM access of {count} words at offset {offset} is out of range (0-{len(self.words) * 4 - 1})")
+        return index
+
+    def read(self, offset, count, out=None):
+        """
+        Reads `count` words starting at byte `offset` into `out` (a preallocated uint32 array, or a new one).
+        Returns:
+            numpy.ndarray: The words read (a view of `out`).
+        """
+        index = self._index(offset, count)
+        if out is None:
+            out = np.empty(count, dtype=np.uint32)
+        elif len(out) < count:
+            raise ValueError(f"Output buffer too small: {len(out)} words for {count}")
+        _read_words(self.words, index, count, out, self.word_access)
+        return out[:count]
+
+    def write(self, offset, values):
+        """
+        Writes an array of words starting at byte `offset`.
+        """
+        values = np.asarray(values, dtype=np.uint32)
+        index = self._index(offset, len(values))
+        _write_words(self.words, index, values, self.word_access)
+
+
+class memory_map:
+    """
+    Maps the ex02 regions and exposes them as cfg, sts, fifo and bram.
+    Usable as a context manager, which unmaps the regions on exit.
+    """
+
+    def __init__(self, device=DEFAULT_DEVICE, addresses=None, word_access=None):
+        """
+        Args:
+            device (str): Memory device or file to map, default $EX02_MEM_DEVICE or /dev/mem.
+                None maps anonymous memory instead (for trying the library without hardware).
+            addresses (dict): Physical address of each region ("cfg", "sts", "fifo", "bram"), to override the
+                block design's (e.g. to map a small plain file). Must be page aligned.
+            word_access (bool): Access the BRAM one aligned 32-bit word at a time instead of with NumPy copies.
+                Defaults to True for character devices (/dev/mem), and False for plain files and anonymous memory.
+        """
+        if device == DEFAULT_DEVICE:
+            device = os.getenv("EX02_MEM_DEVICE", DEFAULT_DEVICE)
+        self.device = device
+        self.addresses = {"cfg": AXI_CFG, "sts": AXI_STS, "fifo": AXI_FIFO, "bram": AXI_BRAM}
+        self.addresses.update(addresses or {})
+        sizes = {"cfg": CFG_SIZE, "sts": STS_SIZE, "fifo": FIFO_SIZE, "bram": BRAM_SIZE}
+
+        self._maps = []
+        views = {}
+        fd = None
+        if device is not None:
+            # O_SYNC makes /dev/mem mappings uncached
+            fd = os.open(device, os.O_RDWR | getattr(os, "O_SYNC", 0))
+        if word_access is None:
+            word_access = fd is not None and stat.S_ISCHR(os.fstat(fd).st_mode)
+        self.word_access = word_access
+        try:
+            for name, size in sizes.items():
+                length = -(-size // mmap.PAGESIZE) * mmap.PAGESIZE
+                if fd is None:
+                    region = mmap.mmap(-1, length)
+                else:
+                    region = mmap.mmap(fd, length, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE,
+                                       offset=self.addresses[name])
+                self._maps.append(region)
+                views[name] = np.frombuffer(region, dtype=np.uint32, count=size // 4)
+        finally:
+            # The mappings stay valid after the file is closed
+            if fd is not None:
+                os.close(fd)
+
+        self.cfg = cfg_register(views["cfg"])
+        self.sts = sts_register(views["sts"])
+        self.fifo = fifo_port(views["fifo"], self.sts)
+        self.bram = bram_port(views["bram"], word_access)
+
+    def close(self):
+        """
+        Unmaps the regions. The views (and any arrays viewing them) must not be used afterwards.
+        """
+        self.cfg = self.sts = self.fifo = self.bram = None
+        for region in self._maps:
+            try:
+                region.close()
+            except BufferError:
+                pass  # Still viewed elsewhere, unmapped when the last view is released
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
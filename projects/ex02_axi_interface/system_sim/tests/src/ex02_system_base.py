@@ -0,0 +1,283 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
+import json
+import os
+from collections import deque
+from axi_address_map import axi_address_map
+from axi_lite_bfm import RESP_OKAY, RESP_SLVERR
+
+# Addresses in the PS address space (block_design.tcl, as used by software/mem-test/mem-test.c)
+AXI_CFG = 0x40000000
+AXI_STS = 0x41000000
+AXI_FIFO = 0x42000000
+AXI_BRAM = 0x43000000  # Not simulated
+
+# CFG bits 63:0 and STS bits 31:0 are the NAND example (software/reg-test/reg-test.c),
+#   so the FIFO's reset bit and status word are one word further (like mem-test.c's cfg + 8 and sts + 4)
+NAND_CFG_A = AXI_CFG
+NAND_CFG_B = AXI_CFG + 4
+NAND_STS = AXI_STS
+FIFO_CFG = AXI_CFG + 8
+FIFO_STS = AXI_STS + 4
+
+# Region names in the generated address map (the interfaces' addr targets in block_design.tcl)
+FIFO_REGION = "axi_fifo_module/S_AXI"
+# Instance of the FIFO in the generated system top
+FIFO_INSTANCE = "axi_fifo_module_fifo"
+
+# Cycles for a proc_sys_reset to release its outputs after its input deasserts (see scripts/cocotb/ip_models.v)
+RESET_RELEASE_CYCLES = 24
+# How long mem-test.c's freset holds the FIFO reset bit (usleep(10))
+FIFO_RESET_HOLD_NS = 10000
+
+# Commands of mem-test.c that can be replayed (bwrite and bread need the BRAM, which isn't simulated)
+WORKLOAD_ARGS = {"freset": (0, 0), "fstatus": (0, 0), "fread": (1, 1), "fwrite": (1, 2)}
+
+
+def decode_fifo_status(word):
+    """
+    Decodes the FIFO status word (STS bits 63:32), like mem-test.c.
+    """
+    return {
+        "wr_count": word & 0b11111,
+        "full": (word >> 5) & 0b1,
+        "overflow": (word >> 6) & 0b1,
+        "rd_count": (word >> 7) & 0b11111,
+        "empty": (word >> 12) & 0b1,
+        "underflow": (word >> 13) & 0b1,
+    }
+
+
+def read_workload(path):
+    """
+    Reads a workload file of mem-test.c commands (freset, fstatus, fread <num>, fwrite <val> [incr_num]),
+    one per line, with # comments. Numbers are decimal, like mem-test.c. "help" is ignored and "exit" ends the workload.
+    Returns:
+        list: (line number, command, [arguments]) tuples.
+    """
+    commands = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            words = line.split("#", 1)[0].split()
+            if not words or words[0] == "help":
+                continue
+            command, args = words[0], words[1:]
+            if command == "exit":
+                break
+            if command in ("bwrite", "bread"):
+                raise ValueError(f"{path}:{line_number}: {command} is not supported (the BRAM is not simulated)")
+            if command not in WORKLOAD_ARGS:
+                raise ValueError(f"{path}:{line_number}: Unknown command: {command}")
+            min_args, max_args = WORKLOAD_ARGS[command]
+            if not min_args <= len(args) <= max_args:
+                raise ValueError(f"{path}:{line_number}: {command} takes {min_args}-{max_args} arguments, got {len(args)}")
+            try:
+                commands.append((line_number, command, [int(arg, 10) for arg in args]))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: Invalid number in: {line.strip()}")
+    return commands
+
+
+class ex02_system_base:
+
+    def __init__(self, dut, clk_period=None, time_unit="ns", fifo_outstanding=1):
+        """
+        Args:
+            dut: DUT handle of the generated system_top.
+            clk_period: FCLK_CLK0 period. Defaults to $SYSTEM_CLK_PERIOD, or 10 (100 MHz, like the PS configuration).
+            fifo_outstanding (int): Maximum number of FIFO transactions in flight per direction (0 for no limit).
+                The CFG and STS registers always get one at a time (they drop back-to-back responses).
+        """
+        self.dut = dut
+        self.clk_period = float(clk_period or os.getenv("SYSTEM_CLK_PERIOD", 10))
+        self.time_unit = time_unit
+
+        self.FIFO_DEPTH = 2**int(getattr(self.dut, FIFO_INSTANCE).ADDR_WIDTH.value)
+        self.dut._log.info(f"SYSTEM PARAMETERS: FCLK_CLK0 period={self.clk_period} {time_unit}, FIFO_DEPTH={self.FIFO_DEPTH}")
+
+        # Testbench side of the AXI interconnect (see scripts/cocotb/axi_address_map.py)
+        self.bus = axi_address_map(self.dut, self.dut.fclk_clk0, max_outstanding={FIFO_REGION: fifo_outstanding})
+
+        # Expected FIFO contents and sticky flags, for checking reads and status words
+        self.fifo_model = deque()
+        self.fifo_overflow = False
+        self.fifo_underflow = False
+
+        # Start the clock and the bus
+        cocotb.start_soon(Clock(self.dut.fclk_clk0, self.clk_period, units=time_unit).start())
+        self.bus.start()
+        self.dut.fclk_reset0_n.value = 1
+
+    async def wait_cycles(self, cycles):
+        for _ in range(cycles):
+            await RisingEdge(self.dut.fclk_clk0)
+
+    async def reset(self):
+        """
+        Resets the system like a power-on: PS reset (FCLK_RESET0_N), then a FIFO reset through CFG,
+        since the FIFO has its own reset manager that the PS reset doesn't reach.
+        """
+        await RisingEdge(self.dut.fclk_clk0)
+        self.dut._log.info("STARTING RESET")
+        self.dut.fclk_reset0_n.value = 0
+        self.bus.reset()
+        await self.wait_cycles(4)
+        self.dut.fclk_reset0_n.value = 1
+        await self.wait_cycles(RESET_RELEASE_CYCLES)
+        await self.fifo_reset(hold_ns=4 * self.clk_period)
+        self.dut._log.info("RESET COMPLETE")
+
+    async def fifo_reset(self, hold_ns=FIFO_RESET_HOLD_NS):
+        """
+        Resets the FIFO like mem-test.c's freset: sets CFG bit 64 (read-modify-write), waits, and clears it.
+        Also waits for the FIFO's reset manager to release the reset, so the FIFO can be accessed right after.
+        """
+        cfg = (await self.bus.read(FIFO_CFG)).data
+        await self.bus.write(FIFO_CFG, cfg | 0b1)
+        await Timer(hold_ns, units="ns")
+        await self.bus.write(FIFO_CFG, cfg & ~0b1)
+        await self.wait_cycles(RESET_RELEASE_CYCLES)
+        self.fifo_model.clear()
+        self.fifo_overflow = False
+        self.fifo_underflow = False
+
+    async def fifo_status(self):
+        """
+        Reads and decodes the FIFO status word (see decode_fifo_status).
+        """
+        return decode_fifo_status((await self.bus.read(FIFO_STS)).data)
+
+    def expected_fifo_status(self):
+        """
+        The FIFO status word expected from the model.
+        """
+        count = len(self.fifo_model)
+        return {
+            "wr_count": count & 0b11111,
+            "full": int(count == self.FIFO_DEPTH),
+            "overflow": int(self.fifo_overflow),
+            "rd_count": count & 0b11111,
+            "empty": int(count == 0),
+            "underflow": int(self.fifo_underflow),
+        }
+
+    async def fifo_write(self, values, pipelined=False):
+        """
+        Writes words to the FIFO, one at a time (like the PS's stores) or queued back-to-back, and checks the
+        responses: OKAY while the FIFO has room, SLVERR (setting the overflow flag) when it's full.
+        Returns:
+            tuple: (transactions, number of mismatched responses)
+        """
+        if pipelined:
+            transactions = [self.bus.write_nowait(AXI_FIFO, value) for value in values]
+            await self.bus.wait_idle()
+        else:
+            transactions = [await self.bus.write(AXI_FIFO, value) for value in values]
+        mismatches = 0
+        for txn in transactions:
+            if len(self.fifo_model) < self.FIFO_DEPTH:
+                self.fifo_model.append(txn.data)
+                expected = RESP_OKAY
+            else:
+                self.fifo_overflow = True
+                expected = RESP_SLVERR
+            if txn.resp != expected:
+                mismatches += 1
+                self.dut._log.error(f"FIFO write of 0x{txn.data:08X}: expected resp {expected}, got {txn.resp}")
+        return transactions, mismatches
+
+    async def fifo_read(self, count, pipelined=False):
+        """
+        Reads words from the FIFO, one at a time (like the PS's loads) or queued back-to-back, and checks the
+        responses: the written data in order while the FIFO has some, SLVERR with zero data (setting the
+        underflow flag) when it's empty.
+        Returns:
+            tuple: (transactions, number of mismatched responses)
+        """
+        if pipelined:
+            transactions = [self.bus.read_nowait(AXI_FIFO) for _ in range(count)]
+            await self.bus.wait_idle()
+        else:
+            transactions = [await self.bus.read(AXI_FIFO) for _ in range(count)]
+        mismatches = 0
+        for txn in transactions:
+            if self.fifo_model:
+                expected = (RESP_OKAY, self.fifo_model.popleft())
+            else:
+                self.fifo_underflow = True
+                expected = (RESP_SLVERR, 0)
+            if (txn.resp, txn.data) != expected:
+                mismatches += 1
+                self.dut._log.error(f"FIFO read: expected resp {expected[0]} with 0x{expected[1]:08X}, got {txn}")
+        return transactions, mismatches
+
+    async def run_workload(self, commands, pipelined=False):
+        """
+        Replays mem-test.c commands (see read_workload) against the system, checking every FIFO response and
+        status word against the model. In pipelined mode, the words of each fread/fwrite are queued back-to-back
+        instead of one at a time. Commands run in order, each one after the previous one completes.
+        Returns:
+            dict: Word and response counts, mismatches, simulated time (total and in fread/fwrite),
+                  and the throughput in FIFO words per simulated second.
+        """
+        result = {"commands": len(commands), "pipelined": pipelined, "fifo_writes": 0, "fifo_reads": 0,
+                  "okay": 0, "slverr": 0, "mismatches": 0}
+        start_time = get_sim_time(units="ns")
+        fifo_time = 0
+        for line_number, command, args in commands:
+            if command == "freset":
+                await self.fifo_reset()
+                continue
+            if command == "fstatus":
+                status = await self.fifo_status()
+                expected = self.expected_fifo_status()
+                if status != expected:
+                    result["mismatches"] += 1
+                    self.dut._log.error(f"Line {line_number} (fstatus): expected {expected}, got {status}")
+                continue
+
+            command_start = get_sim_time(units="ns")
+            if command == "fwrite":
+                count = args[1] if len(args) > 1 else 1
+                transactions, mismatches = await self.fifo_write([(args[0] + i) & 0xFFFFFFFF for i in range(count)], pipelined)
+                result["fifo_writes"] += len(transactions)
+            else:
+                transactions, mismatches = await self.fifo_read(args[0], pipelined)
+                result["fifo_reads"] += len(transactions)
+            fifo_time += get_sim_time(units="ns") - command_start
+            if mismatches:
+                self.dut._log.error(f"Line {line_number} ({command} {' '.join(map(str, args))}): {mismatches} mismatched responses")
+            result["mismatches"] += mismatches
+            result["okay"] += sum(1 for txn in transactions if txn.resp == RESP_OKAY)
+            result["slverr"] += sum(1 for txn in transactions if txn.resp == RESP_SLVERR)
+
+        sim_time = get_sim_time(units="ns") - start_time
+        words = result["fifo_writes"] + result["fifo_reads"]
+        result.update({
+            "sim_time_ns": sim_time,
+            "fifo_time_ns": fifo_time,
+            "cycles": round(sim_time / self.clk_period),
+            "words_per_second": words / (sim_time * 1e-9) if sim_time else 0.0,
+            "fifo_words_per_second": words / (fifo_time * 1e-9) if fifo_time else 0.0,
+        })
+        return result
+
+    def record_workload(self, name, result):
+        """
+        Logs the results of a workload and merges them into $RESULTS_DIR/system_workload.json.
+        """
+        self.dut._log.info(
+            f"Workload {name}: {result['fifo_writes']} FIFO writes and {result['fifo_reads']} reads "
+            f"({result['okay']} OKAY, {result['slverr']} SLVERR, {result['mismatches']} mismatches) in "
+            f"{result['sim_time_ns']:.0f} ns, {result['words_per_second'] / 1e6:.2f} Mwords/s overall, "
+            f"{result['fifo_words_per_second'] / 1e6:.2f} Mwords/s in fread/fwrite")
+        results_file = os.path.join(os.getenv("RESULTS_DIR", "."), "system_workload.json")
+        results = {}
+        if os.path.exists(results_file):
+            with open(results_file) as f:
+                results = json.load(f)
+        results[name] = result
+        with open(results_file, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,3 @@
+# System-level simulation of ex02: the project's cores wired like block_design.tcl, behind the address map
+#   of the PS (generated by scripts/make/gen_system_top.py, see scripts/make/system_sim.mk)
+include $(REPO_DIR)/scripts/make/system_sim.mk
@@ -0,0 +1,120 @@
+import cocotb
+import glob
+import os
+import random
+from ex02_system_base import (ex02_system_base, read_workload, AXI_BRAM, NAND_CFG_A, NAND_CFG_B, NAND_STS,
+                              FIFO_CFG)
+from axi_lite_bfm import RESP_OKAY
+
+# System-level tests of ex02: the CFG/STS registers, the NAND module and the FIFO module wired like
+# block_design.tcl (see scripts/make/system_sim.mk), accessed through the PS address map like the
+# software does. Workload results are written to $RESULTS_DIR/system_workload.json.
+#
+# Workloads are files of mem-test.c commands (workloads/*.txt by default, or the comma-separated
+# files in $SYSTEM_WORKLOAD), replayed one access at a time like the PS, and pipelined.
+
+WORKLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workloads")
+
+
+def workload_files():
+    if os.getenv("SYSTEM_WORKLOAD"):
+        return [path.strip() for path in os.getenv("SYSTEM_WORKLOAD").split(",") if path.strip()]
+    return sorted(glob.glob(os.path.join(WORKLOAD_DIR, "*.txt")))
+
+# Create a setup function that can be called by each test
+async def setup_testbench(dut, fifo_outstanding=1):
+    tb = ex02_system_base(dut, fifo_outstanding=fifo_outstanding)
+    return tb
+
+# Test the reset state: CFG cleared, FIFO empty with no overflow/underflow, BRAM not mapped
+@cocotb.test()
+async def test_reset(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Reset")
+
+    for offset in range(0, 12, 4):
+        txn = await tb.bus.read(NAND_CFG_A + offset)
+        assert txn.resp == RESP_OKAY and txn.data == 0, f"CFG word {offset // 4} should be 0 after reset, got {txn}"
+    status = await tb.fifo_status()
+    assert status == tb.expected_fifo_status(), f"FIFO should be empty after reset, got {status}"
+
+    try:
+        tb.bus.read_nowait(AXI_BRAM)
+    except ValueError:
+        pass
+    else:
+        assert False, "BRAM accesses should be rejected, since it isn't simulated"
+
+# The NAND module: STS word 0 is ~(CFG word 0 & CFG word 1), like reg-test.c checks
+@cocotb.test()
+async def test_nand(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: NAND Register")
+
+    for a, b in [(0, 0), (0xFFFFFFFF, 0xFFFFFFFF), (0xFFFF0000, 0x00FFFF00)] + \
+                [(random.getrandbits(32), random.getrandbits(32)) for _ in range(16)]:
+        await tb.bus.write(NAND_CFG_A, a)
+        await tb.bus.write(NAND_CFG_B, b)
+        txn = await tb.bus.read(NAND_STS)
+        expected = ~(a & b) & 0xFFFFFFFF
+        assert txn.data == expected, f"NAND of 0x{a:08X} and 0x{b:08X} should be 0x{expected:08X}, got 0x{txn.data:08X}"
+
+    # The NAND inputs don't touch the FIFO's CFG word
+    txn = await tb.bus.read(FIFO_CFG)
+    assert txn.data == 0, f"FIFO CFG word should be untouched by the NAND writes, got 0x{txn.data:08X}"
+
+# The FIFO datapath through the address map: fill, overflow, drain, underflow, and a reset through CFG
+@cocotb.test()
+async def test_fifo(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: FIFO Datapath")
+
+    _, mismatches = await tb.fifo_write([random.getrandbits(32) for _ in range(tb.FIFO_DEPTH + 2)])
+    assert mismatches == 0, "Writes should succeed until the FIFO is full, then get SLVERR"
+    status = await tb.fifo_status()
+    assert status == tb.expected_fifo_status(), f"Status after overflow: expected {tb.expected_fifo_status()}, got {status}"
+    assert status["full"] == 1 and status["overflow"] == 1, f"FIFO should be full with overflow set, got {status}"
+
+    _, mismatches = await tb.fifo_read(tb.FIFO_DEPTH + 2)
+    assert mismatches == 0, "Reads should return the written words, then get SLVERR with zero data"
+    status = await tb.fifo_status()
+    assert status == tb.expected_fifo_status(), f"Status after underflow: expected {tb.expected_fifo_status()}, got {status}"
+    assert status["empty"] == 1 and status["underflow"] == 1, f"FIFO should be empty with underflow set, got {status}"
+
+    # freset clears the sticky flags, and the FIFO works again
+    await tb.fifo_reset()
+    status = await tb.fifo_status()
+    assert status["overflow"] == 0 and status["underflow"] == 0, f"freset should clear the sticky flags, got {status}"
+    _, mismatches = await tb.fifo_write([1, 2, 3])
+    assert mismatches == 0, "Writes should succeed after freset"
+    _, mismatches = await tb.fifo_read(3)
+    assert mismatches == 0, "Reads should succeed after freset"
+
+# Replay the workloads one access at a time, like the PS running mem-test.c
+@cocotb.test()
+async def test_workloads(dut):
+    tb = await setup_testbench(dut)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Workloads")
+
+    for path in workload_files():
+        name = os.path.splitext(os.path.basename(path))[0]
+        result = await tb.run_workload(read_workload(path))
+        tb.record_workload(name, result)
+        assert result["mismatches"] == 0, f"Workload {name} had {result['mismatches']} mismatches (see the log)"
+
+# Replay the workloads with each fread/fwrite queued back-to-back, to compare with the PS-like replay
+@cocotb.test()
+async def test_workloads_pipelined(dut):
+    tb = await setup_testbench(dut, fifo_outstanding=0)
+    await tb.reset()
+    tb.dut._log.info("STARTING TEST: Workloads, Pipelined")
+
+    for path in workload_files():
+        name = os.path.splitext(os.path.basename(path))[0]
+        result = await tb.run_workload(read_workload(path), pipelined=True)
+        tb.record_workload(f"{name}_pipelined", result)
+        assert result["mismatches"] == 0, f"Workload {name} had {result['mismatches']} mismatches (see the log)"
@@ -0,0 +1,132 @@
+# Tests of the ex02_mem host library (rootfs_include/ex02_mem) without hardware: against anonymous
+# memory (device=None), a plain file and /dev/zero (a character device, so accessed like /dev/mem).
+#
+# Usage (from the repository root):
+#   python3 -m unittest discover projects/ex02_axi_interface/tests
+
+import mmap
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "rootfs_include")))
+from ex02_mem import memory_map, decode_fifo_status, BRAM_DEPTH, BRAM_SIZE
+
+
+def _fifo_status_word(wr_count=0, full=0, overflow=0, rd_count=0, empty=0, underflow=0):
+    return wr_count | full << 5 | overflow << 6 | rd_count << 7 | empty << 12 | underflow << 13
+
+
+class memory_map_test(unittest.TestCase):
+
+    def setUp(self):
+        self.mem = memory_map(device=None)
+
+    def tearDown(self):
+        self.mem.close()
+
+    def test_anonymous_defaults_to_copies(self):
+        self.assertFalse(self.mem.word_access)
+
+    def test_cfg_nand_inputs(self):
+        self.mem.cfg.nand_inputs = (0x12345678, 0xFFFFFFFF)
+        self.assertEqual(self.mem.cfg.nand_inputs, (0x12345678, 0xFFFFFFFF))
+
+    def test_cfg_fifo_reset(self):
+        self.mem.cfg.words[2] = 0b110
+        self.mem.cfg.fifo_reset(hold=0)
+        self.assertEqual(int(self.mem.cfg.words[2]), 0b110)
+
+    def test_sts_fifo_status(self):
+        self.mem.sts.words[1] = _fifo_status_word(wr_count=3, rd_count=17, full=1, underflow=1)
+        status = self.mem.sts.fifo_status()
+        self.assertEqual((status.wr_count, status.rd_count), (3, 17))
+        self.assertTrue(self.mem.sts.full)
+        self.assertTrue(self.mem.sts.underflow)
+        self.assertFalse(self.mem.sts.empty)
+        self.assertFalse(self.mem.sts.overflow)
+
+    def test_decode_fifo_status_array(self):
+        words = np.array([_fifo_status_word(rd_count=count, empty=count == 0) for count in range(4)], dtype=np.uint32)
+        status = decode_fifo_status(words)
+        np.testing.assert_array_equal(status.rd_count, [0, 1, 2, 3])
+        np.testing.assert_array_equal(status.empty, [1, 0, 0, 0])
+
+    def test_bram_round_trip(self):
+        for word_access in (False, True):
+            with self.subTest(word_access=word_access):
+                self.mem.bram.word_access = word_access
+                values = np.arange(BRAM_DEPTH, dtype=np.uint32) * 3 + word_access
+                self.mem.bram.write(0, values)
+                np.testing.assert_array_equal(self.mem.bram.read(0, BRAM_DEPTH), values)
+                out = np.zeros(16, dtype=np.uint32)
+                block = self.mem.bram.read(40, 8, out=out)
+                np.testing.assert_array_equal(block, values[10:18])
+                self.assertTrue(np.shares_memory(block, out))
+
+    def test_bram_bounds(self):
+        with self.assertRaises(ValueError):
+            self.mem.bram.read(2, 1)
+        with self.assertRaises(ValueError):
+            self.mem.bram.read(BRAM_SIZE - 4, 2)
+        with self.assertRaises(ValueError):
+            self.mem.bram.write(-4, [1])
+        with self.assertRaises(ValueError):
+            self.mem.bram.read(0, 8, out=np.empty(4, dtype=np.uint32))
+
+    def test_fifo_steps_through_its_range(self):
+        # On plain memory the FIFO's 32 words are just memory, so the last write to each alias is read back
+        values = np.arange(40, dtype=np.uint32) + 100
+        self.mem.fifo.write(values)
+        expected = np.concatenate([values[32:], values[8:32]])
+        np.testing.assert_array_equal(self.mem.fifo.words, expected)
+        np.testing.assert_array_equal(self.mem.fifo.read(40), np.concatenate([expected, expected[:8]]))
+
+    def test_fifo_drain(self):
+        self.mem.fifo.write(np.arange(5, dtype=np.uint32) + 7)
+        self.mem.sts.words[1] = _fifo_status_word(rd_count=5)
+        np.testing.assert_array_equal(self.mem.fifo.drain(), [7, 8, 9, 10, 11])
+        self.mem.sts.words[1] = _fifo_status_word(empty=1)
+        self.assertEqual(len(self.mem.fifo.drain()), 0)
+
+
+class memory_map_file_test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "mem")
+        page = mmap.PAGESIZE
+        self.addresses = {"cfg": 0, "sts": page, "fifo": 2 * page, "bram": 3 * page}
+        with open(self.path, "wb") as f:
+            f.truncate(3 * page + -(-BRAM_SIZE // page) * page)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_plain_file(self):
+        values = np.arange(BRAM_DEPTH, dtype=np.uint32) ^ 0xA5A5A5A5
+        with memory_map(device=self.path, addresses=self.addresses) as mem:
+            self.assertFalse(mem.word_access)
+            mem.cfg.nand_inputs = (1, 2)
+            mem.bram.write(0, values)
+        with open(self.path, "rb") as f:
+            data = np.frombuffer(f.read(), dtype=np.uint32)
+        np.testing.assert_array_equal(data[:2], [1, 2])
+        np.testing.assert_array_equal(data[self.addresses["bram"] // 4:][:BRAM_DEPTH], values)
+
+    @unittest.skipUnless(os.path.exists("/dev/zero") and stat.S_ISCHR(os.stat("/dev/zero").st_mode), "No /dev/zero")
+    def test_character_device_uses_word_access(self):
+        with memory_map(device="/dev/zero", addresses=self.addresses) as mem:
+            self.assertTrue(mem.word_access)
+            self.assertTrue(mem.bram.word_access)
+            values = np.arange(64, dtype=np.uint32) + 1
+            mem.bram.write(256, values)
+            np.testing.assert_array_equal(mem.bram.read(256, 64), values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+from axi_lite_bfm import axi_lite_manager
+
+# Address map of a system-level simulation (see scripts/make/gen_system_top.py and system_sim.mk).
+#
+# The generated system top replaces the AXI interconnect with one AXI4-Lite port bundle per
+# subordinate, so the testbench plays the interconnect: each region of address_map.json with a
+# port prefix gets its own pipelined manager (axi_lite_bfm.py), and accesses are routed to it by
+# address, with the region's base subtracted like the interconnect does. Regions without a prefix
+# (IP that isn't simulated, like the BRAM controller) are mapped but can't be accessed.
+#
+# Unlike the interconnect, the regions run independently: transactions to different regions can be
+# in flight at the same time, and are only ordered within a region.
+
+
+class axi_address_map:
+
+    def __init__(self, dut, clk, map_file=None, max_outstanding=1):
+        """
+        Args:
+            dut: DUT handle of the system top.
+            clk: Clock handle the AXI ports are synchronous to.
+            map_file (str): address_map.json written by gen_system_top.py. Defaults to $SYSTEM_ADDRESS_MAP.
+            max_outstanding (int or dict): Maximum number of transactions in flight per direction (0 for no limit),
+                either for every region or as {region name: limit}. Defaults to 1, since some subordinates
+                (e.g. pavel-demin/axi_cfg_register) drop responses to back-to-back transactions.
+        """
+        map_file = map_file or os.getenv("SYSTEM_ADDRESS_MAP")
+        if not map_file or not os.path.isfile(map_file):
+            raise FileNotFoundError(f"System address map not found: {map_file} (set SYSTEM_ADDRESS_MAP, see system_sim.mk)")
+        with open(map_file) as f:
+            self.address_map = json.load(f)
+
+        self.regions = self.address_map["regions"]
+        self.managers = {}  # Region name -> axi_lite_manager
+        for region in self.regions:
+            if region["prefix"] is None:
+                continue
+            limit = max_outstanding.get(region["name"], 1) if isinstance(max_outstanding, dict) else max_outstanding
+            self.managers[region["name"]] = axi_lite_manager(dut, clk, prefix=region["prefix"], max_outstanding=limit)
+
+    def start(self):
+        """
+        Starts the managers of all the regions.
+        """
+        for manager in self.managers.values():
+            manager.start()
+
+    def reset(self):
+        """
+        Drops every queued and in-flight transaction of all the regions.
+        """
+        for manager in self.managers.values():
+            manager.reset()
+
+    def resolve(self, addr):
+        """
+        Finds the region of an address.
+        Returns:
+            tuple: (region dict, offset of the address within the region)
+        Raises:
+            ValueError: If the address isn't mapped, or its region isn't simulated.
+        """
+        for region in self.regions:
+            if region["base"] <= addr < region["base"] + region["range"]:
+                if region["name"] not in self.managers:
+                    raise ValueError(f"Address 0x{addr:08X} is in region {region['name']}, which isn't simulated")
+                return region, addr - region["base"]
+        raise ValueError(f"Address 0x{addr:08X} isn't mapped")
+
+    def manager(self, addr):
+        """
+        Returns:
+            tuple: (axi_lite_manager of the address's region, offset of the address within the region)
+        """
+        region, offset = self.resolve(addr)
+        return self.managers[region["name"]], offset
+
+    def write_nowait(self, addr, data, strb=None):
+        manager, offset = self.manager(addr)
+        return manager.write_nowait(offset, data, strb)
+
+    def read_nowait(self, addr):
+        manager, offset = self.manager(addr)
+        return manager.read_nowait(offset)
+
+    async def write(self, addr, data, strb=None):
+        manager, offset = self.manager(addr)
+        return await manager.write(offset, data, strb)
+
+    async def read(self, addr):
+        manager, offset = self.manager(addr)
+        return await manager.read(offset)
+
+    async def wait_idle(self):
+        """
+        Waits until every queued transaction of all the regions has received its response.
+        """
+        for manager in self.managers.values():
+            await manager.wait_idle()
@@ -0,0 +1,319 @@
+import cocotb
+from collections import deque
+from cocotb.triggers import RisingEdge, ReadOnly, Event
+
+# Pipelined AXI4-Lite manager bus-functional model, shared by the core testbenches.
+#
+# Transactions are queued (write_nowait/read_nowait) and presented on the bus as fast as the
+# subordinate accepts them: a new AW+W pair and a new AR can be presented in every cycle, with
+# no idle cycles between back-to-back transactions and any number of them in flight (optionally
+# capped with max_outstanding). BREADY and RREADY are held high, and responses are matched to
+# the transactions in order (AXI4-Lite has no IDs).
+#
+# A single coroutine drives and samples all five channels once per cycle. Ready and valid are
+# sampled in the ReadOnly phase and the handshakes are resolved on the following clock edge,
+# so every transaction records the clock edge (cycle) it was queued, first presented, accepted
+# and responded at. channel_stats() turns those into throughput, latency and stall numbers.
+
+RESP_OKAY = 0
+RESP_EXOKAY = 1
+RESP_SLVERR = 2
+RESP_DECERR = 3
+RESP_NAMES = ("OKAY", "EXOKAY", "SLVERR", "DECERR")
+
+
+class axi_lite_transaction:
+
+    __slots__ = ("write", "addr", "data", "strb", "resp", "queued_cycle", "start_cycle", "accept_cycle",
+                 "response_cycle", "aw_done", "w_done", "done")
+
+    def __init__(self, write, addr, data=None, strb=None, queued_cycle=0):
+        self.write = write
+        self.addr = addr
+        self.data = data  # Write data, or read data once the response arrives
+        self.strb = strb
+        self.resp = None  # Response code, None until the response arrives (or if the transaction was dropped)
+        self.queued_cycle = queued_cycle  # Cycle count when queued
+        self.start_cycle = None  # Cycle count when first presented on the bus
+        self.accept_cycle = None  # Clock edge of the address (and write data) handshake
+        self.response_cycle = None  # Clock edge of the response handshake
+        self.aw_done = False
+        self.w_done = False
+        self.done = Event()
+
+    @property
+    def latency(self):
+        """
+        Cycles from the address handshake to the response handshake (None until the response arrives).
+        """
+        if self.response_cycle is None:
+            return None
+        return self.response_cycle - self.accept_cycle
+
+    def __repr__(self):
+        kind = "write" if self.write else "read"
+        data = "None" if self.data is None else f"0x{self.data:X}"
+        resp = "pending" if self.resp is None else RESP_NAMES[self.resp]
+        return f"<AXI {kind} addr=0x{self.addr:X} data={data} resp={resp}>"
+
+
+class axi_lite_manager:
+
+    def __init__(self, dut, clk, prefix="s_axi", max_outstanding=0):
+        """
+        Args:
+            dut: DUT handle with the <prefix>_aw*/w*/b*/ar*/r* AXI4-Lite subordinate signals (wstrb is optional).
+            clk: Clock handle the interface is synchronous to.
+            prefix (str): Signal name prefix.
+            max_outstanding (int): Maximum number of transactions in flight per direction (0 for no limit).
+        """
+        self.dut = dut
+        self.clk = clk
+        self.max_outstanding = max_outstanding
+
+        def signal(name):
+            return getattr(dut, f"{prefix}_{name}")
+
+        self.awaddr, self.awvalid, self.awready = signal("awaddr"), signal("awvalid"), signal("awready")
+        self.wdata, self.wvalid, self.wready = signal("wdata"), signal("wvalid"), signal("wready")
+        self.wstrb = getattr(dut, f"{prefix}_wstrb", None)  # Optional (e.g. pavel-demin/axi_sts_register has none)
+        self.bresp, self.bvalid, self.bready = signal("bresp"), signal("bvalid"), signal("bready")
+        self.araddr, self.arvalid, self.arready = signal("araddr"), signal("arvalid"), signal("arready")
+        self.rdata, self.rresp, self.rvalid, self.rready = signal("rdata"), signal("rresp"), signal("rvalid"), signal("rready")
+        self.STRB_ALL = (1 << (len(self.wdata) // 8)) - 1
+
+        self.cycle = 0  # Clock edges seen since start()
+        self.unexpected_responses = 0  # Responses received with no transaction in flight
+
+        self._write_q = deque()  # Queued writes, not presented yet
+        self._read_q = deque()  # Queued reads, not presented yet
+        self._aw = None  # Write presented on AW, not accepted yet
+        self._w = None  # Write presented on W, not accepted yet
+        self._ar = None  # Read presented on AR, not accepted yet
+        self._b_pending = deque()  # Accepted writes waiting for their response
+        self._r_pending = deque()  # Accepted reads waiting for their response
+        self._dropped = False  # Set by reset() to discard the outputs sampled before it
+        self._idle = Event()
+        self._idle.set()
+        self._task = None
+
+        # Initialize the manager-driven signals
+        self.awvalid.value = 0
+        self.wvalid.value = 0
+        self.arvalid.value = 0
+        self.bready.value = 1
+        self.rready.value = 1
+
+    @property
+    def pending(self):
+        """
+        Number of transactions queued or in flight.
+        """
+        return (len(self._write_q) + len(self._read_q) + len(self._b_pending) + len(self._r_pending)
+                + (self._aw is not None or self._w is not None) + (self._ar is not None))
+
+    def start(self):
+        """
+        Starts the coroutine driving the bus.
+        """
+        if self._task is None:
+            self._task = cocotb.start_soon(self._run())
+        return self._task
+
+    def reset(self):
+        """
+        Drops every queued and in-flight transaction (e.g. when the subordinate is reset).
+        Dropped transactions complete with resp=None, and the valids are deasserted after the next clock edge.
+        """
+        dropped = list(self._write_q) + list(self._read_q) + list(self._b_pending) + list(self._r_pending)
+        dropped += [txn for txn in {self._aw, self._w, self._ar} if txn is not None]
+        self._write_q.clear()
+        self._read_q.clear()
+        self._b_pending.clear()
+        self._r_pending.clear()
+        self._aw = self._w = self._ar = None
+        self._dropped = True
+        for txn in dropped:
+            txn.done.set()
+        self._idle.set()
+
+    def write_nowait(self, addr, data, strb=None):
+        """
+        Queues a write without waiting for it.
+        Returns:
+            axi_lite_transaction: The transaction, whose done event is set when the response arrives.
+        """
+        txn = axi_lite_transaction(True, addr, data, self.STRB_ALL if strb is None else strb, self.cycle)
+        self._write_q.append(txn)
+        self._idle.clear()
+        return txn
+
+    def read_nowait(self, addr):
+        """
+        Queues a read without waiting for it.
+        Returns:
+            axi_lite_transaction: The transaction, whose done event is set when the response arrives.
+        """
+        txn = axi_lite_transaction(False, addr, queued_cycle=self.cycle)
+        self._read_q.append(txn)
+        self._idle.clear()
+        return txn
+
+    async def write(self, addr, data, strb=None):
+        """
+        Writes a word and waits for the response.
+        Returns:
+            axi_lite_transaction: The completed transaction (resp holds the response code).
+        """
+        txn = self.write_nowait(addr, data, strb)
+        await txn.done.wait()
+        return txn
+
+    async def read(self, addr):
+        """
+        Reads a word and waits for the response.
+        Returns:
+            axi_lite_transaction: The completed transaction (data and resp hold the response).
+        """
+        txn = self.read_nowait(addr)
+        await txn.done.wait()
+        return txn
+
+    async def wait_idle(self):
+        """
+        Waits until every queued transaction has received its response.
+        """
+        await self._idle.wait()
+
+    def _complete(self, pending, resp, data=None):
+        if not pending:
+            self.unexpected_responses += 1
+            self.dut._log.warning(f"AXI4-Lite response with no transaction in flight at cycle {self.cycle}")
+            return
+        txn = pending.popleft()
+        txn.resp = resp
+        txn.response_cycle = self.cycle
+        if data is not None:
+            txn.data = data
+        txn.done.set()
+
+    async def _run(self):
+        clk_edge = RisingEdge(self.clk)
+        read_only = ReadOnly()
+        awready = wready = arready = bvalid = rvalid = 0
+        bresp = rresp = rdata = 0
+        awvalid_driven = wvalid_driven = arvalid_driven = 0
+
+        while True:
+            await clk_edge
+            self.cycle += 1
+            cycle = self.cycle
+            if self._dropped:
+                awready = wready = arready = bvalid = rvalid = 0
+                self._dropped = False
+
+            # Handshakes completed by this edge (ready and valid were sampled before the edge)
+            write_accepted = False
+            if self._aw is not None and awready:
+                self._aw.aw_done = True
+                write_accepted = self._aw.w_done
+                accepted = self._aw
+                self._aw = None
+            if self._w is not None and wready:
+                self._w.w_done = True
+                write_accepted = self._w.aw_done
+                accepted = self._w
+                self._w = None
+            if write_accepted:
+                accepted.accept_cycle = cycle
+                self._b_pending.append(accepted)
+            if self._ar is not None and arready:
+                self._ar.accept_cycle = cycle
+                self._r_pending.append(self._ar)
+                self._ar = None
+            if bvalid:  # BREADY is always high
+                self._complete(self._b_pending, bresp)
+            if rvalid:  # RREADY is always high
+                self._complete(self._r_pending, rresp, rdata)
+
+            # Present the next transactions, back-to-back with the ones just accepted
+            if (self._aw is None and self._w is None and self._write_q
+                    and (not self.max_outstanding or len(self._b_pending) < self.max_outstanding)):
+                txn = self._write_q.popleft()
+                txn.start_cycle = cycle
+                self._aw = self._w = txn
+                self.awaddr.value = txn.addr
+                self.wdata.value = txn.data
+                if self.wstrb is not None:
+                    self.wstrb.value = txn.strb
+            if (self._ar is None and self._read_q
+                    and (not self.max_outstanding or len(self._r_pending) < self.max_outstanding)):
+                txn = self._read_q.popleft()
+                txn.start_cycle = cycle
+                self._ar = txn
+                self.araddr.value = txn.addr
+
+            # Only touch the valids through the GPI when they change
+            awvalid = int(self._aw is not None)
+            wvalid = int(self._w is not None)
+            arvalid = int(self._ar is not None)
+            if awvalid != awvalid_driven:
+                self.awvalid.value = awvalid
+                awvalid_driven = awvalid
+            if wvalid != wvalid_driven:
+                self.wvalid.value = wvalid
+                wvalid_driven = wvalid
+            if arvalid != arvalid_driven:
+                self.arvalid.value = arvalid
+                arvalid_driven = arvalid
+
+            if not self.pending:
+                # Nothing in flight, skip sampling until there is
+                self._idle.set()
+                awready = wready = arready = bvalid = rvalid = 0
+                continue
+
+            # Sample the subordinate's outputs for the next edge
+            await read_only
+            awready = awvalid and int(self.awready.value)
+            wready = wvalid and int(self.wready.value)
+            arready = arvalid and int(self.arready.value)
+            bvalid = int(self.bvalid.value)
+            if bvalid:
+                bresp = int(self.bresp.value)
+            rvalid = int(self.rvalid.value)
+            if rvalid:
+                rresp = int(self.rresp.value)
+                rdata = int(self.rdata.value)
+
+
+def channel_stats(transactions):
+    """
+    Summarizes completed transactions of one direction (all writes or all reads).
+    Returns:
+        dict: Counts per response, throughput in words/cycle from the first to the last address handshake,
+              latency (address handshake to response) min/mean/max, and stall cycles split into
+              subordinate_wait_cycles (presented but not accepted) and manager_idle_cycles (queued but
+              not presented while the previous transaction was already accepted).
+    """
+    transactions = [txn for txn in transactions if txn.response_cycle is not None]
+    stats = {"count": len(transactions)}
+    for code, name in enumerate(RESP_NAMES):
+        stats[name.lower()] = sum(1 for txn in transactions if txn.resp == code)
+    if not transactions:
+        return stats
+    span = transactions[-1].accept_cycle - transactions[0].accept_cycle + 1
+    latencies = [txn.latency for txn in transactions]
+    manager_idle = 0
+    for previous, txn in zip(transactions, transactions[1:]):
+        manager_idle += max(0, txn.start_cycle - max(previous.accept_cycle, txn.queued_cycle))
+    stats.update({
+        "cycles": span,
+        "words_per_cycle": len(transactions) / span,
+        "latency_min": min(latencies),
+        "latency_mean": sum(latencies) / len(latencies),
+        "latency_max": max(latencies),
+        "subordinate_wait_cycles": sum(txn.accept_cycle - txn.start_cycle - 1 for txn in transactions),
+        "manager_idle_cycles": manager_idle,
+    })
+    return stats
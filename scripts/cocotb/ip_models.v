@@ -0,0 +1,77 @@
+`timescale 1 ns / 1 ps
+
+// Behavioral simulation models of the Xilinx primitives and IP used by the projects' block designs,
+// for the system-level simulations generated by scripts/make/gen_system_top.py (Verilator has no
+// access to the Vivado simulation libraries). They only model what the designs rely on.
+
+// FDRE: D flip-flop with clock enable and synchronous reset (used by pavel-demin/axi_cfg_register)
+module FDRE #(
+  parameter [0:0] INIT = 1'b0
+)(
+  output reg  Q,
+  input  wire C,
+  input  wire CE,
+  input  wire R,
+  input  wire D
+);
+
+  initial Q = INIT;
+
+  always @(posedge C) begin
+    if (R)
+      Q <= 1'b0;
+    else if (CE)
+      Q <= D;
+  end
+
+endmodule
+
+// proc_sys_reset: reset synchronizer. All outputs are held in reset while any reset input is asserted
+// (or dcm_locked is low), and released together RESET_CYCLES slowest_sync_clk cycles after the last
+// one deasserts. The external reset is active-low by default, like the PS FCLK_RESET0_N it is connected to.
+module proc_sys_reset #(
+  parameter integer C_EXT_RESET_HIGH = 0,
+  parameter integer C_AUX_RESET_HIGH = 0,
+  parameter integer RESET_CYCLES     = 16 // Simulation only
+)(
+  input  wire       slowest_sync_clk,
+  input  wire       ext_reset_in,
+  input  wire       aux_reset_in,
+  input  wire       mb_debug_sys_rst,
+  input  wire       dcm_locked,
+  output wire       mb_reset,
+  output wire [0:0] bus_struct_reset,
+  output wire [0:0] peripheral_reset,
+  output wire [0:0] interconnect_aresetn,
+  output wire [0:0] peripheral_aresetn
+);
+
+  localparam integer COUNT_WIDTH = $clog2(RESET_CYCLES + 1);
+
+  wire reset_in = (ext_reset_in == C_EXT_RESET_HIGH[0]) | (aux_reset_in == C_AUX_RESET_HIGH[0])
+                  | mb_debug_sys_rst | ~dcm_locked;
+
+  // Two-stage synchronizer
+  reg [1:0] reset_sync = 2'b11;
+  reg [COUNT_WIDTH-1:0] count = 0;
+  reg reset_reg = 1'b1;
+
+  always @(posedge slowest_sync_clk) begin
+    reset_sync <= {reset_sync[0], reset_in};
+    if (reset_sync[1]) begin
+      count <= 0;
+      reset_reg <= 1'b1;
+    end else if (count < RESET_CYCLES) begin
+      count <= count + 1'b1;
+    end else begin
+      reset_reg <= 1'b0;
+    end
+  end
+
+  assign mb_reset = reset_reg;
+  assign bus_struct_reset = reset_reg;
+  assign peripheral_reset = reset_reg;
+  assign interconnect_aresetn = ~reset_reg;
+  assign peripheral_aresetn = ~reset_reg;
+
+endmodule
@@ -0,0 +1,45 @@
+# Batch simulation of several parameter sets of a core in a single build, included by cocotb.mk with BATCH=1
+#   (e.g. `make BATCH=1 --file=scripts/make/cocotb.mk test_custom_core` from the core's tests/src directory,
+#   or `python3 scripts/make/sweep_core.py <project> <vendor> <core> --batch`)
+# Generates a top with one instance of the core per parameter set with gen_batch_top.py, all sharing the
+#   clock, and runs the core's batch testbench (tests/src/batch.py, or TESTBENCH) against it
+
+# Parameter sets of the batch (same format as the sweep of sweep_core.py)
+BATCH_SWEEP ?= $(CURDIR)/parameter_sweep.json
+# Ports shared by all the instances
+BATCH_SHARED ?= clk
+# Where the generated <core>_batch.v and batch.json are placed: one directory per sweep file, named after it
+#   and a hash of its real path, so batches of different sweeps of a core don't overwrite each other
+#   (computed once and passed down to the recursive make calls)
+ifeq ($(BATCH_GEN_DIR),)
+BATCH_SWEEP_PATH := $(or $(realpath $(BATCH_SWEEP)),$(abspath $(BATCH_SWEEP)))
+BATCH_GEN_DIR := $(REPO_DIR)/tmp/batch_sim/$(CORE_NAME)/$(basename $(notdir $(BATCH_SWEEP)))_$(shell printf '%s' '$(BATCH_SWEEP_PATH)' | sha1sum | cut -c1-8)
+endif
+export BATCH_GEN_DIR
+
+# Generate the batch top (only rewritten when the parameter sets change) and get its Verilog sources
+#   The sources are computed once and passed down to the recursive make calls
+ifeq ($(BATCH_SOURCES),)
+BATCH_SOURCES := $(shell python3 $(REPO_DIR)/scripts/make/gen_batch_top.py $(CORE_DIR) $(BATCH_SWEEP) $(BATCH_GEN_DIR) --shared $(BATCH_SHARED))
+ifeq ($(BATCH_SOURCES),)
+$(error Failed to generate the batch top of core "$(CORE_NAME)" (see the errors from gen_batch_top.py above))
+endif
+endif
+export BATCH_SOURCES
+
+# Simulate the generated top (replacing the single core sources of cocotb.mk)
+#   The parameters are set by the generated instances, so there's no parameters file
+CORE_SOURCES := $(BATCH_SOURCES)
+TOPLEVEL_MODULE := $(CORE_NAME)_batch
+PARAMETERS_FILE :=
+# Run the core's batch testbench, unless another module is given (e.g. TESTBENCH=characterize for fifo_sync)
+ifeq ($(origin TESTBENCH),file)
+TESTBENCH := batch
+endif
+# Instances of the batch, read by the core's batch testbench
+export BATCH_CONFIG := $(BATCH_GEN_DIR)/batch.json
+
+# The window capture streams a single file, so it can't be shared by the instances
+ifeq ($(WAVES),window)
+$(error WAVES=window is not supported with BATCH=1 (use vcd, fst, trigger or off))
+endif
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# Runs a core's cocotb benchmarks, appends the results to a history file, and compares them to a baseline.
+# Arguments: <project> <vendor> <core> [--threshold PCT] [--baseline FILE] [--update-baseline] [--label TEXT]
+# Usage: benchmark_core.py <project> <vendor> <core> [--threshold PCT] [--baseline FILE] [--update-baseline] [--label TEXT]
+# Example:
+#   python3 scripts/make/benchmark_core.py ex02_axi_interface base fifo_sync --update-baseline
+#
+# The core needs a tests/src/benchmark.py cocotb module that writes its results to $RESULTS_DIR/benchmark.json,
+# as a {"<workload>": {"cycles": ..., "wall_time_s": ..., "cycles_per_sec": ..., "waves": ..., "profile": ...}} object.
+# The simulator build (through the simulation build cache, see sim_cache.py) and the benchmarks are timed
+# separately. Each benchmark test runs in its own simulator process (with TESTCASE), so the peak RSS of
+# that process, from os.wait4, is the peak RSS of its workloads alone.
+# Every run is appended to tmp/benchmarks/<vendor>_<core>/history.json.
+#
+# Each workload's cycles/s is compared with the baseline (tmp/benchmarks/<vendor>_<core>/baseline.json
+# by default, written with --update-baseline), and slowdowns larger than --threshold percent (default
+# BENCH_THRESHOLD or 10) are flagged. Runs with other waveform or profiling modes than the baseline
+# aren't compared. Exits with 1 if the benchmarks fail, the modes differ or any slowdown is flagged.
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+COCOTB_MK = os.path.join(REPO_DIR, "scripts", "make", "cocotb.mk")
+BENCH_DIR = os.path.join(REPO_DIR, "tmp", "benchmarks")
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def run_timed(command, log_file):
+    """
+    Runs a command with its output in a log file.
+    Returns:
+        tuple: (exit code, wall time in seconds, peak RSS in kB of the command and its descendants)
+    """
+    with open(log_file, "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT,
+                                   env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+    return os.waitstatus_to_exitcode(status), wall_time, rusage.ru_maxrss
+
+
+def benchmark_tests(benchmark_file):
+    """
+    Lists the cocotb tests of a benchmark module, in order.
+    """
+    with open(benchmark_file) as f:
+        return re.findall(r"^@cocotb\.test\(.*\)\n(?:@.*\n)*async def (\w+)", f.read(), flags=re.MULTILINE)
+
+
+def run_modes(workloads):
+    """
+    Returns the waveform and profiling modes the benchmarks ran with, as reported by their workloads.
+    Timings taken in different modes aren't comparable.
+    """
+    first = next(iter(workloads.values()))
+    return {"waves": first.get("waves", os.environ.get("WAVES") or "vcd"),
+            "profile": first.get("profile", os.environ.get("TB_PROFILE") or "0")}
+
+
+def build_info(log_file):
+    """
+    Reads the simulation build cache result from a build log.
+    """
+    with open(log_file) as f:
+        log = f.read()
+    info = {"cache_hit": "[SIM CACHE] Hit" in log}
+    match = re.search(r"Using simulation build: (\S+)", log)
+    if match:
+        meta = _read_json(os.path.join(match.group(1), "cache_meta.json"), {})
+        info["sim_build"] = match.group(1)
+        info["compile_time_s"] = meta.get("build_time_s")
+    return info
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(entry, baseline, threshold):
+    """
+    Compares each workload's cycles/s with the baseline.
+    Returns:
+        list: (workload, baseline cycles/s, current cycles/s, change in percent, flagged) tuples
+    """
+    rows = []
+    for name, result in entry["workloads"].items():
+        base = baseline["workloads"].get(name)
+        if not base or not base.get("cycles_per_sec"):
+            continue
+        change = 100.0 * (result["cycles_per_sec"] - base["cycles_per_sec"]) / base["cycles_per_sec"]
+        rows.append((name, base["cycles_per_sec"], result["cycles_per_sec"], change, change < -threshold))
+    return rows
+
+
+def main(argv):
+    threshold = float(os.environ.get("BENCH_THRESHOLD", "10"))
+    baseline_file = None
+    update_baseline = False
+    label = ""
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--threshold":
+            threshold = float(argv.pop(0))
+        elif arg == "--baseline":
+            baseline_file = argv.pop(0)
+        elif arg == "--update-baseline":
+            update_baseline = True
+        elif arg == "--label":
+            label = argv.pop(0)
+        else:
+            args.append(arg)
+    if len(args) != 3:
+        print("[CORE BENCHMARK] ERROR:")
+        print("Usage: benchmark_core.py <project> <vendor> <core> [--threshold PCT] [--baseline FILE] [--update-baseline] [--label TEXT]")
+        return 1
+    project, vendor, core = args
+
+    src_dir = os.path.join(REPO_DIR, "projects", project, "cores", vendor, core, "tests", "src")
+    if not os.path.isfile(os.path.join(src_dir, "benchmark.py")):
+        print(f"[CORE BENCHMARK] ERROR: benchmark.py not found in {src_dir}")
+        return 1
+    tests = benchmark_tests(os.path.join(src_dir, "benchmark.py"))
+    if not tests:
+        print(f"[CORE BENCHMARK] ERROR: No cocotb tests found in {os.path.join(src_dir, 'benchmark.py')}")
+        return 1
+    results_dir = os.path.join(src_dir, "..", "results", "benchmark")
+    results_dir = os.path.abspath(results_dir)
+    os.makedirs(results_dir, exist_ok=True)
+    history_dir = os.path.join(BENCH_DIR, f"{vendor}_{core}")
+    os.makedirs(history_dir, exist_ok=True)
+    baseline_file = baseline_file or os.path.join(history_dir, "baseline.json")
+    make_command = ["make", f"--directory={src_dir}", f"--file={COCOTB_MK}", "TESTBENCH=benchmark", f"RESULTS_DIR={results_dir}"]
+
+    # Build (or fetch from the cache), then run the benchmarks
+    print(f"[CORE BENCHMARK] Building the simulator for {core}")
+    build_log = os.path.join(results_dir, "build_log.txt")
+    build_result, build_wall_time, _ = run_timed(make_command + ["build_custom_core"], build_log)
+    if build_result != 0:
+        print(f"[CORE BENCHMARK] ERROR: Build failed, see {build_log}")
+        return 1
+    results_file = os.path.join(results_dir, "benchmark.json")
+    run_wall_time = 0.0
+    workloads = {}
+    for test in tests:
+        print(f"[CORE BENCHMARK] Running {test} for {core}")
+        if os.path.exists(results_file):
+            os.remove(results_file)
+        run_log = os.path.join(results_dir, f"log_{test}.txt")
+        run_result, wall_time, peak_rss_kb = run_timed(make_command + ["test_custom_core", f"TESTCASE={test}"], run_log)
+        results = _read_json(results_file, {})
+        if run_result != 0 or not results:
+            print(f"[CORE BENCHMARK] ERROR: Benchmark {test} failed, see {run_log}")
+            return 1
+        run_wall_time += wall_time
+        for name, result in results.items():
+            workloads[name] = dict(result, peak_rss_kb=peak_rss_kb)
+    modes = run_modes(workloads)
+
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "label": label,
+        "modes": modes,
+        "build": dict(build_info(build_log), wall_time_s=round(build_wall_time, 3)),
+        "run": {"wall_time_s": round(run_wall_time, 3), "processes": len(tests)},
+        "workloads": workloads,
+    }
+    history_file = os.path.join(history_dir, "history.json")
+    history = _read_json(history_file, [])
+    history.append(entry)
+    with open(history_file, "w") as f:
+        json.dump(history, f, indent=2)
+
+    print(f"[CORE BENCHMARK] Build: {build_wall_time:.1f} s ({'cache hit' if entry['build']['cache_hit'] else 'compiled'}), "
+          f"run: {run_wall_time:.1f} s in {len(tests)} simulator processes, "
+          f"waves {modes['waves']}, profile {modes['profile']}")
+    for name, result in workloads.items():
+        print(f"[CORE BENCHMARK]   {name}: {result['cycles']} cycles in {result['wall_time_s']:.2f} s "
+              f"({result['cycles_per_sec']:.0f} cycles/s, peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB)")
+
+    regressions = []
+    mismatch = False
+    baseline = _read_json(baseline_file, None)
+    if baseline is None:
+        print(f"[CORE BENCHMARK] No baseline found at {baseline_file}")
+    elif baseline.get("modes") != modes:
+        print(f"[CORE BENCHMARK] ERROR: The baseline {baseline_file} was recorded with modes "
+              f"{baseline.get('modes', 'unknown')}, but this run used {modes}, so they can't be compared. "
+              f"Run with the baseline's WAVES and TB_PROFILE, or store a new baseline with --update-baseline")
+        mismatch = True
+    else:
+        print(f"[CORE BENCHMARK] Compared with the baseline from {baseline.get('timestamp')} ({baseline.get('commit')}), "
+              f"threshold {threshold:.0f}%:")
+        for name, base_cps, cps, change, flagged in compare(entry, baseline, threshold):
+            print(f"[CORE BENCHMARK]   {name}: {base_cps:.0f} -> {cps:.0f} cycles/s ({change:+.1f}%)"
+                  + (" SLOWDOWN" if flagged else ""))
+            if flagged:
+                regressions.append(name)
+
+    if update_baseline:
+        with open(baseline_file, "w") as f:
+            json.dump(entry, f, indent=2)
+        print(f"[CORE BENCHMARK] Updated the baseline: {baseline_file}")
+
+    if mismatch and not update_baseline:
+        return 1
+    if regressions:
+        print(f"[CORE BENCHMARK] {core}: slowdowns beyond {threshold:.0f}% in {', '.join(regressions)}")
+        return 1
+    print(f"[CORE BENCHMARK] {core}: no slowdowns (history in {os.path.relpath(history_file, REPO_DIR)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
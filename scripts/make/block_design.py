@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# Reads a project's block design (block_design.tcl and its modules) without Vivado.
+# Arguments: <project>
+# Usage: block_design.py <project>
+# Example:
+#   python3 scripts/make/block_design.py ex02_axi_interface
+#
+# Understands the block design helper procedures of scripts/vivado/project.tcl (cell, init_ps, module,
+# wire, addr, auto_connect_axi) and the create_bd_pin/port commands, with the same name resolution as
+# Vivado: names are relative to the current module, unless they start with "/".
+# Module cells are flattened, so every cell, pin and connection has a full path (e.g. "axi_fifo_module/fifo").
+# Tcl control flow (e.g. for loops) and variable substitution are not evaluated, so cells created inside
+# them are missed, except for custom_cores(), which also looks for custom cores in the loop bodies (like
+# get_cores_from_tcl.sh, which reads every line). Prints the flattened design as JSON when run directly.
+
+import json
+import os
+import sys
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def tcl_commands(text):
+    """
+    Splits a Tcl script into commands, each a list of words. Braced words are kept as raw strings
+    (without the outer braces), comments and line continuations are dropped.
+    """
+    commands = []
+    words = []
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == "\\" and i + 1 < n and text[i + 1] == "\n":
+            i += 2
+        elif c in " \t\r":
+            i += 1
+        elif c in "\n;":
+            if words:
+                commands.append(words)
+                words = []
+            i += 1
+        elif c == "#" and not words:
+            while i < n and text[i] != "\n":
+                i += 1
+        elif c == "{":
+            depth = 1
+            start = i + 1
+            i += 1
+            while i < n and depth:
+                if text[i] == "\\":
+                    i += 1
+                elif text[i] == "{":
+                    depth += 1
+                elif text[i] == "}":
+                    depth -= 1
+                i += 1
+            if depth:
+                raise ValueError("Unbalanced braces in Tcl script")
+            words.append(text[start:i - 1])
+        elif c == '"':
+            start = i + 1
+            i += 1
+            while i < n and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+            words.append(text[start:i])
+            i += 1
+        else:
+            start = i
+            while i < n and text[i] not in " \t\r\n;":
+                i += 1
+            words.append(text[start:i])
+    if words:
+        commands.append(words)
+    return commands
+
+
+def tcl_list(text):
+    """
+    Splits a Tcl list (e.g. the body of a braced word) into its elements.
+    """
+    return [word for command in tcl_commands(text.replace("\n", " ")) for word in command]
+
+
+def parse_range(value):
+    """
+    Parses an address range like "128", "64K" or "1M" into bytes.
+    """
+    value = str(value).strip().upper()
+    for suffix, scale in (("K", 1 << 10), ("M", 1 << 20), ("G", 1 << 30)):
+        if value.endswith(suffix):
+            return int(value[:-1], 0) * scale
+    return int(value, 0)
+
+
+class block_design:
+
+    def __init__(self, project):
+        self.project = project
+        self.project_dir = os.path.join(REPO_DIR, "projects", project)
+        self.cells = {}  # Full path -> {"vlnv", "props", "module"}
+        self.pins = {}  # Full path of module pins and top-level ports -> {"dir", "width", "interface", "module"}
+        self.wires = []  # (full path, full path) pairs of connected pins
+        self.addresses = []  # {"offset", "range", "target", "space"}
+        self.modules = []  # Full paths of the module (hierarchy) cells
+        self.nested_vlnvs = set()  # VLNVs of cells inside unevaluated Tcl bodies (e.g. for loops)
+        self.sources = []  # Tcl files read
+        self._read(os.path.join(self.project_dir, "block_design.tcl"), "")
+
+    @staticmethod
+    def resolve(prefix, name):
+        """
+        Resolves a pin name in the context of a module (prefix ending with "/", or "" at the top level).
+        """
+        if name.startswith("/"):
+            return name[1:]
+        return prefix + name
+
+    def _connect(self, prefix, local, conns):
+        items = tcl_list(conns)
+        if len(items) % 2:
+            raise ValueError(f"Odd number of words in the connections of {local}")
+        for pin, remote in zip(items[0::2], items[1::2]):
+            self.wires.append((local + "/" + pin, self.resolve(prefix, remote)))
+
+    def _create_pin(self, prefix, words, interface):
+        direction = None
+        width = 1
+        msb = lsb = None
+        args = list(words[1:])
+        name = None
+        while args:
+            arg = args.pop(0)
+            if arg in ("-dir", "-mode", "-vlnv", "-type", "-freq_hz"):
+                value = args.pop(0)
+                if arg == "-dir":
+                    direction = value
+                elif arg == "-mode":
+                    direction = value
+            elif arg == "-from":
+                msb = int(args.pop(0))
+            elif arg == "-to":
+                lsb = int(args.pop(0))
+            elif not arg.startswith("-"):
+                name = arg
+        if msb is not None and lsb is not None:
+            width = abs(msb - lsb) + 1
+        self.pins[self.resolve(prefix, name)] = {
+            "dir": direction, "width": width, "interface": interface, "module": prefix.rstrip("/"),
+        }
+
+    def _read(self, tcl_file, prefix):
+        if not os.path.isfile(tcl_file):
+            raise FileNotFoundError(f"Block design file not found: {tcl_file}")
+        self.sources.append(tcl_file)
+        with open(tcl_file) as f:
+            commands = tcl_commands(f.read())
+        for words in commands:
+            command = words[0]
+            if command == "cell":
+                vlnv, name = words[1], words[2]
+                path = prefix + name
+                props = tcl_list(words[3]) if len(words) > 3 else []
+                self.cells[path] = {"vlnv": vlnv, "props": dict(zip(props[0::2], props[1::2])), "module": prefix.rstrip("/")}
+                if len(words) > 4:
+                    self._connect(prefix, path, words[4])
+            elif command == "init_ps":
+                name = words[1]
+                path = prefix + name
+                props = tcl_list(words[2]) if len(words) > 2 else []
+                self.cells[path] = {"vlnv": "xilinx.com:ip:processing_system7", "props": dict(zip(props[0::2], props[1::2])),
+                                    "module": prefix.rstrip("/")}
+                if len(words) > 3:
+                    self._connect(prefix, path, words[3])
+            elif command == "module":
+                source, name = words[1], words[2]
+                path = prefix + name
+                self.modules.append(path)
+                self._read(os.path.join(self.project_dir, "modules", f"{source}.tcl"), path + "/")
+                if len(words) > 3:
+                    self._connect(prefix, path, words[3])
+            elif command == "wire":
+                self.wires.append((self.resolve(prefix, words[1]), self.resolve(prefix, words[2])))
+            elif command == "addr":
+                self.addresses.append({"offset": int(words[1], 0), "range": parse_range(words[2]),
+                                       "target": self.resolve(prefix, words[3]), "space": self.resolve(prefix, words[4])})
+            elif command == "auto_connect_axi":
+                self.addresses.append({"offset": int(words[1], 0), "range": parse_range(words[2]),
+                                       "target": self.resolve(prefix, words[3]), "space": self.resolve(prefix, words[4])})
+                self.wires.append((self.resolve(prefix, words[3]), self.resolve(prefix, words[4])))
+            elif command in ("create_bd_pin", "create_bd_port"):
+                self._create_pin(prefix, words, interface=False)
+            elif command in ("create_bd_intf_pin", "create_bd_intf_port"):
+                self._create_pin(prefix, words, interface=True)
+            else:
+                self._scan_bodies(words)
+
+    def _scan_bodies(self, words):
+        """
+        Collects the VLNVs of the cells in the script bodies of a command that isn't evaluated (e.g. a for loop).
+        """
+        for word in words[1:]:
+            if "\n" not in word:
+                continue
+            try:
+                commands = tcl_commands(word)
+            except ValueError:
+                continue
+            for nested in commands:
+                if nested[0] == "cell" and len(nested) > 1:
+                    self.nested_vlnvs.add(nested[1])
+                else:
+                    self._scan_bodies(nested)
+
+    def custom_cores(self):
+        """
+        Lists the custom cores (vendor/core) instantiated in the design, like get_cores_from_tcl.sh.
+        """
+        cores = set()
+        for vlnv in [cell["vlnv"] for cell in self.cells.values()] + sorted(self.nested_vlnvs):
+            parts = vlnv.split(":")
+            if len(parts) >= 3 and parts[1] == "user":
+                cores.add(f"{parts[0]}/{parts[2]}")
+        return sorted(cores)
+
+    def to_dict(self):
+        return {
+            "project": self.project,
+            "cells": self.cells,
+            "pins": self.pins,
+            "wires": self.wires,
+            "addresses": self.addresses,
+            "modules": self.modules,
+            "sources": [os.path.relpath(source, REPO_DIR) for source in self.sources],
+        }
+
+
+def main(argv):
+    if len(argv) != 1:
+        print("[BLOCK DESIGN] ERROR:")
+        print("Usage: block_design.py <project>")
+        return 1
+    try:
+        design = block_design(argv[0])
+    except (OSError, ValueError) as error:
+        print(f"[BLOCK DESIGN] ERROR: {error}")
+        return 1
+    print(json.dumps(design.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,6 +2,8 @@
 SIM ?= verilator
 # cocotb variable -- Top-level language (needs to match an option in the above-mentioned Makefile.$(SIM))
 TOPLEVEL_LANG ?= verilog
+# Repository root (two levels up from this Makefile's directory, scripts/make)
+REPO_DIR := $(abspath $(dir $(lastword $(MAKEFILE_LIST)))/../..)
 # Core directory (two levels up from the tests/src directory where this Makefile is run)
 CORE_DIR := $(abspath $(CURDIR)/../..)
 # Directory containing the tests
@@ -9,15 +11,47 @@ TEST_DIR := $(CORE_DIR)/tests
 
 # Name of the core, derived from the directory name
 CORE_NAME := $(notdir $(CORE_DIR))
-# cocotb variable -- Main Verilog source file for the core
-VERILOG_SOURCES += $(CORE_DIR)/$(CORE_NAME).v
-# cocotb variable -- Add additional Verilog sources from submodules
-VERILOG_SOURCES += $(wildcard $(CORE_DIR)/submodules/*.v)
+# Python module (in tests/src) containing the cocotb tests to run. Defaults to "testbench"
+#   e.g. TESTBENCH=benchmark to run a core's benchmark module instead
+TESTBENCH ?= testbench
+# Waveform mode. Defaults to "vcd"
+#   vcd: Full Verilator VCD trace, $(RESULTS_DIR)/dump.vcd
+#   fst: Full Verilator FST trace (compressed, much smaller and faster to write), $(RESULTS_DIR)/dump.fst
+#   off: No waveforms (fastest)
+#   window: No Verilator trace; the testbench writes the cycles in WAVES_WINDOW="<start_ns>:<end_ns>" to waves_window.vcd
+#   trigger: No Verilator trace; the testbench keeps the last WAVES_DEPTH cycles and writes them to waves_trigger.vcd on the first scoreboard failure
+#   (the window and trigger modes are implemented by the testbench, e.g. fifo_sync's waveform_capture.py)
+WAVES ?= vcd
+ifeq ($(filter $(WAVES),vcd fst off window trigger),)
+$(error Invalid WAVES mode "$(WAVES)". Must be one of: vcd fst off window trigger)
+endif
+export WAVES WAVES_WINDOW WAVES_DEPTH
 
-# Where the results of the simulation will be placed
-RESULTS_DIR := $(TEST_DIR)/results
-# cocotb variable -- Where the compiled simulator binaries and intermediate files are placed. Defaults to "sim_build"
-SIM_BUILD := $(RESULTS_DIR)/sim_build
+# Optional per-core test configuration (tests/src/test_config.mk), e.g. to simulate the core inside a wrapper:
+#   it can add VERILOG_SOURCES (like a wrapper module or other cores), set TOPLEVEL_MODULE,
+#   or replace CORE_SOURCES (like the generated system top of scripts/make/system_sim.mk)
+-include test_config.mk
+# Batch mode (BATCH=1): simulate all the parameter sets of tests/src/parameter_sweep.json in one build,
+#   side by side in a generated top (see scripts/make/batch_sim.mk)
+ifeq ($(BATCH),1)
+include $(REPO_DIR)/scripts/make/batch_sim.mk
+endif
+# Verilog sources of the core: main source file and submodules
+CORE_SOURCES ?= $(CORE_DIR)/$(CORE_NAME).v $(wildcard $(CORE_DIR)/submodules/*.v)
+# cocotb variable -- Verilog sources to simulate
+VERILOG_SOURCES += $(CORE_SOURCES)
+# Top-level module of the simulation. Defaults to the core itself
+TOPLEVEL_MODULE ?= $(CORE_NAME)
+
+# Shared cocotb Python modules (e.g. the AXI4-Lite bus-functional model), importable by every testbench
+ifeq ($(findstring $(REPO_DIR)/scripts/cocotb,$(PYTHONPATH)),)
+export PYTHONPATH := $(REPO_DIR)/scripts/cocotb$(if $(PYTHONPATH),:$(PYTHONPATH))
+endif
+
+# Where the results of the simulation will be placed (can be overridden, e.g. by scripts/make/sweep_core.py)
+RESULTS_DIR ?= $(TEST_DIR)/results
+# JSON file with the Verilog core parameters (can be overridden, e.g. by scripts/make/sweep_core.py)
+PARAMETERS_FILE ?= parameters.json
 # cocotb variable -- Where the cocotb results will be stored. Defaults to "results.xml"
 COCOTB_RESULTS_FILE := $(RESULTS_DIR)/results.xml
 
@@ -27,6 +61,9 @@ $(info Variable checks (as make recurses):)
 $(info -- $$(MAKELEVEL): $(MAKELEVEL))
 ifeq ($(MAKELEVEL), 1) # Start at 1 because this Makefile will be loaded by a script run from the top-level Makefile
 $(info -- Core name: $(CORE_NAME))
+$(info -- Top-level module: $(TOPLEVEL_MODULE))
+$(info -- Testbench module: $(TESTBENCH))
+$(info -- Waveform mode: $(WAVES))
 $(info -- Using Verilog sources: $(VERILOG_SOURCES))
 endif
 $(info -  "$(CURDIR)" is the $$CURDIR variable (current directory))
@@ -35,31 +72,66 @@ $(info -  "$(TEST_DIR)" is the $$TEST_DIR variable ($$(CORE_DIR)/tests))
 $(info -  "$(firstword $(MAKEFILE_LIST))" is the top Makefile ($$(firstword $$(MAKEFILE_LIST))))
 $(info --------------------------)
 
-# Additional compile arguments, including Verilog core parameters (from parameters.json)
-EXTRA_ARGS += --trace --trace-structs -Wno-fatal --timing
-# Parse parameters.json with jq and add as -pvalue+KEY=VALUE to EXTRA_ARGS
-ifneq ("$(wildcard parameters.json)","")
-EXTRA_ARGS += $(foreach kv,$(shell jq -r 'to_entries|map("\(.key)=\(.value|tostring)")|.[]' parameters.json),-pvalue+$(kv))
+# Additional compile arguments, including Verilog core parameters (from $(PARAMETERS_FILE))
+#   (EXTRA_ARGS are also passed to the simulator at runtime, where --trace turns tracing on)
+EXTRA_ARGS += -Wno-fatal --timing
+ifeq ($(WAVES),vcd)
+EXTRA_ARGS += --trace --trace-structs
+endif
+ifeq ($(WAVES),fst)
+EXTRA_ARGS += --trace --trace-fst --trace-structs
+endif
+# Parse $(PARAMETERS_FILE) (see scripts/make/project_manifest.py) and add as -pvalue+KEY=VALUE to EXTRA_ARGS
+#   (parsed once, and exported so the sub-makes of cocotb's makefiles reuse it)
+ifneq ($(PARAMETER_ARGS_SOURCE),$(abspath $(PARAMETERS_FILE)))
+PARAMETER_ARGS := $(if $(wildcard $(PARAMETERS_FILE)),$(shell python3 $(REPO_DIR)/scripts/make/project_manifest.py params $(PARAMETERS_FILE)))
+PARAMETER_ARGS_SOURCE := $(abspath $(PARAMETERS_FILE))
+export PARAMETER_ARGS PARAMETER_ARGS_SOURCE
+endif
+EXTRA_ARGS += $(PARAMETER_ARGS)
+# Write the waveform straight into the results directory (so parallel runs don't share a dump file)
+ifneq ($(filter $(WAVES),vcd fst),)
+SIM_ARGS += --trace-file $(RESULTS_DIR)/dump.$(WAVES)
 endif
 
 $(info Using EXTRA_ARGS: $(EXTRA_ARGS))
+
+# Simulation builds are kept in a content-addressed cache shared by all projects (see scripts/make/sim_cache.py),
+#   keyed on the Verilog sources, parameters, EXTRA_ARGS, top level, and the Verilator/cocotb versions.
+#   The key is computed once and passed down to the recursive make calls.
+SIM_CACHE := python3 $(REPO_DIR)/scripts/make/sim_cache.py
+ifeq ($(SIM_KEY),)
+SIM_KEY := $(shell $(SIM_CACHE) key --extra-args "$(EXTRA_ARGS)" --toplevel $(TOPLEVEL_MODULE) $(if $(wildcard $(PARAMETERS_FILE)),--params $(PARAMETERS_FILE)) $(VERILOG_SOURCES))
+endif
+SIM_CACHE_DIR ?= $(REPO_DIR)/tmp/sim_cache
+export SIM_CACHE_DIR
+# cocotb variable -- Where the compiled simulator binaries and intermediate files are placed. Defaults to "sim_build"
+SIM_BUILD := $(SIM_CACHE_DIR)/$(SIM_KEY)
+$(info Using simulation build: $(SIM_BUILD))
 $(info --------------------------)
 
 
 # Phony targets (not real files)
-.PHONY: test_custom_core clean_test
+.PHONY: test_custom_core build_custom_core clean_test
 
-# Expects a cocotb module named <CORE_NAME>_test
-test_custom_core:
+# Expects a cocotb module named $(TESTBENCH) (testbench.py by default)
+# The simulation runs with the cache entry marked as in use, so concurrent builds don't evict it
+test_custom_core: build_custom_core
 	mkdir -p $(RESULTS_DIR)
 	COCOTB_RESULTS_FILE=$(COCOTB_RESULTS_FILE) SIM_BUILD=$(SIM_BUILD) \
 		RESULTS_DIR=$(RESULTS_DIR) \
-		$(MAKE) --file="$(firstword $(MAKEFILE_LIST))" sim MODULE=testbench TOPLEVEL=$(CORE_NAME); \
+		$(SIM_CACHE) use $(SIM_KEY) -- \
+		$(MAKE) --file="$(firstword $(MAKEFILE_LIST))" sim MODULE=$(TESTBENCH) TOPLEVEL=$(TOPLEVEL_MODULE) SIM_KEY=$(SIM_KEY); \
 	RESULT=$$?; \
-	mv dump.vcd $(RESULTS_DIR)/dump.vcd; \
 	rm -rf __pycache__; \
 	if [ $$RESULT -ne 0 ]; then exit $$RESULT; fi
 
+# Build the simulator through the cache. Skips Verilator entirely on a cache hit,
+#   and holds the cache entry's lock while building so parallel runs only build it once
+build_custom_core:
+	$(SIM_CACHE) build $(SIM_KEY) -- \
+		$(MAKE) --file="$(firstword $(MAKEFILE_LIST))" $(SIM_BUILD)/Vtop TOPLEVEL=$(TOPLEVEL_MODULE) SIM_KEY=$(SIM_KEY)
+
 clean_test:
 	rm -rf __pycache__ $(RESULTS_DIR)
 
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Generates a Verilog top that instantiates several parameter sets of a core side by side, so they're
+# simulated by a single Verilator build (see batch_sim.mk).
+# Arguments: <core_dir> <sweep_file> <output_dir> [--shared port,port,...]
+# Usage: gen_batch_top.py <core_dir> <sweep_file> <output_dir> [--shared clk]
+# Example:
+#   python3 scripts/make/gen_batch_top.py example_cores/base/fifo_sync example_cores/base/fifo_sync/tests/src/parameter_sweep.json tmp/batch_sim/fifo_sync
+#
+# The parameter sets are read from a parameter_sweep.json (a list of sets, or a "matrix" and/or "sets",
+# see sweep_core.py), each applied on top of the core's tests/src/parameters.json (if present).
+#
+# The generated <core>_batch module has one instance of the core per parameter set, <core>_<N>, with
+# its parameters set, and brings every port of the instance out as a top-level i<N>_<port> port, sized
+# from that instance's parameters. The shared ports (default: clk) are single top-level inputs connected
+# to every instance, so all the instances run from the same clock.
+#
+# Writes <core>_batch.v and batch.json (the instances, their prefixes, resolved parameters and ports, read
+# by the testbench through BATCH_CONFIG) to <output_dir>, only when their content changes (so the
+# simulation build cache sees the same sources), and prints the Verilog sources of the simulation, one per line.
+
+import json
+import os
+import sys
+
+from gen_system_top import read_verilog_module, write_if_changed
+from sweep_core import expand_sweep
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _parameter_value(value):
+    """
+    Formats a parameter value for a Verilog instance (strings quoted, like gen_system_top.py).
+    """
+    return json.dumps(value) if isinstance(value, str) else str(int(value))
+
+
+def build_batch_top(core, source, parameter_sets, shared):
+    """
+    Builds the batch top of a core.
+    Args:
+        core (str): Name of the core module.
+        source (str): Verilog source of the core module.
+        parameter_sets (list): Parameter dictionaries, one per instance.
+        shared (list): Ports connected to every instance (inputs only).
+    Returns:
+        tuple: (Verilog source of the top, batch config dict)
+    Raises:
+        ValueError: If a shared port isn't an input of the core, or a parameter isn't one of the core's.
+    """
+    top = f"{core}_batch"
+    ports = []  # (direction, width, name)
+    instances = []
+    config = {"module": core, "top": top, "shared": list(shared), "instances": []}
+
+    for index, parameters in enumerate(parameter_sets):
+        resolved, core_ports = read_verilog_module(source, core, parameters)
+        unknown = sorted(set(parameters) - set(resolved))
+        if unknown:
+            raise ValueError(f"Parameter set {index} has parameters that {core} doesn't have: {', '.join(unknown)}")
+        for name in shared:
+            if core_ports.get(name, ("",))[0] != "input":
+                raise ValueError(f"Shared port {name} is not an input of {core}")
+        if index == 0:
+            ports = [("input", core_ports[name][1], name) for name in shared]
+
+        prefix = f"i{index}_"
+        name = f"{core}_{index}"
+        connections = []
+        for port, (direction, width) in core_ports.items():
+            if port in shared:
+                connections.append(f".{port}({port})")
+            else:
+                ports.append((direction, width, prefix + port))
+                connections.append(f".{port}({prefix}{port})")
+        params = ""
+        if parameters:
+            params = " #(\n" + ",\n".join(f"    .{key}({_parameter_value(value)})"
+                                           for key, value in parameters.items()) + "\n  )"
+        instances.append(f"  // Parameter set {index}: {json.dumps(parameters)}\n  {core}{params} {name} (\n    "
+                         + ",\n    ".join(connections) + "\n  );")
+        config["instances"].append({
+            "name": name,
+            "prefix": prefix,
+            "parameters": resolved,
+            "overrides": parameters,
+            "ports": [port for port in core_ports if port not in shared],
+        })
+
+    lines = [
+        "// Generated by scripts/make/gen_batch_top.py -- do not edit",
+        f"// {len(parameter_sets)} parameter sets of {core}, sharing {', '.join(shared)}",
+        "`timescale 1 ns / 1 ps",
+        "",
+        f"module {top} (",
+        ",\n".join(f"  {direction} wire {f'[{width - 1}:0] ' if width > 1 else ''}{name}" for direction, width, name in ports),
+        ");",
+        "",
+        "\n\n".join(instances),
+        "",
+        "endmodule",
+        "",
+    ]
+    return "\n".join(lines), config
+
+
+def main(argv):
+    shared = ["clk"]
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--shared" and argv:
+            shared = [port for port in argv.pop(0).split(",") if port]
+        else:
+            args.append(arg)
+    if len(args) != 3:
+        print("[BATCH TOP] ERROR:", file=sys.stderr)
+        print("Usage: gen_batch_top.py <core_dir> <sweep_file> <output_dir> [--shared port,port,...]", file=sys.stderr)
+        return 1
+    core_dir, sweep_file, output_dir = (os.path.abspath(arg) for arg in args)
+
+    core = os.path.basename(core_dir)
+    source = os.path.join(core_dir, f"{core}.v")
+    submodules = os.path.join(core_dir, "submodules")
+    base_parameters = _read_json(os.path.join(core_dir, "tests", "src", "parameters.json"), {})
+    try:
+        sweep = _read_json(sweep_file, None)
+        if sweep is None:
+            raise ValueError(f"Missing or invalid sweep file: {sweep_file}")
+        parameter_sets = [dict(base_parameters, **parameter_set) for parameter_set in expand_sweep(sweep)]
+        if not parameter_sets:
+            raise ValueError(f"No parameter sets in {sweep_file}")
+        verilog, config = build_batch_top(core, source, parameter_sets, shared)
+    except (OSError, ValueError) as error:
+        print(f"[BATCH TOP] ERROR: {error}", file=sys.stderr)
+        return 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    top_file = os.path.join(output_dir, f"{config['top']}.v")
+    write_if_changed(top_file, verilog)
+    write_if_changed(os.path.join(output_dir, "batch.json"), json.dumps(config, indent=2) + "\n")
+    sources = [top_file, source]
+    if os.path.isdir(submodules):
+        sources += sorted(os.path.join(submodules, f) for f in os.listdir(submodules) if f.endswith(".v"))
+    for path in sources:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+# Generates a Verilog top for a system-level simulation of a project's block design.
+# Arguments: <project> <output_dir>
+# Usage: gen_system_top.py <project> <output_dir>
+# Example:
+#   python3 scripts/make/gen_system_top.py ex02_axi_interface tmp/system_sim/ex02_axi_interface
+#
+# The block design (see block_design.py) is flattened into a single system_top module, wiring the
+# project's custom cores the way block_design.tcl does:
+# - Custom cores (vendor:user:core) are instantiated from projects/<project>/cores, with their cell properties
+#   as Verilog parameters.
+# - xlslice, xlconcat, xlconstant and util_vector_logic cells become continuous assignments, and
+#   proc_sys_reset cells instantiate the behavioral model in scripts/cocotb/ip_models.v.
+# - The processing system is replaced by top-level ports: its FCLK_* outputs become inputs (e.g. fclk_clk0,
+#   fclk_reset0_n), and its other connected inputs (e.g. IRQ_F2P) become outputs.
+# - The AXI interconnect is replaced by the testbench: every AXI interface of a custom core connected to it
+#   is brought out as top-level <target>_<signal> ports (e.g. axi_cfg_s_axi_awaddr), named after the
+#   interface's addr target. The address map is written to address_map.json (see scripts/cocotb/axi_address_map.py).
+# - Other cells (e.g. axi_bram_ctrl) are left out, their outputs tied to zero, and their address ranges
+#   are kept in the address map without a port prefix.
+#
+# Writes system_top.v and address_map.json to <output_dir> (only when their content changes, so the
+# simulation build cache sees the same sources), and prints the Verilog sources of the simulation, one per line.
+
+import json
+import os
+import re
+import sys
+
+from block_design import block_design, REPO_DIR
+
+IP_MODELS = os.path.join(REPO_DIR, "scripts", "cocotb", "ip_models.v")
+TOP_MODULE = "system_top"
+
+# Interconnect cells replaced by the testbench's address map
+BUS_IPS = ("smartconnect", "axi_interconnect", "axi_crossbar")
+# Cells turned into continuous assignments
+GLUE_IPS = ("xlslice", "xlconcat", "xlconstant", "util_vector_logic")
+# Cells instantiated from the behavioral models in ip_models.v: port -> (direction, width, default for inputs)
+MODEL_IPS = {
+    "proc_sys_reset": {
+        "params": ("C_EXT_RESET_HIGH", "C_AUX_RESET_HIGH"),
+        "ports": {
+            "slowest_sync_clk": ("input", 1, 0),
+            "ext_reset_in": ("input", 1, 1),
+            "aux_reset_in": ("input", 1, 1),
+            "mb_debug_sys_rst": ("input", 1, 0),
+            "dcm_locked": ("input", 1, 1),
+            "mb_reset": ("output", 1, None),
+            "bus_struct_reset": ("output", 1, None),
+            "peripheral_reset": ("output", 1, None),
+            "interconnect_aresetn": ("output", 1, None),
+            "peripheral_aresetn": ("output", 1, None),
+        },
+    },
+}
+
+
+def clog2(value):
+    return (int(value) - 1).bit_length()
+
+
+def eval_expr(expr, params):
+    """
+    Evaluates a constant Verilog expression (e.g. a port width like "AXI_DATA_WIDTH/8-1") with the given parameters.
+    """
+    expr = expr.replace("$clog2", "clog2")
+    expr = re.sub(r"(\d+)?'[sS]?([bBoOdDhH])([0-9a-fA-F_]+)",
+                  lambda m: str(int(m.group(3).replace("_", ""), {"b": 2, "o": 8, "d": 10, "h": 16}[m.group(2).lower()])), expr)
+    expr = re.sub(r"(?<!/)/(?!/)", "//", expr)
+    return int(eval(expr, {"__builtins__": {}, "clog2": clog2}, dict(params)))
+
+
+def parse_int(value):
+    try:
+        return int(str(value), 0)
+    except ValueError:
+        return None
+
+
+def read_verilog_module(source, module_name, overrides):
+    """
+    Reads the parameters and ANSI-style ports of a Verilog module.
+    Returns:
+        tuple: ({parameter: value}, {port: (direction, width)})
+    """
+    with open(source) as f:
+        text = f.read()
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"//[^\n]*", "", text)
+    match = re.search(rf"\bmodule\s+{re.escape(module_name)}\b", text)
+    if not match:
+        raise ValueError(f"Module {module_name} not found in {source}")
+    header = text[match.end():text.index(";", match.end())]
+
+    params = {}
+    param_section = ""
+    if header.lstrip().startswith("#"):
+        start = header.index("(")
+        depth = 0
+        for index in range(start, len(header)):
+            depth += {"(": 1, ")": -1}.get(header[index], 0)
+            if depth == 0:
+                param_section, header = header[start + 1:index], header[index + 1:]
+                break
+    for name, value in re.findall(r"parameter\s+(?:integer\s+|\[[^\]]*\]\s*)?(\w+)\s*=\s*([^,]+)", param_section):
+        if name in overrides and parse_int(overrides[name]) is not None:
+            params[name] = parse_int(overrides[name])
+        else:
+            try:
+                params[name] = eval_expr(value.strip(), params)
+            except Exception:
+                params[name] = value.strip()
+
+    ports = {}
+    for direction, width, name in re.findall(r"\b(input|output|inout)\s+(?:(?:wire|reg|signed)\s+)*(\[[^\]]*\])?\s*(\w+)", header):
+        if width:
+            msb, lsb = width[1:-1].split(":")
+            width = abs(eval_expr(msb, params) - eval_expr(lsb, params)) + 1
+        else:
+            width = 1
+        ports[name] = (direction, width)
+    return params, ports
+
+
+class system_top:
+
+    def __init__(self, project):
+        self.design = block_design(project)
+        self.project = project
+        self.cores = {}  # Cell path -> {"module", "sources", "params", "ports"}
+        self.kinds = {}  # Cell path -> ps, bus, core, glue, model or unsupported
+        self.parent = {}  # Union-find over lowercase endpoint paths
+        self.names = {}  # Lowercase endpoint path -> original path
+        self.warnings = []
+
+        for path, cell in self.design.cells.items():
+            ip = cell["vlnv"].split(":")
+            name = ip[2] if len(ip) > 2 else ip[-1]
+            if name == "processing_system7":
+                self.kinds[path] = "ps"
+            elif name in BUS_IPS:
+                self.kinds[path] = "bus"
+            elif len(ip) > 2 and ip[1] == "user":
+                self.kinds[path] = "core"
+                self._load_core(path, ip[0], name, cell["props"])
+            elif name in GLUE_IPS:
+                self.kinds[path] = "glue"
+            elif name in MODEL_IPS:
+                self.kinds[path] = "model"
+            else:
+                self.kinds[path] = "unsupported"
+                self.warnings.append(f"{path} ({cell['vlnv']}) is not simulated")
+
+        for a, b in self.design.wires:
+            self._union(a, b)
+
+    def _load_core(self, path, vendor, core, props):
+        core_dir = os.path.join(self.design.project_dir, "cores", vendor, core)
+        source = os.path.join(core_dir, f"{core}.v")
+        if not os.path.isfile(source):
+            raise FileNotFoundError(f"Core source not found for {path}: {source}")
+        submodules = os.path.join(core_dir, "submodules")
+        sources = [source] + (sorted(os.path.join(submodules, f) for f in os.listdir(submodules) if f.endswith(".v"))
+                              if os.path.isdir(submodules) else [])
+        params, ports = read_verilog_module(source, core, props)
+        self.cores[path] = {"module": core, "sources": sources, "params": params, "ports": ports,
+                            "overrides": {k: v for k, v in props.items() if k in params}}
+
+    def _find(self, endpoint):
+        key = endpoint.lower()
+        self.names.setdefault(key, endpoint)
+        self.parent.setdefault(key, key)
+        while self.parent[key] != key:
+            self.parent[key] = self.parent[self.parent[key]]
+            key = self.parent[key]
+        return key
+
+    def _union(self, a, b):
+        self.parent[self._find(a)] = self._find(b)
+
+    def _split(self, endpoint):
+        """
+        Splits an endpoint into (cell path, pin), or (None, pin path) for module pins and top-level ports.
+        """
+        path, _, pin = self.names.get(endpoint, endpoint).rpartition("/")
+        for cell_path in self.design.cells:
+            if cell_path.lower() == path.lower():
+                return cell_path, pin
+        return None, self.names.get(endpoint, endpoint)
+
+    def _groups(self):
+        groups = {}
+        for endpoint in list(self.parent):
+            groups.setdefault(self._find(endpoint), []).append(endpoint)
+        return list(groups.values())
+
+    def _glue_ports(self, path):
+        """
+        Ports of a glue cell: {pin: (direction, width or None if inferred)}.
+        """
+        props = {k: parse_int(v) if parse_int(v) is not None else v for k, v in self.design.cells[path]["props"].items()}
+        ip = self.design.cells[path]["vlnv"].split(":")[2]
+        if ip == "xlslice":
+            din_from, din_to = props.get("DIN_FROM", 0), props.get("DIN_TO", 0)
+            return {"din": ("input", props.get("DIN_WIDTH", 32)), "dout": ("output", abs(din_from - din_to) + 1)}
+        if ip == "xlconstant":
+            return {"dout": ("output", props.get("CONST_WIDTH", 1))}
+        if ip == "util_vector_logic":
+            size = props.get("C_SIZE", 8)
+            ports = {"Op1": ("input", size), "Res": ("output", size)}
+            if str(props.get("C_OPERATION", "and")).lower() != "not":
+                ports["Op2"] = ("input", size)
+            return ports
+        # xlconcat: input widths from IN<i>_WIDTH or the connected nets, output width from the inputs
+        ports = {f"In{i}": ("input", props.get(f"IN{i}_WIDTH")) for i in range(props.get("NUM_PORTS", 2))}
+        ports["dout"] = ("output", None)
+        return ports
+
+    def _cell_ports(self, path):
+        kind = self.kinds[path]
+        if kind == "core":
+            return self.cores[path]["ports"]
+        if kind == "glue":
+            return self._glue_ports(path)
+        if kind == "model":
+            ip = self.design.cells[path]["vlnv"].split(":")[2]
+            return {pin: spec[:2] for pin, spec in MODEL_IPS[ip]["ports"].items()}
+        return {}
+
+    def _port(self, path, pin):
+        for name, spec in self._cell_ports(path).items():
+            if name.lower() == pin.lower():
+                return name, spec
+        return None, None
+
+    def _is_bus_side(self, path, pin):
+        """
+        Whether a pin is an AXI interface of the interconnect (e.g. S00_AXI) or the PS (e.g. M_AXI_GP0, but not M_AXI_GP0_ACLK).
+        """
+        kind = self.kinds.get(path)
+        return ((kind == "bus" and re.fullmatch(r"[MS]\d+_AXI", pin, re.I) is not None)
+                or (kind == "ps" and re.fullmatch(r"[MS]_AXI_[A-Z]+\d*", pin, re.I) is not None))
+
+    def _interface_ports(self, path, pin):
+        """
+        Ports of a custom core's interface pin (e.g. S_AXI -> s_axi_*): {suffix: port}.
+        """
+        if self.kinds.get(path) != "core":
+            return {}
+        prefix = pin.lower() + "_"
+        return {name[len(prefix):]: name for name in self.cores[path]["ports"] if name.lower().startswith(prefix)}
+
+    def build(self):
+        """
+        Builds the netlist.
+        Returns:
+            tuple: (Verilog source of the top, address map dict)
+        """
+        ports = []  # (direction, width, name)
+        nets = {}  # Endpoint key -> net name
+        widths = {}  # Net name -> width
+        drivers = {}  # Net name -> driver endpoint key
+        assigns = []
+        bundle_ports = {}  # (cell path, core port) -> top-level port
+
+        address_targets = {self._find(address["target"]): address for address in self.design.addresses}
+        regions = []
+
+        for group in self._groups():
+            root = self._find(group[0])
+            interfaces = [(cell, pin) for cell, pin in map(self._split, group) if cell and self._interface_ports(cell, pin)]
+            endpoints = [self._split(endpoint) for endpoint in group]
+            if (interfaces or root in address_targets or any(self._is_bus_side(cell, pin) for cell, pin in endpoints)
+                    or any(self.design.pins.get(self.names[endpoint], {}).get("interface") for endpoint in group)):
+                # Interface net: bring the custom core's interface out to the top (the interconnect side is the testbench)
+                address = address_targets.get(root)
+                for cell, pin in interfaces:
+                    name = (address["target"] if address and len(interfaces) == 1 else f"{cell}/{pin}")
+                    prefix = re.sub(r"\W", "_", name).lower()
+                    for suffix, port in sorted(self._interface_ports(cell, pin).items()):
+                        direction, width = self.cores[cell]["ports"][port]
+                        ports.append((direction, width, f"{prefix}_{suffix}"))
+                        bundle_ports[(cell, port)] = f"{prefix}_{suffix}"
+                    if address:
+                        awaddr = self.cores[cell]["ports"].get(f"{pin.lower()}_awaddr", self.cores[cell]["ports"].get(f"{pin.lower()}_araddr"))
+                        wdata = self.cores[cell]["ports"].get(f"{pin.lower()}_wdata", self.cores[cell]["ports"].get(f"{pin.lower()}_rdata"))
+                        regions.append({"name": address["target"], "base": address["offset"], "range": address["range"],
+                                        "prefix": prefix, "addr_width": awaddr[1] if awaddr else None,
+                                        "data_width": wdata[1] if wdata else None})
+                if address and not interfaces:
+                    regions.append({"name": address["target"], "base": address["offset"], "range": address["range"],
+                                    "prefix": None, "addr_width": None, "data_width": None})
+                continue
+
+            # Scalar net between cells that aren't simulated (e.g. axi_bram_ctrl to blk_mem_gen)
+            if not any(cell is None or self.kinds[cell] in ("ps", "core", "glue", "model") for cell, _ in endpoints):
+                continue
+
+            # Scalar net: find its driver
+            driver = None
+            top_input = None
+            for endpoint in group:
+                cell, pin = self._split(endpoint)
+                if cell is None:
+                    pin_info = self.design.pins.get(self.names[endpoint])
+                    if pin_info and pin_info["module"] == "" and str(pin_info["dir"]).upper() == "I":
+                        top_input = (self.names[endpoint], pin_info["width"])
+                    continue
+                kind = self.kinds[cell]
+                if kind == "ps" and pin.upper().startswith("FCLK"):
+                    top_input = (pin.lower(), 1)
+                elif kind in ("core", "glue", "model"):
+                    _, spec = self._port(cell, pin)
+                    if spec and spec[0] == "output":
+                        if driver is not None:
+                            raise ValueError(f"Net with multiple drivers: {self.names[driver]} and {self.names[endpoint]}")
+                        driver = endpoint
+            if top_input:
+                name, width = top_input
+                if not any(port[2] == name for port in ports):
+                    ports.append(("input", width, name))
+                net = name
+            elif driver is not None:
+                net = re.sub(r"\W", "_", self.names[driver])
+            else:
+                net = re.sub(r"\W", "_", self.names[group[0]])
+                sinks = [self.names[e] for e in group if self._split(e)[0] and self.kinds[self._split(e)[0]] != "bus"]
+                if sinks:
+                    self.warnings.append(f"{', '.join(sinks)} not driven, tied to zero")
+                drivers[net] = None
+            for endpoint in group:
+                nets[endpoint] = net
+            if net not in drivers:
+                drivers[net] = driver
+
+        def net_width(net, stack=()):
+            if net in widths:
+                return widths[net]
+            if net in stack:
+                raise ValueError(f"Combinational loop through {net}")
+            width = None
+            driver = drivers.get(net)
+            for port in ports:
+                if port[2] == net:
+                    width = port[1]
+            if driver is not None:
+                cell, pin = self._split(driver)
+                _, spec = self._port(cell, pin)
+                width = spec[1]
+                if width is None:  # xlconcat output
+                    width = sum(input_width(cell, f"In{i}", stack + (net,)) for i in range(len(self._glue_ports(cell)) - 1))
+            if width is None:
+                # Undriven: use the widest sink, or a declared module pin width
+                for endpoint, endpoint_net in nets.items():
+                    if endpoint_net != net:
+                        continue
+                    cell, pin = self._split(endpoint)
+                    spec = self._port(cell, pin)[1] if cell else None
+                    if spec and spec[1]:
+                        width = max(width or 0, spec[1])
+                    elif not cell and self.names[endpoint] in self.design.pins:
+                        width = max(width or 0, self.design.pins[self.names[endpoint]]["width"])
+            widths[net] = width or 1
+            return widths[net]
+
+        def input_width(cell, pin, stack=()):
+            _, spec = self._port(cell, pin)
+            if spec and spec[1]:
+                return spec[1]
+            net = nets.get(f"{cell}/{pin}".lower())
+            return net_width(net, stack) if net else 1
+
+        def input_value(cell, pin):
+            net = nets.get(f"{cell}/{pin}".lower())
+            if net:
+                return net
+            return f"{input_width(cell, pin)}'d0"
+
+        # Continuous assignments for the glue cells
+        for path, kind in self.kinds.items():
+            if kind != "glue":
+                continue
+            props = self.design.cells[path]["props"]
+            ip = self.design.cells[path]["vlnv"].split(":")[2]
+            output = nets.get(f"{path}/{'Res' if ip == 'util_vector_logic' else 'dout'}".lower())
+            if output is None:
+                continue
+            if ip == "xlslice":
+                din_from, din_to = parse_int(props.get("DIN_FROM", 0)), parse_int(props.get("DIN_TO", 0))
+                expr = f"{input_value(path, 'din')}[{max(din_from, din_to)}:{min(din_from, din_to)}]"
+            elif ip == "xlconstant":
+                expr = f"{parse_int(props.get('CONST_WIDTH', 1))}'d{parse_int(props.get('CONST_VAL', 1))}"
+            elif ip == "util_vector_logic":
+                operation = str(props.get("C_OPERATION", "and")).lower()
+                if operation == "not":
+                    expr = f"~{input_value(path, 'Op1')}"
+                else:
+                    expr = f"{input_value(path, 'Op1')} {({'and': '&', 'or': '|', 'xor': '^'})[operation]} {input_value(path, 'Op2')}"
+            else:
+                count = parse_int(props.get("NUM_PORTS", 2))
+                expr = "{" + ", ".join(input_value(path, f"In{i}") for i in reversed(range(count))) + "}"
+            assigns.append(f"  assign {output} = {expr}; // {path} ({ip})")
+
+        # PS inputs (other than bus clocks) become top-level outputs
+        for endpoint, net in nets.items():
+            cell, pin = self._split(endpoint)
+            if cell and self.kinds[cell] == "ps" and not pin.upper().startswith("FCLK") and not pin.upper().endswith("_ACLK"):
+                name = f"{cell}_{pin}".lower()
+                ports.append(("output", net_width(net), name))
+                assigns.append(f"  assign {name} = {net}; // {cell}/{pin}")
+
+        # Instances
+        instances = []
+        for path, kind in self.kinds.items():
+            if kind not in ("core", "model"):
+                continue
+            connections = []
+            if kind == "core":
+                core = self.cores[path]
+                module = core["module"]
+                overrides = core["overrides"]
+                port_specs = core["ports"]
+            else:
+                module = self.design.cells[path]["vlnv"].split(":")[2]
+                overrides = {k: v for k, v in self.design.cells[path]["props"].items() if k in MODEL_IPS[module]["params"]}
+                port_specs = self._cell_ports(path)
+            for port, (direction, width) in port_specs.items():
+                net = nets.get(f"{path}/{port}".lower())
+                if (path, port) in bundle_ports:
+                    connections.append(f".{port}({bundle_ports[(path, port)]})")
+                elif net:
+                    connections.append(f".{port}({net})")
+                elif direction == "input":
+                    default = MODEL_IPS[module]["ports"][port][2] if kind == "model" else 0
+                    connections.append(f".{port}({width}'d{default})")
+                else:
+                    connections.append(f".{port}()")
+            params = ""
+            if overrides:
+                params = " #(\n" + ",\n".join(f"    .{k}({v if parse_int(v) is not None else json.dumps(v)})"
+                                               for k, v in overrides.items()) + "\n  )"
+            instance = re.sub(r"\W", "_", path)
+            instances.append(f"  // {path} ({self.design.cells[path]['vlnv']})\n  {module}{params} {instance} (\n    "
+                             + ",\n    ".join(connections) + "\n  );")
+
+        # Declarations
+        port_names = {port[2] for port in ports}
+        declarations = []
+        for net in sorted(set(nets.values())):
+            if net in port_names:
+                continue
+            width = net_width(net)
+            value = f" = {width}'d0" if drivers.get(net) is None else ""
+            declarations.append(f"  wire {f'[{width - 1}:0] ' if width > 1 else ''}{net}{value};")
+
+        lines = [
+            f"// Generated by scripts/make/gen_system_top.py from projects/{self.project}/block_design.tcl -- do not edit",
+            "`timescale 1 ns / 1 ps",
+            "",
+            f"module {TOP_MODULE} (",
+            ",\n".join(f"  {direction} wire {f'[{width - 1}:0] ' if width > 1 else ''}{name}"
+                       for direction, width, name in ports),
+            ");",
+            "",
+        ]
+        lines += [f"  // {warning}" for warning in self.warnings]
+        lines += declarations + [""] + assigns + [""] + instances + ["", "endmodule", ""]
+
+        address_map = {
+            "project": self.project,
+            "clock": next((port[2] for port in ports if port[2].startswith("fclk_clk")), None),
+            "reset": next((port[2] for port in ports if port[2].startswith("fclk_reset")), None),
+            "regions": sorted(regions, key=lambda region: region["base"]),
+        }
+        return "\n".join(lines), address_map
+
+    def sources(self):
+        sources = []
+        for path in self.cores:
+            for source in self.cores[path]["sources"]:
+                if source not in sources:
+                    sources.append(source)
+        return sources
+
+
+def write_if_changed(path, content):
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def main(argv):
+    if len(argv) != 2:
+        print("[SYSTEM TOP] ERROR:", file=sys.stderr)
+        print("Usage: gen_system_top.py <project> <output_dir>", file=sys.stderr)
+        return 1
+    project, output_dir = argv
+    try:
+        top = system_top(project)
+        verilog, address_map = top.build()
+    except (OSError, ValueError) as error:
+        print(f"[SYSTEM TOP] ERROR: {error}", file=sys.stderr)
+        return 1
+    os.makedirs(output_dir, exist_ok=True)
+    top_file = os.path.join(os.path.abspath(output_dir), f"{TOP_MODULE}.v")
+    write_if_changed(top_file, verilog)
+    write_if_changed(os.path.join(output_dir, "address_map.json"), json.dumps(address_map, indent=2) + "\n")
+    for warning in top.warnings:
+        print(f"[SYSTEM TOP] WARNING: {warning}", file=sys.stderr)
+    for source in [top_file, IP_MODELS] + top.sources():
+        print(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# Cached manifest of the projects' build inputs, so the Makefile doesn't re-run the parsing and check
+# scripts at every invocation.
+# Arguments: make <board> <board_version> <project> <out_file> | params <parameters_file> | show
+# Usage:
+#   project_manifest.py make <board> <board_version> <project> <out_file>
+#     Write the make fragment of a project and board (PROJECT_CORES, PART, BOARD_XDC), included by the Makefile
+#   project_manifest.py params <parameters_file>
+#     Print the Verilator -pvalue+<name>=<value> arguments of a core's parameters.json, for cocotb.mk
+#   project_manifest.py show
+#     Print the cached manifest as JSON
+# Example:
+#   python3 scripts/make/project_manifest.py make snickerdoodle_black 1.0 ex02_axi_interface tmp/manifest/ex02.mk
+#
+# The manifest (tmp/manifest/manifest.json) holds, for each project, its custom cores (read from
+# block_design.tcl and its modules with block_design.py, like get_cores_from_tcl.sh), and for each board,
+# its FPGA part (like get_part.sh). Entries are keyed on a hash of the files they were read from, and only
+# re-read when those change. Core test parameters aren't part of it: cocotb.mk parses a core's
+# parameters.json with the params command once per test run (the file may also be a sweep's, see sweep_core.py).
+#
+# The Makefile includes the make fragment, and only regenerates it when one of its inputs is newer (see
+# the MANIFEST_MK rule), so the project checks (check/project_src.sh --full) run once per change too.
+
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+
+from block_design import REPO_DIR, block_design
+
+MANIFEST_FILE = os.path.join(REPO_DIR, "tmp", "manifest", "manifest.json")
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_if_changed(path, text):
+    """
+    Writes a file atomically, only if its content changes.
+    """
+    try:
+        with open(path) as f:
+            if f.read() == text:
+                return
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(text)
+    os.replace(tmp_file, path)
+
+
+def files_hash(paths):
+    """
+    Hashes the names and contents of files (relative to the repository). Missing files hash as missing.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode() + b"\0")
+        try:
+            with open(os.path.join(REPO_DIR, path), "rb") as f:
+                data = f.read()
+            digest.update(len(data).to_bytes(8, "little") + data)
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+
+def parameter_args(parameters):
+    """
+    Formats core parameters as Verilator -pvalue arguments (strings as is, other values as JSON, like jq's tostring).
+    """
+    return [f"-pvalue+{name}={value if isinstance(value, str) else json.dumps(value)}" for name, value in parameters.items()]
+
+
+def project_entry(manifest, project):
+    """
+    Returns a project's manifest entry, re-reading the block design if any of its sources changed.
+    Raises:
+        ValueError: If the block design can't be read, or two custom cores have the same name.
+    """
+    projects = manifest.setdefault("projects", {})
+    entry = projects.get(project)
+    if entry and files_hash(entry["sources"]) == entry["hash"]:
+        return entry
+
+    design = block_design(project)
+    cores = design.custom_cores()
+    names = {}
+    for core in cores:
+        name = core.split("/")[1]
+        if name in names:
+            raise ValueError(f"Duplicate custom core name in {project}: {name} ({names[name]}, {core})")
+        names[name] = core
+
+    sources = [os.path.relpath(source, REPO_DIR) for source in design.sources]
+    entry = {
+        "hash": files_hash(sources),
+        "sources": sources,
+        "cores": cores,
+        "core_dirs": {core: os.path.relpath(os.path.realpath(os.path.join(REPO_DIR, "projects", project, "cores", core)), REPO_DIR)
+                      for core in cores},
+    }
+    projects[project] = entry
+    return entry
+
+
+def board_entry(manifest, board, board_version):
+    """
+    Returns a board's manifest entry, re-reading its board.xml if it changed.
+    Raises:
+        ValueError: If the board file has no FPGA part.
+    """
+    boards = manifest.setdefault("boards", {})
+    key = f"{board}/{board_version}"
+    board_file = os.path.join("boards", board, "board_files", board_version, "board.xml")
+    entry = boards.get(key)
+    if entry and files_hash([board_file]) == entry["hash"]:
+        return entry
+
+    try:
+        with open(os.path.join(REPO_DIR, board_file)) as f:
+            match = re.search(r'type="fpga" part_name="([^"]+)"', f.read())
+    except OSError:
+        match = None
+    if match is None:
+        raise ValueError(f"No FPGA part found in {board_file}")
+    entry = {"hash": files_hash([board_file]), "part": match.group(1)}
+    boards[key] = entry
+    return entry
+
+
+def write_make_fragment(board, board_version, project, out_file):
+    """
+    Checks the project sources and writes the make fragment of a project and board.
+    Returns:
+        int: Exit code (1 if the checks or the manifest fail)
+    """
+    check = subprocess.run(["./scripts/check/project_src.sh", board, board_version, project, "--full"],
+                           cwd=REPO_DIR, capture_output=True, text=True)
+    if check.returncode != 0 or check.stdout.strip():
+        print("[PROJECT MANIFEST] ERROR: Project check failed (scripts/check/project_src.sh):")
+        print(check.stdout.strip() or check.stderr.strip())
+        return 1
+
+    manifest = _read_json(MANIFEST_FILE, {})
+    try:
+        project_info = project_entry(manifest, project)
+        board_info = board_entry(manifest, board, board_version)
+    except (OSError, ValueError) as error:
+        print(f"[PROJECT MANIFEST] ERROR: {error}")
+        return 1
+    _write_if_changed(MANIFEST_FILE, json.dumps(manifest, indent=2) + "\n")
+
+    xdc_files = sorted(os.path.relpath(path, REPO_DIR) for path in
+                       glob.glob(os.path.join(REPO_DIR, "projects", project, "cfg", board, board_version, "xdc", "*.xdc")))
+    lines = [
+        "# Generated by scripts/make/project_manifest.py -- do not edit",
+        f"MANIFEST_PROJECT := {project}",
+        f"PROJECT_CORES := {' '.join(project_info['cores'])}",
+        f"PART := {board_info['part']}",
+        f"BOARD_XDC := {' '.join(xdc_files)}",
+    ]
+    _write_if_changed(out_file, "\n".join(lines) + "\n")
+    # Mark the fragment as up to date for make, even when its content didn't change
+    os.utime(out_file)
+    return 0
+
+
+def main(argv):
+    if len(argv) == 5 and argv[0] == "make":
+        return write_make_fragment(*argv[1:])
+    if len(argv) == 2 and argv[0] == "params":
+        parameters = _read_json(argv[1], None)
+        if not isinstance(parameters, dict):
+            print(f"[PROJECT MANIFEST] ERROR: Invalid parameters file: {argv[1]}", file=sys.stderr)
+            return 1
+        print(" ".join(parameter_args(parameters)))
+        return 0
+    if len(argv) == 1 and argv[0] == "show":
+        print(json.dumps(_read_json(MANIFEST_FILE, {}), indent=2))
+        return 0
+    print("[PROJECT MANIFEST] ERROR:")
+    print("Usage: project_manifest.py make <board> <board_version> <project> <out_file> | params <parameters_file> | show")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# Append-only database of core test results, to follow pass rates, test times and coverage across runs.
+# Usage:
+#   results_db.py ingest <results_dir> [--project P] [--vendor V] [--core C] [--testbench T] [--status S]
+#                 [--wall-time S] [--parameters FILE] [--label TEXT]
+#     Record a test run from its results directory (run by test_core.sh after every run)
+#   results_db.py runs [--core C] [--limit N]
+#     List the latest runs
+#   results_db.py trend [--core C] [--test T] [--by commit|day] [--limit N]
+#     Pass rate of the runs (or of one test's runs) per commit or per day
+#   results_db.py slowest [--core C] [--last N] [--limit N]
+#     Slowest tests by mean wall time over the last N runs of each core
+#   results_db.py coverage [--core C] [--item PREFIX] [--limit N]
+#     Coverage (bins hit at least once) of every run with coverage, or of the items under PREFIX
+#   results_db.py regressions <base_commit> [<commit>] [--core C] [--threshold PCT]
+#     Tests that fail at <commit> (default: the latest one recorded) but passed at <base_commit>,
+#     and tests whose mean wall time grew by more than --threshold percent (default 10)
+# Example:
+#   python3 scripts/make/results_db.py trend --core base/fifo_sync
+#
+# Environment variables:
+#   RESULTS_DB: Database file (default: <repo>/tmp/results/results.db)
+#     To stop test_core.sh from recording runs, set RECORD_RESULTS=0 instead ("off" isn't accepted as a file name)
+#
+# A run is read from the files test_core.sh and cocotb.mk leave in the results directory:
+# - results.xml: Status, wall time, simulated time and failure message of every test, and the random seed
+#     (of each shard, for sharded runs)
+# - *coverage.xml: Cover items and bin hit counts exported by cocotb-coverage (e.g. fifo_sync_coverage.xml)
+# - dump.vcd, dump.fst, waves_*.vcd: Size of the waveform files
+# The run is stored with the git commit, the core's parameters (tests/src/parameters.json next to the results
+# directory by default) and the status and wall time given by the caller. A run without a results.xml (e.g. a
+# failed build) is still recorded, with no tests. Ingesting the same results.xml twice records it once.
+#
+# Ingestion is a single SQLite transaction, and takes a few tens of milliseconds for a typical core.
+
+import glob
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DB_FILE = os.environ.get("RESULTS_DB") or os.path.join(REPO_DIR, "tmp", "results", "results.db")
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ingested_at TEXT NOT NULL,
+    commit_hash TEXT,
+    project TEXT,
+    core TEXT,
+    testbench TEXT,
+    label TEXT,
+    status TEXT NOT NULL,
+    seed INTEGER,
+    parameters TEXT,
+    wall_time_s REAL,
+    sim_time_ns REAL,
+    tests INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    trace_bytes INTEGER NOT NULL,
+    results_dir TEXT NOT NULL,
+    results_key TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seed INTEGER,
+    wall_time_s REAL,
+    sim_time_ns REAL,
+    message TEXT
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    item TEXT NOT NULL,
+    bins INTEGER NOT NULL,
+    covered INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS coverage_bins (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    item TEXT NOT NULL,
+    bin TEXT NOT NULL,
+    hits INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_core ON runs(core, id);
+CREATE INDEX IF NOT EXISTS tests_run ON tests(run_id);
+CREATE INDEX IF NOT EXISTS coverage_run ON coverage(run_id);
+"""
+
+# Waveform files written to the results directory (see the WAVES modes of cocotb.mk)
+TRACE_PATTERNS = ["dump.vcd", "dump.fst", "waves_*.vcd"]
+
+
+def connect(path=None):
+    """
+    Opens the results database, creating it if needed.
+    """
+    path = path or DB_FILE
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Parallel test runs (test_all_cores.py) ingest at the same time: wait for each other's transactions
+    db = sqlite3.connect(path, timeout=60)
+    db.row_factory = sqlite3.Row
+    if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        db.commit()
+    return db
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_results_xml(path):
+    """
+    Reads the testcases of a cocotb results.xml (or a merged one, with a testsuite per shard).
+    Returns:
+        list: Test dicts (name, status, seed, wall_time_s, sim_time_ns, message), in file order
+    """
+    tests = []
+    for suite in ET.parse(path).getroot().iter("testsuite"):
+        seed = None
+        for prop in suite.iter("property"):
+            if prop.get("name") == "random_seed":
+                seed = int(prop.get("value")) if (prop.get("value") or "").isdigit() else None
+        for testcase in suite.findall("testcase"):
+            failure = testcase.find("failure")
+            if failure is None:
+                failure = testcase.find("error")
+            if failure is not None:
+                status, message = "FAILED", failure.get("message") or (failure.text or "").strip()
+            elif testcase.find("skipped") is not None:
+                status, message = "SKIPPED", None
+            else:
+                status, message = "PASSED", None
+            tests.append({"name": testcase.get("name"), "status": status, "seed": seed,
+                          "wall_time_s": _float(testcase.get("time")),
+                          "sim_time_ns": _float(testcase.get("sim_time_ns")), "message": message})
+    return tests
+
+
+def read_coverage_xml(path):
+    """
+    Reads the cover items (the elements with bins) of a cocotb-coverage XML export.
+    Returns:
+        tuple: ([(item, bins, covered)], [(item, bin, hits)])
+    """
+    items = []
+    bins = []
+    root = ET.parse(path).getroot()
+    # cocotb-coverage puts every item under a "top" root: keep the names the testbench gave them
+    prefix = "top." if root.get("abs_name") == "top" else ""
+    for element in root.iter():
+        if element.get("weight") is None or element.get("abs_name") is None:
+            continue  # Not a cover item (the top or an intermediate level)
+        item = element.get("abs_name").removeprefix(prefix)
+        item_bins = [(item, child.get("bin"), int(child.get("hits", 0))) for child in element if "hits" in child.attrib]
+        items.append((item, int(element.get("size", len(item_bins))), int(element.get("coverage", 0))))
+        bins += item_bins
+    return items, bins
+
+
+def ingest(db, results_dir, project=None, core=None, testbench=None, status=None, wall_time=None,
+           parameters_file=None, label=None):
+    """
+    Records a test run from its results directory.
+    Returns:
+        int: The run id, or None if this results.xml was already recorded.
+    """
+    results_dir = os.path.abspath(results_dir)
+    results_file = os.path.join(results_dir, "results.xml")
+    tests = []
+    results_key = None
+    if os.path.isfile(results_file):
+        results_key = f"{results_file}:{os.stat(results_file).st_mtime_ns}"
+        if db.execute("SELECT 1 FROM runs WHERE results_key = ?", (results_key,)).fetchone():
+            return None
+        try:
+            tests = read_results_xml(results_file)
+        except ET.ParseError as error:
+            print(f"[RESULTS DB] WARNING: Can't read {results_file}: {error}", file=sys.stderr)
+
+    items = []
+    bins = []
+    for coverage_file in sorted(glob.glob(os.path.join(results_dir, "*coverage.xml"))):
+        try:
+            file_items, file_bins = read_coverage_xml(coverage_file)
+        except ET.ParseError as error:
+            print(f"[RESULTS DB] WARNING: Can't read {coverage_file}: {error}", file=sys.stderr)
+            continue
+        items += file_items
+        bins += file_bins
+
+    trace_bytes = sum(os.path.getsize(path) for pattern in TRACE_PATTERNS
+                      for path in glob.glob(os.path.join(results_dir, pattern)))
+    if parameters_file is None:
+        parameters_file = os.path.join(os.path.dirname(results_dir), "src", "parameters.json")
+    parameters = None
+    if os.path.isfile(parameters_file):
+        with open(parameters_file) as f:
+            parameters = json.dumps(json.load(f), sort_keys=True)
+
+    failures = sum(1 for test in tests if test["status"] == "FAILED")
+    if status is None:
+        status = "FAILED" if failures or not tests else "PASSED"
+    seeds = [test["seed"] for test in tests if test["seed"] is not None]
+    sim_times = [test["sim_time_ns"] for test in tests if test["sim_time_ns"] is not None]
+    if wall_time is None and tests:
+        wall_time = sum(test["wall_time_s"] or 0 for test in tests)
+
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (ingested_at, commit_hash, project, core, testbench, label, status, seed, parameters, "
+            "wall_time_s, sim_time_ns, tests, failures, trace_bytes, results_dir, results_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.strftime("%Y-%m-%d %H:%M:%S"), git_commit(), project, core, testbench, label, status,
+             seeds[0] if seeds else None, parameters, wall_time, sum(sim_times) if sim_times else None,
+             len(tests), failures, trace_bytes, results_dir, results_key)).lastrowid
+        db.executemany("INSERT INTO tests (run_id, name, status, seed, wall_time_s, sim_time_ns, message) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       [(run_id, test["name"], test["status"], test["seed"], test["wall_time_s"],
+                         test["sim_time_ns"], test["message"]) for test in tests])
+        db.executemany("INSERT INTO coverage (run_id, item, bins, covered) VALUES (?, ?, ?, ?)",
+                       [(run_id, *item) for item in items])
+        db.executemany("INSERT INTO coverage_bins (run_id, item, bin, hits) VALUES (?, ?, ?, ?)",
+                       [(run_id, *bin_hits) for bin_hits in bins])
+    return run_id
+
+
+def _format(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def print_table(columns, rows):
+    """
+    Prints rows (sequences in the order of columns) as an aligned table.
+    """
+    if not rows:
+        print("No results.")
+        return
+    cells = [[_format(value) for value in row] for row in rows]
+    widths = [max(len(column), *(len(row[index]) for row in cells)) for index, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def _short(commit_hash):
+    return commit_hash[:10] if commit_hash else None
+
+
+def _find_commit(db, prefix):
+    """
+    Resolves a commit prefix to the full hash recorded in the database.
+    Raises:
+        ValueError: If no run, or runs of several commits, match the prefix.
+    """
+    commits = [row[0] for row in db.execute("SELECT DISTINCT commit_hash FROM runs WHERE commit_hash LIKE ?",
+                                            (prefix + "%",))]
+    if len(commits) != 1:
+        raise ValueError(f"{'No' if not commits else 'Several'} recorded commits match {prefix}")
+    return commits[0]
+
+
+def query_runs(db, core=None, limit=20):
+    rows = db.execute("SELECT id, ingested_at, commit_hash, core, testbench, status, tests, failures, wall_time_s, "
+                      "sim_time_ns, seed, trace_bytes FROM runs WHERE (? IS NULL OR core = ?) "
+                      "ORDER BY id DESC LIMIT ?", (core, core, limit)).fetchall()
+    print_table(["run", "ingested", "commit", "core", "testbench", "status", "tests", "failures", "wall_s",
+                 "sim_ns", "seed", "trace_bytes"],
+                [(row["id"], row["ingested_at"], _short(row["commit_hash"]), *tuple(row)[3:]) for row in rows])
+
+
+def query_trend(db, core=None, test=None, by="commit", limit=20):
+    group = "r.commit_hash" if by == "commit" else "date(r.ingested_at)"
+    if test:
+        source = "tests t JOIN runs r ON t.run_id = r.id"
+        passed = "t.status = 'PASSED'"
+        condition = "t.name = ?"
+    else:
+        source = "runs r"
+        passed = "r.status = 'PASSED'"
+        condition = "? IS NULL"
+    rows = db.execute(f"SELECT {group} AS key, MIN(r.ingested_at) AS first, COUNT(*) AS total, "
+                      f"SUM({passed}) AS passed, AVG(r.wall_time_s) AS wall_s FROM {source} "
+                      f"WHERE (? IS NULL OR r.core = ?) AND {condition} "
+                      f"GROUP BY key ORDER BY MIN(r.id) DESC LIMIT ?", (core, core, test, limit)).fetchall()
+    rows.reverse()  # Oldest first
+    print_table([by, "first_run", "runs", "passed", "pass_rate", "mean_run_wall_s"],
+                [(_short(row["key"]) if by == "commit" else row["key"], row["first"], row["total"], row["passed"],
+                  f"{100 * row['passed'] / row['total']:.1f}%", row["wall_s"]) for row in rows])
+
+
+def query_slowest(db, core=None, last=10, limit=20):
+    # The last `last` runs of each core
+    rows = db.execute("WITH recent AS (SELECT id, core, ROW_NUMBER() OVER (PARTITION BY core ORDER BY id DESC) AS n "
+                      "FROM runs WHERE (? IS NULL OR core = ?)) "
+                      "SELECT recent.core, t.name, COUNT(*) AS runs, AVG(t.wall_time_s) AS mean_s, "
+                      "MAX(t.wall_time_s) AS max_s, AVG(t.sim_time_ns) AS sim_ns, "
+                      "SUM(t.sim_time_ns) / SUM(t.wall_time_s) AS ns_per_s "
+                      "FROM tests t JOIN recent ON t.run_id = recent.id WHERE recent.n <= ? "
+                      "GROUP BY recent.core, t.name ORDER BY mean_s DESC LIMIT ?",
+                      (core, core, last, limit)).fetchall()
+    print_table(["core", "test", "runs", "mean_wall_s", "max_wall_s", "mean_sim_ns", "sim_ns_per_s"],
+                [tuple(row) for row in rows])
+
+
+def query_coverage(db, core=None, item=None, limit=20):
+    rows = db.execute("SELECT r.id, r.ingested_at, r.commit_hash, r.core, COUNT(c.item) AS items, SUM(c.bins) AS bins, "
+                      "SUM(c.covered) AS covered FROM coverage c JOIN runs r ON c.run_id = r.id "
+                      "WHERE (? IS NULL OR r.core = ?) AND (? IS NULL OR c.item LIKE ? || '%') "
+                      "GROUP BY r.id ORDER BY r.id DESC LIMIT ?", (core, core, item, item, limit)).fetchall()
+    rows.reverse()
+    print_table(["run", "ingested", "commit", "core", "items", "bins", "covered", "coverage"],
+                [(row["id"], row["ingested_at"], _short(row["commit_hash"]), row["core"], row["items"], row["bins"],
+                  row["covered"], f"{100 * row['covered'] / row['bins']:.1f}%" if row["bins"] else None)
+                 for row in rows])
+
+
+def query_regressions(db, base, head=None, core=None, threshold=10.0):
+    """
+    Compares the tests of two commits.
+    Returns:
+        int: Number of regressions found.
+    """
+    base = _find_commit(db, base)
+    if head is None:
+        head = db.execute("SELECT commit_hash FROM runs WHERE commit_hash IS NOT NULL ORDER BY id DESC LIMIT 1").fetchone()[0]
+    else:
+        head = _find_commit(db, head)
+
+    def test_stats(commit):
+        return {(row["core"], row["name"]): row for row in db.execute(
+            "SELECT r.core, t.name, COUNT(*) AS runs, SUM(t.status = 'PASSED') AS passed, "
+            "SUM(t.status = 'FAILED') AS failed, AVG(t.wall_time_s) AS wall_s FROM tests t "
+            "JOIN runs r ON t.run_id = r.id WHERE r.commit_hash = ? AND (? IS NULL OR r.core = ?) "
+            "GROUP BY r.core, t.name", (commit, core, core))}
+
+    base_stats = test_stats(base)
+    head_stats = test_stats(head)
+    print(f"Comparing {_short(head)} with {_short(base)} ({len(head_stats)} and {len(base_stats)} tests)")
+    rows = []
+    for key, now in head_stats.items():
+        before = base_stats.get(key)
+        if before is None:
+            continue
+        if now["failed"] and not before["failed"] and before["passed"]:
+            rows.append((*key, "newly failing", f"{before['passed']}/{before['runs']} passed",
+                         f"{now['passed']}/{now['runs']} passed"))
+        if before["wall_s"] and now["wall_s"] is not None:
+            change = 100 * (now["wall_s"] - before["wall_s"]) / before["wall_s"]
+            if change > threshold:
+                rows.append((*key, f"{change:+.1f}% wall time", f"{before['wall_s']:.3f} s", f"{now['wall_s']:.3f} s"))
+    print_table(["core", "test", "regression", _short(base), _short(head)], rows)
+    return len(rows)
+
+
+def _options(argv, names):
+    """
+    Pops --name value options from argv.
+    Returns:
+        tuple: (dict of the options given, remaining positional arguments)
+    """
+    options = {}
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg.startswith("--") and arg[2:] in names and argv:
+            options[arg[2:].replace("-", "_")] = argv.pop(0)
+        else:
+            args.append(arg)
+    return options, args
+
+
+def main(argv):
+    commands = {
+        "ingest": ["project", "vendor", "core", "testbench", "status", "wall-time", "parameters", "label"],
+        "runs": ["core", "limit"],
+        "trend": ["core", "test", "by", "limit"],
+        "slowest": ["core", "last", "limit"],
+        "coverage": ["core", "item", "limit"],
+        "regressions": ["core", "threshold"],
+    }
+    command = argv.pop(0) if argv else None
+    if command not in commands:
+        print("[RESULTS DB] ERROR:", file=sys.stderr)
+        print("Usage: results_db.py {ingest|runs|trend|slowest|coverage|regressions} [args...]", file=sys.stderr)
+        return 1
+    if DB_FILE in ("off", "0"):
+        print(f"[RESULTS DB] ERROR: RESULTS_DB={DB_FILE} is not a database file. RESULTS_DB sets the database path; "
+              f"set RECORD_RESULTS=0 to stop test_core.sh from recording runs", file=sys.stderr)
+        return 1
+    options, args = _options(argv, commands[command])
+    try:
+        for name in ("limit", "last"):
+            if name in options:
+                options[name] = int(options[name])
+        if "threshold" in options:
+            options["threshold"] = float(options["threshold"])
+    except ValueError as error:
+        print(f"[RESULTS DB] ERROR: {error}", file=sys.stderr)
+        return 1
+
+    db = connect()
+    try:
+        if command == "ingest":
+            if len(args) != 1:
+                print("[RESULTS DB] ERROR: Usage: results_db.py ingest <results_dir> [options]", file=sys.stderr)
+                return 1
+            # Cores are named <vendor>/<core>, like in test_all_cores.py
+            vendor = options.pop("vendor", None)
+            if vendor and options.get("core"):
+                options["core"] = f"{vendor}/{options['core']}"
+            run_id = ingest(db, args[0], project=options.get("project"), core=options.get("core"),
+                            testbench=options.get("testbench"), status=options.get("status"),
+                            wall_time=_float(options.get("wall_time")), parameters_file=options.get("parameters"),
+                            label=options.get("label"))
+            if run_id is None:
+                print(f"[RESULTS DB] {args[0]}: already recorded")
+            else:
+                print(f"[RESULTS DB] Recorded run {run_id} in {DB_FILE}")
+        elif command == "regressions":
+            if not 1 <= len(args) <= 2:
+                print("[RESULTS DB] ERROR: Usage: results_db.py regressions <base_commit> [<commit>]", file=sys.stderr)
+                return 1
+            return 1 if query_regressions(db, *args, **options) else 0
+        else:
+            if options.get("by", "commit") not in ("commit", "day"):
+                print("[RESULTS DB] ERROR: --by must be commit or day", file=sys.stderr)
+                return 1
+            {"runs": query_runs, "trend": query_trend, "slowest": query_slowest,
+             "coverage": query_coverage}[command](db, **options)
+    except (ValueError, sqlite3.Error) as error:
+        print(f"[RESULTS DB] ERROR: {error}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
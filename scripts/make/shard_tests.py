@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Runs a core's cocotb tests in parallel, one simulator process per test (and seed).
+# Arguments: <project> <vendor> <core> [--jobs N] [--seeds N] [--seed BASE]
+# Usage: shard_tests.py <project> <vendor> <core> [--jobs N] [--seeds N] [--seed BASE]
+# Example:
+#   python3 scripts/make/shard_tests.py ex02_axi_interface base fifo_sync --jobs 4
+#
+# The tests are discovered from the @cocotb.test() functions of tests/src/<TESTBENCH>.py
+# (TESTBENCH defaults to "testbench"). The simulator is built once (through the simulation build
+# cache, see sim_cache.py), then every test is run with each of --seeds random seeds (default 1,
+# counting up from --seed, or RANDOM_SEED, or the current time) as its own shard, selected with
+# cocotb's TESTCASE and RANDOM_SEED, in a process pool with one worker per CPU core by default.
+#
+# Each shard runs in its own results directory, tests/results/shards/<test>_seed<seed>.
+# The shards' results.xml files are merged into tests/results/results.xml (one testsuite per shard,
+# keeping each testcase's timing attributes), and coverage XML files found in every shard are merged
+# with cocotb_coverage when it's available. Exits with 1 if any shard fails.
+
+import ast
+import glob
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+COCOTB_MK = os.path.join(REPO_DIR, "scripts", "make", "cocotb.mk")
+
+
+def discover_tests(testbench_file):
+    """
+    Finds the names of the @cocotb.test() functions in a testbench module, in file order.
+    """
+    with open(testbench_file) as f:
+        tree = ast.parse(f.read(), filename=testbench_file)
+
+    def is_test_decorator(decorator):
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        if isinstance(decorator, ast.Attribute):
+            return decorator.attr == "test" and isinstance(decorator.value, ast.Name) and decorator.value.id == "cocotb"
+        return isinstance(decorator, ast.Name) and decorator.id == "test"
+
+    return [
+        node.name for node in tree.body
+        if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef)) and any(is_test_decorator(d) for d in node.decorator_list)
+    ]
+
+
+def run_shard(src_dir, shard_dir, test, seed, make_args):
+    """
+    Runs a single test with a single seed in its own results directory. Runs in a worker process.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", RANDOM_SEED=str(seed))
+    start = time.perf_counter()
+    with open(os.path.join(shard_dir, "log.txt"), "w") as log:
+        make_result = subprocess.run(
+            ["make", f"--directory={src_dir}", f"--file={COCOTB_MK}", "test_custom_core",
+             f"TESTCASE={test}", f"RESULTS_DIR={shard_dir}"] + make_args,
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+        ).returncode
+    return {
+        "test": test,
+        "seed": seed,
+        "results_dir": shard_dir,
+        "make_exit_code": make_result,
+        "wall_time_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def merge_results(shards, merged_file):
+    """
+    Merges the shards' results.xml files into one, with a testsuite per shard.
+    Shards without a readable results.xml get a failed testcase, so the failure shows up in the merged file.
+    Returns:
+        tuple: (number of testcases, number of failed testcases)
+    """
+    merged = ET.Element("testsuites", name="results")
+    tests = failures = 0
+    for shard in shards:
+        suite = ET.SubElement(merged, "testsuite", name=f"{shard['test']}[seed={shard['seed']}]", package="all")
+        ET.SubElement(suite, "property", name="random_seed", value=str(shard["seed"]))
+        results_file = os.path.join(shard["results_dir"], "results.xml")
+        try:
+            testcases = ET.parse(results_file).getroot().findall(".//testcase")
+        except (OSError, ET.ParseError):
+            testcases = []
+        if not testcases:
+            testcase = ET.SubElement(suite, "testcase", name=shard["test"], classname="shard", time=repr(shard["wall_time_s"]))
+            ET.SubElement(testcase, "failure", message=f"No test results (make exited with {shard['make_exit_code']}), "
+                                                       f"see {os.path.join(shard['results_dir'], 'log.txt')}")
+            testcases = [testcase]
+        else:
+            suite.extend(testcases)
+        shard_failures = sum(1 for testcase in testcases if testcase.find("failure") is not None)
+        shard["status"] = "FAILED" if shard_failures or shard["make_exit_code"] else "PASSED"
+        tests += len(testcases)
+        failures += shard_failures
+    ET.ElementTree(merged).write(merged_file, encoding="UTF-8", xml_declaration=True)
+    return tests, failures
+
+
+def merge_coverage_files(shard_dirs, results_dir):
+    """
+    Merges the coverage XML files present in every shard directory (e.g. fifo_sync_coverage.xml).
+    """
+    try:
+        from cocotb_coverage.coverage import merge_coverage
+    except ImportError:
+        return
+    names = set.intersection(*(
+        {os.path.basename(path) for path in glob.glob(os.path.join(shard_dir, "*coverage*.xml"))}
+        for shard_dir in shard_dirs
+    ))
+    for name in sorted(names):
+        merge_coverage(lambda message: None, os.path.join(results_dir, name),
+                       *(os.path.join(shard_dir, name) for shard_dir in shard_dirs))
+        print(f"[CORE SHARDS] Merged {name} from {len(shard_dirs)} shards")
+
+
+def main(argv):
+    jobs = os.cpu_count() or 1
+    seeds = 1
+    base_seed = int(os.environ.get("RANDOM_SEED", int(time.time())))
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--jobs":
+            jobs = int(argv.pop(0))
+        elif arg == "--seeds":
+            seeds = int(argv.pop(0))
+        elif arg == "--seed":
+            base_seed = int(argv.pop(0))
+        else:
+            args.append(arg)
+    if len(args) != 3:
+        print("[CORE SHARDS] ERROR:")
+        print("Usage: shard_tests.py <project> <vendor> <core> [--jobs N] [--seeds N] [--seed BASE]")
+        return 1
+    project, vendor, core = args
+
+    test_dir = os.path.join(REPO_DIR, "projects", project, "cores", vendor, core, "tests")
+    src_dir = os.path.join(test_dir, "src")
+    results_dir = os.path.join(test_dir, "results")
+    testbench = os.environ.get("TESTBENCH", "testbench")
+    testbench_file = os.path.join(src_dir, f"{testbench}.py")
+    if not os.path.isfile(testbench_file):
+        print(f"[CORE SHARDS] ERROR: Testbench not found: {testbench_file}")
+        return 1
+    tests = discover_tests(testbench_file)
+    if not tests:
+        print(f"[CORE SHARDS] ERROR: No @cocotb.test() functions found in {testbench_file}")
+        return 1
+    make_args = [f"TESTBENCH={testbench}"]
+
+    # Build the simulator once, before the shards share it
+    os.makedirs(results_dir, exist_ok=True)
+    print(f"[CORE SHARDS] Building the simulator for {core}")
+    with open(os.path.join(results_dir, "build_log.txt"), "w") as log:
+        build_result = subprocess.run(
+            ["make", f"--directory={src_dir}", f"--file={COCOTB_MK}", "build_custom_core"] + make_args,
+            stdout=log, stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        ).returncode
+    if build_result != 0:
+        print(f"[CORE SHARDS] ERROR: Build failed, see {os.path.join(results_dir, 'build_log.txt')}")
+        return 1
+
+    shard_list = [(test, base_seed + index) for index in range(seeds) for test in tests]
+    shards_dir = os.path.join(results_dir, "shards")
+    jobs = max(1, min(jobs, len(shard_list)))
+    print(f"[CORE SHARDS] Running {len(tests)} tests x {seeds} seeds (from {base_seed}) for {core} with {jobs} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(run_shard, src_dir, os.path.join(shards_dir, f"{test}_seed{seed}"), test, seed, make_args)
+            for test, seed in shard_list
+        ]
+        shards = []
+        for future in futures:
+            shard = future.result()
+            shards.append(shard)
+            print(f"[CORE SHARDS] {shard['test']} (seed {shard['seed']}): make exited with {shard['make_exit_code']} "
+                  f"in {shard['wall_time_s']:.1f} s")
+    total_time = time.perf_counter() - start
+
+    test_count, failure_count = merge_results(shards, os.path.join(results_dir, "results.xml"))
+    merge_coverage_files([shard["results_dir"] for shard in shards], results_dir)
+    failed = [shard for shard in shards if shard["status"] != "PASSED"]
+    for shard in failed:
+        print(f"[CORE SHARDS] FAILED: {shard['test']} (seed {shard['seed']}), see {os.path.join(shard['results_dir'], 'log.txt')}")
+    print(f"[CORE SHARDS] {core}: {len(shards) - len(failed)}/{len(shards)} shards passed "
+          f"({test_count} testcases, {failure_count} failures) in {total_time:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# Content-addressed cache of Verilator simulation builds (cocotb SIM_BUILD directories).
+# Used by scripts/make/cocotb.mk so that a core shared between projects (or re-tested after
+# `make clean_tests`) is only Verilated and compiled once for a given set of inputs.
+#
+# Usage:
+#   sim_cache.py key [--extra-args "<args>"] [--toplevel <name>] [--params <parameters.json>] <sources...>
+#     Print the cache key for the given build inputs
+#   sim_cache.py build <key> -- <build command...>
+#     Run the build command for a cache entry (skipped on a hit), then record it and evict old entries
+#   sim_cache.py use <key> -- <command...>
+#     Run a command (the simulation) with a cache entry marked as in use, so it isn't evicted meanwhile
+#   sim_cache.py stats
+#     Print hit/miss statistics and the cache contents
+#   sim_cache.py clean
+#     Remove all cache entries and statistics
+#
+# Environment variables:
+#   SIM_CACHE_DIR: Cache directory (default: <repo>/tmp/sim_cache)
+#   SIM_CACHE_MAX_MB: Cache size limit in MiB, enforced with least-recently-used eviction (default: 2048)
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager, ExitStack
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CACHE_DIR = os.environ.get("SIM_CACHE_DIR") or os.path.join(REPO_DIR, "tmp", "sim_cache")
+MAX_BYTES = int(os.environ.get("SIM_CACHE_MAX_MB", "2048")) * 1024 * 1024
+KEY_LENGTH = 16
+
+STATS_FILE = "stats.json"
+META_FILE = "cache_meta.json"
+# Name of the Verilator executable built in each entry (see cocotb's Makefile.verilator)
+BUILD_PRODUCT = "Vtop"
+
+
+def _tool_version(command):
+    """
+    Returns the output of a tool version command, or "unknown" if it can't be run.
+    """
+    try:
+        return subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compute_key(sources, extra_args="", toplevel="", params=None):
+    """
+    Hashes everything that affects the compiled simulator:
+    Verilog sources (name and content, in order), parameters, extra arguments, top level,
+    and the Verilator/cocotb versions.
+    """
+    digest = hashlib.sha256()
+
+    def add(label, data):
+        if isinstance(data, str):
+            data = data.encode()
+        digest.update(label.encode() + b"\0" + len(data).to_bytes(8, "little") + data)
+
+    for source in sources:
+        add("source_name", os.path.basename(source))
+        with open(source, "rb") as f:
+            add("source", f.read())
+    if params and os.path.isfile(params):
+        with open(params, "rb") as f:
+            add("params", f.read())
+    add("extra_args", " ".join(extra_args.split()))
+    add("toplevel", toplevel)
+    add("verilator", _tool_version(["verilator", "--version"]))
+    add("cocotb", _tool_version(["cocotb-config", "--version"]))
+    add("cocotb_lib_dir", _tool_version(["cocotb-config", "--lib-dir"]))
+    return digest.hexdigest()[:KEY_LENGTH]
+
+
+@contextmanager
+def _locked(name, shared=False, blocking=True):
+    """
+    Holds a file lock in the cache directory for the duration of the block (exclusive unless shared).
+    Yields True once the lock is held, or False without waiting if blocking is False and the lock is taken.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, name + ".lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _record_stat(result):
+    """
+    Increments the hit or miss counter.
+    """
+    with _locked("stats"):
+        path = os.path.join(CACHE_DIR, STATS_FILE)
+        stats = _read_json(path, {"hits": 0, "misses": 0, "evictions": 0})
+        stats[result] = stats.get(result, 0) + 1
+        _write_json(path, stats)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _entries():
+    """
+    Returns (key, metadata) for every complete cache entry.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for key in os.listdir(CACHE_DIR):
+        meta = _read_json(os.path.join(CACHE_DIR, key, META_FILE), None)
+        if meta is not None:
+            entries.append((key, meta))
+    return entries
+
+
+def _refresh_timestamps(entry_dir, now):
+    """
+    Gives every file in an entry the same modification time, so make considers the whole
+    build up to date regardless of the sources' timestamps (the key already covers their content).
+    """
+    for root, _, files in os.walk(entry_dir):
+        for name in files:
+            os.utime(os.path.join(root, name), (now, now))
+
+
+def _evict(keep_key):
+    """
+    Removes least-recently-used entries until the cache fits in MAX_BYTES.
+    Each entry is checked again under its lock before it's removed, and skipped if it was
+    restored by another run since it was listed, or if a simulation is using it (see use).
+    """
+    entries = sorted(_entries(), key=lambda entry: entry[1].get("last_used", 0))
+    total = sum(meta.get("size", 0) for _, meta in entries)
+    evicted = 0
+    for key, meta in entries:
+        if total <= MAX_BYTES:
+            break
+        if key == keep_key:
+            continue
+        with _locked(key):
+            current = _read_json(os.path.join(CACHE_DIR, key, META_FILE), None)
+            if current is None or current.get("last_used") != meta.get("last_used"):
+                continue  # Removed or restored since it was listed
+            with _locked(key + ".use", blocking=False) as unused:
+                if not unused:
+                    continue
+                shutil.rmtree(os.path.join(CACHE_DIR, key), ignore_errors=True)
+        total -= meta.get("size", 0)
+        evicted += 1
+        print(f"[SIM CACHE] Evicted {key} ({meta.get('size', 0) / 2**20:.1f} MiB)")
+    if evicted:
+        with _locked("stats"):
+            path = os.path.join(CACHE_DIR, STATS_FILE)
+            stats = _read_json(path, {"hits": 0, "misses": 0, "evictions": 0})
+            stats["evictions"] = stats.get("evictions", 0) + evicted
+            _write_json(path, stats)
+
+
+def build(key, command):
+    """
+    Builds a cache entry with the given command unless it's already cached.
+    The entry is locked during the build so concurrent runs with the same key build it once.
+    Returns the build command's exit code (0 on a hit).
+    """
+    entry_dir = os.path.join(CACHE_DIR, key)
+    meta_path = os.path.join(entry_dir, META_FILE)
+
+    with _locked(key):
+        meta = _read_json(meta_path, None)
+        now = time.time()
+        if meta is not None and os.path.isfile(os.path.join(entry_dir, BUILD_PRODUCT)):
+            print(f"[SIM CACHE] Hit: {key}")
+            _record_stat("hits")
+            _refresh_timestamps(entry_dir, now)
+            meta["last_used"] = now
+            meta["uses"] = meta.get("uses", 0) + 1
+            _write_json(meta_path, meta)
+            return 0
+
+        print(f"[SIM CACHE] Miss: {key} -- building")
+        _record_stat("misses")
+        # Drop any partial build from an interrupted or failed run
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.makedirs(entry_dir)
+        start = time.time()
+        result = subprocess.run(command).returncode
+        if result != 0:
+            print(f"[SIM CACHE] Build failed for {key} (exit code {result})")
+            return result
+
+        _write_json(meta_path, {
+            "created": now,
+            "last_used": time.time(),
+            "build_time_s": time.time() - start,
+            "size": _dir_size(entry_dir),
+            "uses": 1,
+        })
+
+    _evict(keep_key=key)
+    return 0
+
+
+def use(key, command):
+    """
+    Runs a command with a cache entry marked as in use (a shared lock, which _evict doesn't wait for),
+    so the entry isn't evicted by a concurrent build while the command runs.
+    Returns the command's exit code, or 1 if the entry isn't complete (e.g. it was evicted after it was built).
+    """
+    entry_dir = os.path.join(CACHE_DIR, key)
+    with ExitStack() as in_use:
+        with _locked(key):
+            if _read_json(os.path.join(entry_dir, META_FILE), None) is None or \
+                    not os.path.isfile(os.path.join(entry_dir, BUILD_PRODUCT)):
+                print(f"[SIM CACHE] ERROR: {key} isn't in the cache (evicted since it was built?), run it again")
+                return 1
+            in_use.enter_context(_locked(key + ".use", shared=True))
+        return subprocess.run(command).returncode
+
+
+def print_stats():
+    stats = _read_json(os.path.join(CACHE_DIR, STATS_FILE), {"hits": 0, "misses": 0, "evictions": 0})
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = 100.0 * stats["hits"] / lookups if lookups else 0.0
+    entries = sorted(_entries(), key=lambda entry: entry[1].get("last_used", 0), reverse=True)
+    total = sum(meta.get("size", 0) for _, meta in entries)
+
+    print(f"Simulation build cache: {CACHE_DIR}")
+    print(f"  Hits: {stats['hits']}, Misses: {stats['misses']} ({hit_rate:.1f}% hit rate), Evictions: {stats.get('evictions', 0)}")
+    print(f"  Entries: {len(entries)}, Size: {total / 2**20:.1f} MiB of {MAX_BYTES / 2**20:.0f} MiB")
+    for key, meta in entries:
+        last_used = time.strftime("%Y/%m/%d %H:%M", time.localtime(meta.get("last_used", 0)))
+        print(f"  - {key}: {meta.get('size', 0) / 2**20:.1f} MiB, built in {meta.get('build_time_s', 0):.1f} s, "
+              f"used {meta.get('uses', 0)} times, last used {last_used}")
+
+
+def main(argv):
+    if len(argv) < 1:
+        print("Usage: sim_cache.py <key|build|use|stats|clean> [args...]")
+        return 1
+    command, args = argv[0], argv[1:]
+
+    if command == "key":
+        extra_args, toplevel, params, sources = "", "", None, []
+        while args:
+            arg = args.pop(0)
+            if arg == "--extra-args":
+                extra_args = args.pop(0)
+            elif arg == "--toplevel":
+                toplevel = args.pop(0)
+            elif arg == "--params":
+                params = args.pop(0)
+            else:
+                sources.append(arg)
+        print(compute_key(sources, extra_args, toplevel, params))
+        return 0
+
+    if command == "build":
+        if len(args) < 3 or args[1] != "--":
+            print("Usage: sim_cache.py build <key> -- <build command...>")
+            return 1
+        return build(args[0], args[2:])
+
+    if command == "use":
+        if len(args) < 3 or args[1] != "--":
+            print("Usage: sim_cache.py use <key> -- <command...>")
+            return 1
+        return use(args[0], args[2:])
+
+    if command == "stats":
+        print_stats()
+        return 0
+
+    if command == "clean":
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"[SIM CACHE] Removed {CACHE_DIR}")
+        return 0
+
+    print(f"Unknown command: {command}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# Runs a core's cocotb tests across a sweep of Verilog parameter sets, in parallel.
+# Arguments: <project> <vendor> <core> [--jobs N] [--batch]
+# Usage: sweep_core.py <project> <vendor> <core> [--jobs N] [--batch]
+# Example:
+#   python3 scripts/make/sweep_core.py ex02_axi_interface base fifo_sync
+#
+# The sweep is read from tests/src/parameter_sweep.json, which can be either:
+# - A list of parameter sets, e.g. [{"DATA_WIDTH": 8}, {"DATA_WIDTH": 32, "ADDR_WIDTH": 6}]
+# - An object with a "matrix" of parameter value lists (expanded to their cartesian product)
+#     and/or a list of explicit "sets", e.g. {"matrix": {"DATA_WIDTH": [8, 16], "ADDR_WIDTH": [3, 4]}}
+# Each parameter set is applied on top of tests/src/parameters.json (if present).
+#
+# Every set builds (through the simulation build cache, see sim_cache.py) and runs in its own
+# results directory, tests/results/sweep/set_<N>, in a process pool with one worker per CPU core
+# by default. A merged summary is written to tests/results/sweep/summary.txt and summary.json.
+#
+# With --batch, all the sets are instead simulated side by side by a single build and simulation (see
+# batch_sim.mk), in tests/results/sweep/batch, and the summary is made from the per-instance results of
+# the core's batch testbench (batch_results.json). This saves the per-set builds and simulator start-ups.
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+COCOTB_MK = os.path.join(REPO_DIR, "scripts", "make", "cocotb.mk")
+
+
+def expand_sweep(sweep):
+    """
+    Expands a parameter_sweep.json description into a list of parameter set dictionaries.
+    """
+    if isinstance(sweep, list):
+        return [dict(parameter_set) for parameter_set in sweep]
+    if not isinstance(sweep, dict) or not ({"matrix", "sets"} & sweep.keys()):
+        raise ValueError("parameter_sweep.json must be a list of parameter sets or an object with \"matrix\" and/or \"sets\"")
+
+    parameter_sets = []
+    matrix = sweep.get("matrix", {})
+    if matrix:
+        names = list(matrix.keys())
+        for values in itertools.product(*(matrix[name] for name in names)):
+            parameter_sets.append(dict(zip(names, values)))
+    parameter_sets.extend(dict(parameter_set) for parameter_set in sweep.get("sets", []))
+    return parameter_sets
+
+
+def summarize_results(results_file):
+    """
+    Counts the tests and failures in a cocotb results.xml file.
+    Returns:
+        tuple: (number of tests, number of failures), or (0, None) if the file is missing or invalid.
+    """
+    try:
+        root = ET.parse(results_file).getroot()
+    except (OSError, ET.ParseError):
+        return (0, None)
+    testcases = root.findall(".//testcase")
+    failures = [testcase for testcase in testcases if testcase.find("failure") is not None]
+    return (len(testcases), len(failures))
+
+
+def run_parameter_set(src_dir, set_dir, parameters):
+    """
+    Builds and runs the core's tests for one parameter set in its own results directory.
+    Runs in a worker process.
+    """
+    os.makedirs(set_dir, exist_ok=True)
+    parameters_file = os.path.join(set_dir, "parameters.json")
+    with open(parameters_file, "w") as f:
+        json.dump(parameters, f, indent=2)
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    with open(os.path.join(set_dir, "log.txt"), "w") as log:
+        make_result = subprocess.run(
+            ["make", f"--directory={src_dir}", f"--file={COCOTB_MK}", "test_custom_core",
+             f"PARAMETERS_FILE={parameters_file}", f"RESULTS_DIR={set_dir}"],
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+        ).returncode
+    wall_time = time.perf_counter() - start
+
+    tests, failures = summarize_results(os.path.join(set_dir, "results.xml"))
+    passed = make_result == 0 and failures == 0 and tests > 0
+    return {
+        "parameters": parameters,
+        "results_dir": set_dir,
+        "status": "PASSED" if passed else "FAILED",
+        "tests": tests,
+        "failures": failures,
+        "make_exit_code": make_result,
+        "wall_time_s": round(wall_time, 3),
+    }
+
+
+def run_batch(src_dir, batch_dir, sweep_file, parameter_sets):
+    """
+    Builds and runs all the parameter sets at once, as the instances of a batch top (see batch_sim.mk).
+    Returns:
+        list: Results of the parameter sets, in the format of run_parameter_set.
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    with open(os.path.join(batch_dir, "log.txt"), "w") as log:
+        make_result = subprocess.run(
+            ["make", f"--directory={src_dir}", f"--file={COCOTB_MK}", "test_custom_core",
+             "BATCH=1", f"BATCH_SWEEP={sweep_file}", f"RESULTS_DIR={batch_dir}"],
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+        ).returncode
+    wall_time = time.perf_counter() - start
+
+    try:
+        with open(os.path.join(batch_dir, "batch_results.json")) as f:
+            batch_results = json.load(f)
+    except (OSError, ValueError):
+        batch_results = {"instances": [], "tests": {}}
+    instances = batch_results["instances"]
+    results = []
+    for index, parameters in enumerate(parameter_sets):
+        name = instances[index]["name"] if index < len(instances) else None
+        statuses = [test[name]["status"] for test in batch_results["tests"].values() if name in test]
+        failures = sum(status != "PASSED" for status in statuses) if statuses else None
+        # The make run fails as soon as one instance does, so the status comes from the instance's own tests
+        passed = failures == 0
+        results.append({
+            "parameters": parameters,
+            "results_dir": batch_dir,
+            "instance": name,
+            "status": "PASSED" if passed else "FAILED",
+            "tests": len(statuses),
+            "failures": failures,
+            "make_exit_code": make_result,
+            "wall_time_s": round(wall_time, 3),
+        })
+    return results
+
+
+def _label(result):
+    """
+    Name of a parameter set in the summary: its results directory, or its instance in a batch.
+    """
+    return result.get("instance") or os.path.basename(result["results_dir"])
+
+
+def main(argv):
+    jobs = os.cpu_count() or 1
+    batch = False
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--jobs":
+            jobs = int(argv.pop(0))
+        elif arg == "--batch":
+            batch = True
+        else:
+            args.append(arg)
+    if len(args) != 3:
+        print("[CORE SWEEP] ERROR:")
+        print("Usage: sweep_core.py <project> <vendor> <core> [--jobs N] [--batch]")
+        return 1
+    project, vendor, core = args
+
+    test_dir = os.path.join(REPO_DIR, "projects", project, "cores", vendor, core, "tests")
+    src_dir = os.path.join(test_dir, "src")
+    sweep_file = os.path.join(src_dir, "parameter_sweep.json")
+    if not os.path.isfile(sweep_file):
+        print(f"[CORE SWEEP] ERROR: Sweep file not found: {sweep_file}")
+        return 1
+
+    base_parameters = {}
+    if os.path.isfile(os.path.join(src_dir, "parameters.json")):
+        with open(os.path.join(src_dir, "parameters.json")) as f:
+            base_parameters = json.load(f)
+    with open(sweep_file) as f:
+        parameter_sets = [dict(base_parameters, **parameter_set) for parameter_set in expand_sweep(json.load(f))]
+
+    sweep_dir = os.path.join(test_dir, "results", "sweep")
+    os.makedirs(sweep_dir, exist_ok=True)
+    start = time.perf_counter()
+    if batch:
+        jobs = 1
+        print(f"[CORE SWEEP] Running {len(parameter_sets)} parameter sets for {core} in one batch simulation")
+        results = run_batch(src_dir, os.path.join(sweep_dir, "batch"), sweep_file, parameter_sets)
+        for result in results:
+            print(f"[CORE SWEEP] {_label(result)}: {result['status']} -- {json.dumps(result['parameters'])}")
+    else:
+        jobs = max(1, min(jobs, len(parameter_sets)))
+        print(f"[CORE SWEEP] Running {len(parameter_sets)} parameter sets for {core} with {jobs} workers")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(run_parameter_set, src_dir, os.path.join(sweep_dir, f"set_{index:03d}"), parameters)
+                for index, parameters in enumerate(parameter_sets)
+            ]
+            results = []
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                print(f"[CORE SWEEP] {_label(result)}: {result['status']} "
+                      f"in {result['wall_time_s']:.1f} s -- {json.dumps(result['parameters'])}")
+    total_time = time.perf_counter() - start
+
+    failed = [result for result in results if result["status"] != "PASSED"]
+    with open(os.path.join(sweep_dir, "summary.json"), "w") as f:
+        json.dump({"core": f"{vendor}/{core}", "wall_time_s": round(total_time, 3), "jobs": jobs, "batch": batch,
+                   "sets": results}, f, indent=2)
+    with open(os.path.join(sweep_dir, "summary.txt"), "w") as f:
+        f.write(f"Parameter sweep of {vendor}/{core} on {time.strftime('%Y/%m/%d at %H:%M %Z')}: "
+                f"{len(results) - len(failed)}/{len(results)} passed in {total_time:.1f} s "
+                f"({'one batch simulation' if batch else f'{jobs} workers'})\n\n")
+        for result in results:
+            failures = "?" if result["failures"] is None else result["failures"]
+            f.write(f"{_label(result)}: {result['status']} "
+                    f"({result['tests']} tests, {failures} failures) in {result['wall_time_s']:.1f} s\n")
+            f.write(f"  - {json.dumps(result['parameters'])}\n")
+
+    print(f"[CORE SWEEP] {core}: {len(results) - len(failed)}/{len(results)} parameter sets passed "
+          f"(see {os.path.relpath(sweep_dir, REPO_DIR)}/summary.txt)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,25 @@
+# System-level simulation of a project's block design, included by a project's system_sim/tests/src/test_config.mk
+#   (run through cocotb.mk from that directory, e.g. with `make PROJECT=<project> system_sim`)
+# Generates the system top and address map of the project with gen_system_top.py, and simulates them
+#   with the project's custom cores instead of a single core
+
+# Project of the simulation, derived from the directory name (projects/<project>/system_sim)
+SYSTEM_PROJECT := $(notdir $(abspath $(CORE_DIR)/..))
+# Where the generated system_top.v and address_map.json are placed
+SYSTEM_GEN_DIR := $(REPO_DIR)/tmp/system_sim/$(SYSTEM_PROJECT)
+
+# Generate the system top (only rewritten when the block design changes) and get its Verilog sources
+#   The sources are computed once and passed down to the recursive make calls
+ifeq ($(SYSTEM_SOURCES),)
+SYSTEM_SOURCES := $(shell python3 $(REPO_DIR)/scripts/make/gen_system_top.py $(SYSTEM_PROJECT) $(SYSTEM_GEN_DIR))
+ifeq ($(SYSTEM_SOURCES),)
+$(error Failed to generate the system top of project "$(SYSTEM_PROJECT)" (see the errors from gen_system_top.py above))
+endif
+endif
+export SYSTEM_SOURCES
+
+# Simulate the generated top and the project's cores (replacing the single core sources of cocotb.mk)
+CORE_SOURCES := $(SYSTEM_SOURCES)
+TOPLEVEL_MODULE := system_top
+# Address map of the system, read by scripts/cocotb/axi_address_map.py
+export SYSTEM_ADDRESS_MAP := $(SYSTEM_GEN_DIR)/address_map.json
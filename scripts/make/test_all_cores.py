@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# Tests the custom cores of every project, each shared core once, skipping cores that haven't changed.
+# Arguments: [--jobs N] [--force]
+# Usage: test_all_cores.py [--jobs N] [--force]
+# Example:
+#   python3 scripts/make/test_all_cores.py --jobs 4
+#
+# The cores of each project are found like the Makefile's PROJECT_CORES (get_cores_from_tcl.sh on the
+# project's block_design.tcl). Cores shared through symlinks (projects/*/cores/base -> example_cores/base)
+# are deduplicated by real path, and those with a tests/src directory are tested once with test_core.sh
+# under the first project that uses them. The others are listed as having no tests.
+#
+# Each core gets a content hash: every file of the core's directory (except its test results and status),
+# the files of other cores its tests/src/test_config.mk pulls in through $(CORE_DIR), the shared test
+# scripts (test_core.sh, cocotb.mk, the scripts/cocotb modules, ...), TESTBENCH/TEST_SHARDS/WAVES and the
+# Verilator/cocotb versions. Cores whose hash is unchanged since they last passed (or had no tests) are
+# skipped, unless --force is given. The rest run in a process pool (one worker per CPU core by default).
+#
+# Outputs:
+# - tests/test_status of each tested core (written by test_core.sh, or here if it fails before writing it,
+#     and kept as is for skipped cores)
+# - projects/<project>/tests/core_tests_summary for every project, in the same format as `make tests`
+# - tmp/core_tests/summary.json and tmp/core_tests/results.xml (JUnit), rolling up every core
+# Exits with 1 if any core fails.
+
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+OUT_DIR = os.path.join(REPO_DIR, "tmp", "core_tests")
+STATE_FILE = os.path.join(OUT_DIR, "state.json")
+
+# Shared inputs of every core's tests (relative to the repository)
+SHARED_INPUTS = [
+    "scripts/make/test_core.sh",
+    "scripts/make/cocotb.mk",
+    "scripts/make/shard_tests.py",
+    "scripts/make/sim_cache.py",
+    "scripts/cocotb/*",
+]
+# Environment variables that change what the tests run
+TEST_ENV = ["TESTBENCH", "TEST_SHARDS", "WAVES"]
+# Paths of a core's directory that are test outputs rather than inputs
+OUTPUT_NAMES = {"results", "test_status", "__pycache__"}
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _tool_version(command):
+    """
+    Returns the output of a tool version command, or "unknown" if it can't be run.
+    """
+    try:
+        return subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def project_cores(project):
+    """
+    Lists a project's custom cores (as "<vendor>/<core>"), like the Makefile's PROJECT_CORES.
+    """
+    result = subprocess.run(["./scripts/make/get_cores_from_tcl.sh", f"projects/{project}/block_design.tcl"],
+                            cwd=REPO_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"get_cores_from_tcl.sh failed for {project}: {result.stdout.strip()}")
+    return result.stdout.split()
+
+
+def discover_cores():
+    """
+    Finds the cores of every project, deduplicated by the real path of their directory.
+    Returns:
+        tuple: ({project: [vendor/core, ...]}, {real path: core dict}), the cores in discovery order
+    """
+    projects = {}
+    cores = {}
+    for block_design in sorted(glob.glob(os.path.join(REPO_DIR, "projects", "*", "block_design.tcl"))):
+        project = os.path.basename(os.path.dirname(block_design))
+        projects[project] = []
+        for name in project_cores(project):
+            vendor, core = name.split("/")
+            core_dir = os.path.join(REPO_DIR, "projects", project, "cores", vendor, core)
+            if not os.path.isdir(core_dir):
+                print(f"[ALL TESTS] WARNING: Core {name} of {project} not found in {os.path.dirname(core_dir)}")
+                continue
+            projects[project].append(name)
+            real_dir = os.path.realpath(core_dir)
+            if real_dir not in cores:
+                cores[real_dir] = {"name": name, "path": os.path.relpath(real_dir, REPO_DIR), "project": project,
+                                   "projects": [], "has_tests": os.path.isdir(os.path.join(real_dir, "tests", "src"))}
+            cores[real_dir]["projects"].append(project)
+    return projects, cores
+
+
+def _input_files(core_dir):
+    """
+    Lists the files a core's tests depend on, in a stable order.
+    """
+    files = []
+    for root, dirs, names in os.walk(core_dir):
+        dirs[:] = sorted(name for name in dirs if name not in OUTPUT_NAMES)
+        files.extend(os.path.join(root, name) for name in sorted(names)
+                     if name not in OUTPUT_NAMES and not name.endswith(".pyc"))
+
+    # Files of other cores pulled in by the test configuration, e.g. $(CORE_DIR)/../fifo_sync/fifo_sync.v
+    test_config = os.path.join(core_dir, "tests", "src", "test_config.mk")
+    if os.path.isfile(test_config):
+        with open(test_config) as f:
+            for path in re.findall(r"\$\(CORE_DIR\)/(\S+)", f.read()):
+                path = os.path.normpath(os.path.join(core_dir, path))
+                if os.path.isfile(path) and path not in files:
+                    files.append(path)
+
+    for pattern in SHARED_INPUTS:
+        files.extend(path for path in sorted(glob.glob(os.path.join(REPO_DIR, pattern))) if os.path.isfile(path))
+    return files
+
+
+def content_hash(core_dir, tool_versions):
+    """
+    Hashes everything that affects a core's test results.
+    """
+    digest = hashlib.sha256()
+
+    def add(label, data):
+        if isinstance(data, str):
+            data = data.encode()
+        digest.update(label.encode() + b"\0" + len(data).to_bytes(8, "little") + data)
+
+    for path in _input_files(core_dir):
+        add("file_name", os.path.relpath(path, core_dir))
+        with open(path, "rb") as f:
+            add("file", f.read())
+    for name in TEST_ENV:
+        add(name, os.environ.get(name, ""))
+    add("tools", tool_versions)
+    return digest.hexdigest()
+
+
+def read_status(core_dir):
+    """
+    Returns:
+        tuple: (status, full text) of a core's test_status file, status being PASSED, FAILED, NO TESTS or MISSING
+    """
+    if not os.path.isdir(os.path.join(core_dir, "tests", "src")):
+        return "NO TESTS", "NO TESTS (no tests/src directory)"
+    try:
+        with open(os.path.join(core_dir, "tests", "test_status")) as f:
+            text = f.read().strip()
+    except OSError:
+        return "MISSING", ""
+    for status in ("PASSED", "FAILED", "NO TESTS"):
+        if text.startswith(status):
+            return status, text
+    return "FAILED", text
+
+
+def run_core(project, name):
+    """
+    Runs test_core.sh for a core. Runs in a worker process.
+    """
+    vendor, core = name.split("/")
+    log_file = os.path.join(OUT_DIR, "logs", f"{vendor}_{core}.txt")
+    start = time.perf_counter()
+    with open(log_file, "w") as log:
+        exit_code = subprocess.run(["./scripts/make/test_core.sh", project, vendor, core], cwd=REPO_DIR,
+                                   stdout=log, stderr=subprocess.STDOUT,
+                                   env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1")).returncode
+    if exit_code != 0:
+        # test_core.sh exits before writing the status when the build fails
+        test_dir = os.path.join(REPO_DIR, "projects", project, "cores", vendor, core, "tests")
+        with open(os.path.join(test_dir, "test_status"), "w") as f:
+            f.write(f"FAILED tests on {time.strftime('%Y/%m/%d at %H:%M %Z')}\n"
+                    f"See log.txt for details: {os.path.relpath(test_dir, REPO_DIR)}/results/log.txt\n")
+    return {"exit_code": exit_code, "wall_time_s": round(time.perf_counter() - start, 3), "log": log_file}
+
+
+def write_project_summary(project, names):
+    """
+    Writes a project's core_tests_summary like the Makefile's `tests` target.
+    """
+    summary_file = os.path.join(REPO_DIR, "projects", project, "tests", "core_tests_summary")
+    os.makedirs(os.path.dirname(summary_file), exist_ok=True)
+    lines = [f"Test summary of custom cores for project {project} on {time.strftime('%Y/%m/%d at %H:%M %Z')}:", ""]
+    for name in names:
+        vendor, core = name.split("/")
+        _, text = read_status(os.path.join(REPO_DIR, "projects", project, "cores", vendor, core))
+        lines.append(f"{vendor}/cores/{core}:")
+        lines.append(f"  - {text}")
+    with open(summary_file, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def junit_suite(parent, core):
+    """
+    Adds a core's testsuite to the JUnit roll-up, with the testcases of its results.xml.
+    Returns:
+        tuple: (number of testcases, number of failed testcases)
+    """
+    suite = ET.SubElement(parent, "testsuite", name=core["name"], package=core["path"])
+    ET.SubElement(suite, "property", name="status", value=core["status"])
+    ET.SubElement(suite, "property", name="cached", value=str(core["cached"]).lower())
+    results_file = os.path.join(REPO_DIR, core["path"], "tests", "results", "results.xml")
+    try:
+        testcases = ET.parse(results_file).getroot().findall(".//testcase")
+    except (OSError, ET.ParseError):
+        testcases = []
+    if not testcases:
+        testcase = ET.SubElement(suite, "testcase", name=core["name"], classname="core", time=repr(core["wall_time_s"]))
+        if core["status"] == "NO TESTS":
+            ET.SubElement(testcase, "skipped", message="No tests/src directory")
+        elif core["status"] != "PASSED":
+            ET.SubElement(testcase, "failure", message=f"{core['status']}, see {core['log']}")
+        testcases = [testcase]
+    else:
+        suite.extend(testcases)
+    return len(testcases), sum(1 for testcase in testcases if testcase.find("failure") is not None)
+
+
+def main(argv):
+    jobs = os.cpu_count() or 1
+    force = False
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--jobs":
+            jobs = int(argv.pop(0))
+        elif arg == "--force":
+            force = True
+        else:
+            print("[ALL TESTS] ERROR:")
+            print("Usage: test_all_cores.py [--jobs N] [--force]")
+            return 1
+
+    os.makedirs(os.path.join(OUT_DIR, "logs"), exist_ok=True)
+    projects, cores = discover_cores()
+    tool_versions = "\n".join(_tool_version(command) for command in
+                              (["verilator", "--version"], ["cocotb-config", "--version"]))
+    state = _read_json(STATE_FILE, {})
+
+    # Hash every core, and queue the ones that changed since they last passed
+    to_run = []
+    for real_dir, core in cores.items():
+        if not core["has_tests"]:
+            core.update(hash=None, cached=False, status="NO TESTS", wall_time_s=0.0, log="")
+            continue
+        core["hash"] = content_hash(real_dir, tool_versions)
+        status, _ = read_status(real_dir)
+        previous = state.get(core["path"], {})
+        core["cached"] = (not force and previous.get("hash") == core["hash"]
+                          and status in ("PASSED", "NO TESTS") and previous.get("status") == status)
+        if core["cached"]:
+            core.update(status=status, wall_time_s=0.0, log=previous.get("log", ""))
+        else:
+            to_run.append(real_dir)
+    cached = sum(1 for core in cores.values() if core["cached"])
+    print(f"[ALL TESTS] {len(cores)} cores in {len(projects)} projects: {len(to_run)} to test, "
+          f"{cached} unchanged since they last passed, {len(cores) - len(to_run) - cached} without tests")
+
+    start = time.perf_counter()
+    if to_run:
+        with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(to_run)))) as pool:
+            futures = {real_dir: pool.submit(run_core, cores[real_dir]["project"], cores[real_dir]["name"])
+                       for real_dir in to_run}
+            for real_dir, future in futures.items():
+                core = cores[real_dir]
+                core.update(future.result())
+                status, _ = read_status(real_dir)
+                core["status"] = status if core["exit_code"] == 0 else "FAILED"
+                print(f"[ALL TESTS] {core['name']} (from {core['project']}): {core['status']} "
+                      f"in {core['wall_time_s']:.1f} s (see {os.path.relpath(core['log'], REPO_DIR)})")
+    total_time = time.perf_counter() - start
+
+    # Remember the cores' hashes for the next pass
+    for real_dir, core in cores.items():
+        if core["has_tests"]:
+            state[core["path"]] = {"hash": core["hash"], "status": core["status"], "log": core["log"]}
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+    for project, names in projects.items():
+        write_project_summary(project, names)
+
+    # Roll-ups
+    testsuites = ET.Element("testsuites", name="core_tests")
+    for core in cores.values():
+        core["tests"], core["failures"] = junit_suite(testsuites, core)
+    ET.ElementTree(testsuites).write(os.path.join(OUT_DIR, "results.xml"), encoding="UTF-8", xml_declaration=True)
+    failed = [core for core in cores.values() if core["status"] not in ("PASSED", "NO TESTS")]
+    summary = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "jobs": jobs,
+        "wall_time_s": round(total_time, 3),
+        "projects": projects,
+        "cores": [
+            {key: core[key] for key in ("name", "path", "projects", "status", "cached", "hash", "wall_time_s",
+                                        "tests", "failures")}
+            for core in cores.values()
+        ],
+        "totals": {
+            "cores": len(cores),
+            "run": len(to_run),
+            "cached": cached,
+            "failed": len(failed),
+        },
+    }
+    with open(os.path.join(OUT_DIR, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for core in failed:
+        print(f"[ALL TESTS] FAILED: {core['name']}, see {os.path.join(core['path'], 'tests', 'results', 'log.txt')}")
+    print(f"[ALL TESTS] {len(cores) - len(failed)}/{len(cores)} cores passed or have no tests "
+          f"({len(to_run)} tested in {total_time:.1f} s), see {os.path.relpath(OUT_DIR, REPO_DIR)}/summary.json")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
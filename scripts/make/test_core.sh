@@ -52,12 +52,36 @@ echo "[CORE TESTS] Running tests for ${CORE} in ${TEST_DIR} using scripts/make/c
 
 # Run “make test_custom_core”
 # Makefile inside tests/src defines a target "test_custom_core"
+# With TEST_SHARDS=<N> set, the tests are instead run in parallel shards (one process per test, N workers)
+#   by scripts/make/shard_tests.py, which merges the shards' results into the same results.xml.
+#   Test and build failures are then only reported through results.xml (a failed build leaves none).
+run_tests() {
+  if [ -n "${TEST_SHARDS}" ]; then
+    python3 scripts/make/shard_tests.py "${PROJECT}" "${VENDOR}" "${CORE}" --jobs "${TEST_SHARDS}" > "${TEST_DIR}/results/log.txt"
+    return 0
+  fi
+  make --directory="${TEST_DIR}/src" --file="$(realpath scripts/make/cocotb.mk)" "test_custom_core" > "${TEST_DIR}/results/log.txt"
+}
+
+# Record the run in the results database (tmp/results/results.db, see scripts/make/results_db.py).
+#   Set RECORD_RESULTS=0 to skip it (RESULTS_DB sets the database file). A failure to record it doesn't fail the tests.
+record_run() {
+  if [ "${RECORD_RESULTS:-1}" == "0" ]; then
+    return 0
+  fi
+  python3 scripts/make/results_db.py ingest "${TEST_DIR}/results" --project "${PROJECT}" --vendor "${VENDOR}" \
+    --core "${CORE}" --testbench "${TESTBENCH:-testbench}" --status "${1}" --wall-time "${SECONDS}" > /dev/null \
+    || echo "[CORE TESTS] WARNING: Could not record the ${CORE} test run in the results database"
+}
+
 mkdir -p "${TEST_DIR}/results"  # Ensure results directory exists
 
-if ! make --directory="${TEST_DIR}/src" --file="$(realpath scripts/make/cocotb.mk)" "test_custom_core" > "${TEST_DIR}/results/log.txt"; then
+SECONDS=0  # Wall time of the run, for the results database
+if ! run_tests; then
   # Makefile itself failed (e.g. Verilator compile error). Mark as failure.
   echo "[CORE TESTS] ERROR: Makefile failed for ${CORE} tests."
   echo "See log.txt for details: ${TEST_DIR}/results/log.txt"
+  record_run FAILED
   exit 1
 else
   # Make succeeded. Now look for results.xml in the results directory.
@@ -76,6 +100,8 @@ else
   fi
 fi
 
+record_run "${STATUS%% *}"
+
 # Write the status file line (overwriting old one)
 echo "${STATUS} on $(date +"%Y/%m/%d at %H:%M %Z")" > "${STS_FILE}"
 
@@ -0,0 +1,143 @@
+# Tests of the eviction and locking of sim_cache.py, run concurrently with restores (cache hits)
+# and simulations using the entries.
+#
+# Usage (from the repository root):
+#   python3 -m unittest discover scripts/make/tests
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "sim_cache.py"))
+sys.path.insert(0, os.path.dirname(SCRIPT))
+import sim_cache
+
+ENTRY_BYTES = 64 * 1024
+
+
+class sim_cache_eviction_test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "sim_cache")
+        self.saved = (sim_cache.CACHE_DIR, sim_cache.MAX_BYTES, sim_cache._entries)
+        sim_cache.CACHE_DIR = self.cache_dir
+        sim_cache.MAX_BYTES = 2 * ENTRY_BYTES  # Room for two of the three entries
+        self.env = dict(os.environ, SIM_CACHE_DIR=self.cache_dir)
+        # Oldest first: "old" is the least recently used, "new" was just built
+        for age, key in ((30, "old"), (20, "mid"), (10, "new")):
+            self.add_entry(key, time.time() - age)
+
+    def tearDown(self):
+        sim_cache.CACHE_DIR, sim_cache.MAX_BYTES, sim_cache._entries = self.saved
+        self.tmp.cleanup()
+
+    def add_entry(self, key, last_used):
+        entry_dir = os.path.join(self.cache_dir, key)
+        os.makedirs(entry_dir)
+        with open(os.path.join(entry_dir, sim_cache.BUILD_PRODUCT), "wb") as f:
+            f.write(b"\0" * ENTRY_BYTES)
+        with open(os.path.join(entry_dir, sim_cache.META_FILE), "w") as f:
+            json.dump({"created": last_used, "last_used": last_used, "size": ENTRY_BYTES, "uses": 1}, f)
+
+    def cached(self, key):
+        return os.path.isfile(os.path.join(self.cache_dir, key, sim_cache.BUILD_PRODUCT))
+
+    def run_cache(self, *args):
+        return subprocess.run([sys.executable, SCRIPT, *args], env=self.env, capture_output=True, text=True)
+
+    def test_evicts_least_recently_used(self):
+        sim_cache._evict(keep_key="new")
+        self.assertFalse(self.cached("old"))
+        self.assertTrue(self.cached("mid"))
+        self.assertTrue(self.cached("new"))
+
+    def test_restore_during_eviction(self):
+        # Restore "old" (a cache hit in another process) right after the eviction listed the entries,
+        # so it's picked for eviction with stale metadata
+        list_entries = sim_cache._entries
+
+        def list_then_restore():
+            entries = list_entries()
+            result = self.run_cache("build", "old", "--", "false")  # The build command must not run on a hit
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+            self.assertIn("Hit: old", result.stdout)
+            return entries
+
+        sim_cache._entries = list_then_restore
+        sim_cache._evict(keep_key="new")
+        self.assertTrue(self.cached("old"), "An entry restored after it was listed must not be evicted")
+        self.assertFalse(self.cached("mid"))
+        self.assertTrue(self.cached("new"))
+
+    def test_in_use_entry_is_not_evicted(self):
+        # Simulate with "old" in another process while evicting
+        started = os.path.join(self.tmp.name, "started")
+        release = os.path.join(self.tmp.name, "release")
+        command = (f"import os, time\nopen({started!r}, 'w').close()\n"
+                   f"while not os.path.exists({release!r}): time.sleep(0.01)\n"
+                   f"assert os.path.isfile(os.path.join({self.cache_dir!r}, 'old', {sim_cache.BUILD_PRODUCT!r}))")
+        sim = subprocess.Popen([sys.executable, SCRIPT, "use", "old", "--", sys.executable, "-c", command], env=self.env)
+        try:
+            deadline = time.time() + 30
+            while not os.path.exists(started):
+                self.assertIsNone(sim.poll(), "The simulation exited before it started using the entry")
+                self.assertLess(time.time(), deadline, "Timed out waiting for the simulation to start")
+                time.sleep(0.01)
+            sim_cache._evict(keep_key="new")
+            self.assertTrue(self.cached("old"), "An entry in use must not be evicted")
+            self.assertFalse(self.cached("mid"))
+        finally:
+            open(release, "w").close()
+            self.assertEqual(sim.wait(timeout=30), 0)
+
+        # Once the simulation is done, the entry can be evicted again
+        sim_cache.MAX_BYTES = ENTRY_BYTES
+        sim_cache._evict(keep_key="new")
+        self.assertFalse(self.cached("old"))
+
+    def test_use_of_evicted_entry_fails(self):
+        sim_cache._evict(keep_key="new")
+        result = self.run_cache("use", "old", "--", "true")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("isn't in the cache", result.stdout)
+
+    def test_concurrent_restores_and_evictions(self):
+        # Repeatedly restore and simulate with every entry in other processes while evicting,
+        # every simulation must find its entry complete for its whole run
+        sim_cache.MAX_BYTES = ENTRY_BYTES
+        product = os.path.join(self.tmp.name, sim_cache.BUILD_PRODUCT)
+        with open(product, "wb") as f:
+            f.write(b"\0" * ENTRY_BYTES)
+        check = ("import os, sys, time\n"
+                 f"path = os.path.join(os.environ['SIM_CACHE_DIR'], sys.argv[1], {sim_cache.BUILD_PRODUCT!r})\n"
+                 "for _ in range(20):\n"
+                 "    assert os.path.isfile(path), 'Entry evicted while in use: ' + path\n"
+                 "    time.sleep(0.005)\n")
+        runs = []
+        for _ in range(4):
+            for key in ("old", "mid", "new"):
+                # Exit code 1 of use: evicted between the build and use steps, which is allowed
+                script = (f"{sys.executable} {SCRIPT} build {key} -- cp {product} {self.cache_dir}/{key}/ || exit 1; "
+                          f"{sys.executable} {SCRIPT} use {key} -- {sys.executable} -c \"$CHECK\" {key}; "
+                          "status=$?; [ $status -eq 0 ] || [ $status -eq 1 ]")
+                runs.append(subprocess.Popen(["sh", "-c", script], env=dict(self.env, CHECK=check),
+                                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True))
+        evictions = 0
+        while any(run.poll() is None for run in runs):
+            sim_cache._evict(keep_key="")
+            evictions += 1
+            time.sleep(0.002)
+        for run in runs:
+            output, _ = run.communicate(timeout=60)
+            self.assertNotIn("Entry evicted while in use", output)
+            self.assertEqual(run.returncode, 0, output)
+        self.assertGreater(evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# Offline analytics of a simulation waveform dump: FIFO occupancy, utilization, stalls and throughput.
+# Arguments: <dump.vcd|dump.fst> [--scope PATH] [--clock NAME] [--signals a,b,...] [--window CYCLES] [--out PREFIX]
+# Usage: waveform_stats.py <dump.vcd|dump.fst> [--scope PATH] [--clock NAME] [--signals a,b,...] [--window CYCLES] [--out PREFIX]
+# Example:
+#   python3 scripts/make/waveform_stats.py projects/ex02_axi_interface/cores/base/fifo_sync/tests/results/dump.vcd
+#
+# The dump is read in a single streaming pass, in fixed-size chunks, so memory doesn't grow with the
+# file size. Each chunk's lines are classified and matched against the selected signals' identifier
+# codes with NumPy array operations, so the lines of every other signal are skipped without going
+# through Python. FST dumps are converted on the fly with GTKWave's fst2vcd, which must be on the PATH.
+#
+# The signals are sampled once per rising edge of the clock (--clock, default clk or aclk), with the
+# values they had just before the edge (what the flip-flops capture), into compact per-cycle arrays that
+# are reduced chunk by chunk. The signals are looked up in one scope (--scope, default the shallowest one
+# with the clock): fifo_count, full, empty, wr_en, rd_en, almost_full, almost_empty, every AXI-style
+# <prefix>valid/<prefix>ready pair, and the --signals given.
+#
+# Outputs, next to the dump by default (--out sets the path prefix):
+# - <prefix>.json: Cycles, per-signal utilization (fraction of cycles high) or value histogram, FIFO
+#     accepted writes/reads and stall cycles (wr_en while full, rd_en while empty), and AXI handshakes and
+#     stall cycles (valid without ready).
+# - <prefix>_windows.csv: Throughput per window of --window cycles (default 1000).
+# - <prefix>_occupancy.csv: Occupancy histogram (cycles at each fifo_count value).
+
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import numpy as np
+
+CHUNK_SIZE = 8 * 1024 * 1024  # Bytes of the dump read at a time
+DEFAULT_WINDOW = 1000
+CLOCK_NAMES = ("clk", "aclk", "s_axi_aclk", "clock")
+FIFO_SIGNALS = ("fifo_count", "full", "empty", "wr_en", "rd_en", "almost_full", "almost_empty")
+
+
+def open_dump(path):
+    """
+    Opens a dump as a VCD byte stream (FST files through fst2vcd).
+    Returns:
+        tuple: (stream, subprocess or None)
+    """
+    if path.endswith(".fst"):
+        try:
+            process = subprocess.Popen(["fst2vcd", path], stdout=subprocess.PIPE)
+        except OSError:
+            raise RuntimeError("Reading FST dumps needs fst2vcd (from GTKWave) on the PATH")
+        return process.stdout, process
+    return open(path, "rb"), None
+
+
+def read_header(stream):
+    """
+    Reads the VCD header, up to $enddefinitions.
+    Returns:
+        tuple: (timescale string, {scope path: {signal name: (code, width)}}, leftover body bytes)
+    """
+    data = b""
+    while True:
+        match = re.search(rb"\$enddefinitions\s+\$end", data)
+        if match:
+            break
+        chunk = stream.read(1024 * 1024)
+        if not chunk:
+            raise ValueError("No $enddefinitions in the dump (not a VCD file?)")
+        data += chunk
+    tokens = data[:match.start()].decode(errors="replace").split()
+
+    timescale = ""
+    scopes = {}
+    path = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token not in ("$scope", "$upscope", "$var", "$timescale", "$date", "$version", "$comment"):
+            index += 1
+            continue
+        end = tokens.index("$end", index + 1)
+        if token == "$scope":
+            path.append(tokens[index + 2])
+            scopes.setdefault(".".join(path), {})
+        elif token == "$upscope":
+            path.pop()
+        elif token == "$var":
+            _, width, code, name = tokens[index + 1:index + 5]
+            scopes.setdefault(".".join(path), {}).setdefault(name.split("[")[0], (code, int(width)))
+        elif token == "$timescale":
+            timescale = "".join(tokens[index + 1:end])
+        index = end + 1
+    return timescale, scopes, data[match.end():]
+
+
+def timescale_ps(timescale):
+    """
+    Converts a VCD timescale (e.g. "1ps", "10ns") to picoseconds per time unit.
+    """
+    match = re.fullmatch(r"(\d+)\s*(s|ms|us|ns|ps|fs)", timescale)
+    if not match:
+        return 1.0
+    units = {"s": 1e12, "ms": 1e9, "us": 1e6, "ns": 1e3, "ps": 1.0, "fs": 1e-3}
+    return int(match.group(1)) * units[match.group(2)]
+
+
+def select_signals(scopes, scope=None, clock=None, extra=()):
+    """
+    Picks the scope, clock and signals to analyze.
+    Returns:
+        tuple: (scope path, clock name, {signal name: (code, width)}, [(pair prefix, valid, ready)])
+    Raises:
+        ValueError: If the scope, clock or a requested signal isn't found.
+    """
+    clock_names = (clock,) if clock else CLOCK_NAMES
+    if scope is None:
+        candidates = [path for path, signals in scopes.items() if any(name in signals for name in clock_names)]
+        if not candidates:
+            raise ValueError(f"No scope has a clock named {' or '.join(clock_names)} (set --clock)")
+        scope = min(candidates, key=lambda path: (path.count("."), path))
+    elif scope not in scopes:
+        matches = [path for path in scopes if path.endswith("." + scope)]
+        if len(matches) != 1:
+            raise ValueError(f"Scope {scope} not found, or ambiguous: {', '.join(matches) or 'no match'}")
+        scope = matches[0]
+    variables = scopes[scope]
+    clock = next((name for name in clock_names if name in variables), None)
+    if clock is None:
+        raise ValueError(f"No clock named {' or '.join(clock_names)} in scope {scope}")
+
+    selected = {name: variables[name] for name in FIFO_SIGNALS if name in variables}
+    pairs = []
+    for name in sorted(variables):
+        if name.endswith("valid") and name[:-5] + "ready" in variables:
+            prefix = name[:-5].rstrip("_")
+            pairs.append((prefix, name, name[:-5] + "ready"))
+            selected[name] = variables[name]
+            selected[name[:-5] + "ready"] = variables[name[:-5] + "ready"]
+    for name in extra:
+        if name not in variables:
+            raise ValueError(f"Signal {name} not found in scope {scope}")
+        selected[name] = variables[name]
+    for name, (_, width) in selected.items():
+        if width > 64:
+            raise ValueError(f"Signal {name} is {width} bits wide (at most 64 are supported)")
+    return scope, clock, selected, pairs
+
+
+def _line_keys(data, ends, length):
+    """
+    Packs the last `length` bytes of every line into an integer, to compare them with identifier codes.
+    """
+    keys = np.zeros(len(ends), dtype=np.uint64)
+    for offset in range(length, 0, -1):
+        keys = (keys << np.uint64(8)) | data[ends - offset].astype(np.uint64)
+    return keys
+
+
+def _parse_numbers(data, starts, stops, base):
+    """
+    Parses the numbers in data[start:stop] for every (start, stop) pair, at most 64 bits (or 19 digits) long.
+    Binary digits other than 1 (x and z) read as 0.
+    Returns:
+        numpy.ndarray: uint64 values.
+    """
+    lengths = stops - starts
+    width = int(lengths.max(initial=0))
+    values = np.zeros(len(starts), dtype=np.uint64)
+    # Digit j (from the right) of every number, 0 past its length
+    for digit in range(width):
+        valid = lengths > digit
+        characters = data[np.where(valid, stops - 1 - digit, 0)]
+        if base == 2:
+            values |= ((characters == ord("1")) & valid).astype(np.uint64) << np.uint64(digit)
+        else:
+            values += np.where(valid, characters - ord("0"), 0).astype(np.uint64) * np.uint64(base ** digit)
+    return values
+
+
+def sample_cycles(stream, body, clock_code, codes):
+    """
+    Streams the value changes of a VCD body, and samples the selected signals before every rising clock edge.
+    Each chunk is cut at a timestamp, and its lines are classified, matched against the identifier codes and
+    parsed with array operations.
+    Args:
+        stream: VCD byte stream, positioned after the header.
+        body (bytes): Body bytes already read with the header.
+        clock_code (str): Identifier code of the clock.
+        codes (list): Identifier code of each selected signal (codes longer than 8 characters aren't supported).
+    Yields:
+        tuple: (edge times, samples) of the rising edges in each chunk, as a uint64 array of time units
+            and a (cycles, signals) uint64 array.
+    Raises:
+        ValueError: If an identifier code is too long.
+    """
+    watched = sorted(set(codes) | {clock_code})
+    if max(len(code) for code in watched) > 8:
+        raise ValueError("Identifier codes longer than 8 characters aren't supported")
+    watched_index = {code: index for index, code in enumerate(watched)}
+    clock_index = watched_index[clock_code]
+    # Watched codes packed into integers, grouped by length: (sorted keys, code indices)
+    code_keys = {}
+    for length in {len(code) for code in watched}:
+        keys = {int.from_bytes(code.encode(), "big"): index for index, code in enumerate(watched) if len(code) == length}
+        code_keys[length] = (np.array(sorted(keys), dtype=np.uint64), np.array([keys[key] for key in sorted(keys)]))
+    state = np.zeros(len(codes), dtype=np.uint64)  # Values after the previous chunk
+    clock = -1  # Unknown until the first clock change
+    last_time = 0
+
+    rest = body
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        data = rest + chunk
+        if chunk:
+            # Keep the last timestamp (its changes may continue in the next chunk) for the next chunk
+            cut = data.rfind(b"\n#") + 1
+            if cut == 0:
+                rest = data
+                continue
+            data, rest = data[:cut], data[cut:]
+        elif not data:
+            break
+        elif not data.endswith(b"\n"):
+            data += b"\n"
+
+        array = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(array == ord("\n"))
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        first = array[starts]
+        is_time = first == ord("#")
+        is_scalar = np.isin(first, np.frombuffer(b"01xzXZ", dtype=np.uint8))
+        is_vector = (first == ord("b")) | (first == ord("B"))
+
+        # Watched code of every line (-1 for other signals and timestamps)
+        line_code = np.full(len(ends), -1, dtype=np.int32)
+        for length, (sorted_keys, indices) in code_keys.items():
+            candidates = np.flatnonzero((is_scalar & (ends - starts == length + 1)) |
+                                        (is_vector & (array[np.maximum(ends - length - 1, 0)] == ord(" "))))
+            keys = _line_keys(array, ends[candidates], length)
+            position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+            matches = sorted_keys[position] == keys
+            line_code[candidates[matches]] = indices[position[matches]]
+
+        # Timestamp number of every event (the changes before the chunk's first timestamp are number 0)
+        events = np.flatnonzero(is_time | (line_code >= 0))
+        event_time = np.cumsum(is_time[events])
+        event_code = line_code[events]
+        time_lines = events[is_time[events]]
+
+        clock_events = event_code == clock_index
+        clock_values = first[events[clock_events]] == ord("1")
+        if is_vector[events[clock_events]].any():
+            clock_lines = events[clock_events]
+            clock_values |= is_vector[clock_lines] & (array[ends[clock_lines] - len(clock_code) - 2] == ord("1"))
+        clock_values = clock_values.astype(np.int8)
+        previous = np.concatenate(([clock], clock_values[:-1]))
+        edges = event_time[clock_events][(clock_values == 1) & (previous == 0)]
+        if len(clock_values):
+            clock = int(clock_values[-1])
+
+        edge_lines = time_lines[np.maximum(edges - 1, 0)] if len(time_lines) else np.zeros(len(edges), dtype=np.int64)
+        times = np.where(edges > 0, _parse_numbers(array, starts[edge_lines] + 1, ends[edge_lines], 10), np.uint64(last_time))
+        if len(time_lines):
+            last_time = int(data[starts[time_lines[-1]] + 1:ends[time_lines[-1]]])
+
+        samples = np.empty((len(edges), len(codes)), dtype=np.uint64)
+        for column, code in enumerate(codes):
+            code_events = event_code == watched_index[code]
+            lines = events[code_events]
+            vector_lines = is_vector[lines]
+            values = (first[lines] == ord("1")).astype(np.uint64)
+            if vector_lines.any():
+                values[vector_lines] = _parse_numbers(array, starts[lines[vector_lines]] + 1,
+                                                      ends[lines[vector_lines]] - len(code) - 1, 2)
+            # Value of each signal just before each edge: its last change in an earlier timestamp
+            last = np.searchsorted(event_time[code_events], edges, side="left") - 1
+            samples[:, column] = np.where(last >= 0, values[np.maximum(last, 0)] if len(values) else 0, state[column])
+            if len(values):
+                state[column] = values[-1]
+        if len(edges):
+            yield times, samples
+        if not chunk:
+            break
+
+
+class waveform_stats:
+
+    def __init__(self, names, widths, pairs, window, time_unit_ps=1.0):
+        """
+        Args:
+            names (list): Names of the sampled signals (columns of the sample blocks).
+            widths (list): Width of each signal in bits.
+            pairs (list): (prefix, valid name, ready name) AXI handshake pairs.
+            window (int): Cycles per throughput window.
+            time_unit_ps (float): Picoseconds per time unit of the dump.
+        """
+        self.names = names
+        self.widths = widths
+        self.column = {name: index for index, name in enumerate(names)}
+        self.pairs = pairs
+        self.window = window
+        self.time_unit_ps = time_unit_ps
+        self.cycles = 0
+        self.first_time = None
+        self.last_time = None
+        self.high_cycles = np.zeros(len(names), dtype=np.int64)
+        self.histograms = {name: {} for name, width in zip(names, widths) if width > 1}
+        self.totals = {}
+        self.windows = []
+        self._carry = None  # Samples of the last, incomplete window
+
+    def _signal(self, block, name):
+        index = self.column.get(name)
+        return None if index is None else block[:, index]
+
+    def _events(self, block):
+        """
+        Per-cycle event counts of a block of samples.
+        Returns:
+            dict: {event name: boolean array}
+        """
+        events = {}
+        wr_en, rd_en = self._signal(block, "wr_en"), self._signal(block, "rd_en")
+        full, empty = self._signal(block, "full"), self._signal(block, "empty")
+        if wr_en is not None:
+            not_full = full == 0 if full is not None else True
+            events["writes"] = (wr_en != 0) & not_full
+            if full is not None:
+                events["write_stall_cycles"] = (wr_en != 0) & (full != 0)
+        if rd_en is not None:
+            not_empty = empty == 0 if empty is not None else True
+            events["reads"] = (rd_en != 0) & not_empty
+            if empty is not None:
+                events["read_stall_cycles"] = (rd_en != 0) & (empty != 0)
+        for prefix, valid, ready in self.pairs:
+            valid, ready = self._signal(block, valid) != 0, self._signal(block, ready) != 0
+            events[f"{prefix}_handshakes"] = valid & ready
+            events[f"{prefix}_stall_cycles"] = valid & ~ready
+        return events
+
+    def add(self, times, block):
+        """
+        Reduces a block of samples into the statistics.
+        """
+        if self.first_time is None:
+            self.first_time = int(times[0])
+        self.last_time = int(times[-1])
+        start_cycle = self.cycles
+        self.cycles += len(block)
+        self.high_cycles += np.count_nonzero(block, axis=0)
+        for name, histogram in self.histograms.items():
+            values, counts = np.unique(block[:, self.column[name]], return_counts=True)
+            for value, count in zip(values.tolist(), counts.tolist()):
+                histogram[value] = histogram.get(value, 0) + count
+        for event, mask in self._events(block).items():
+            self.totals[event] = self.totals.get(event, 0) + int(np.count_nonzero(mask))
+
+        # Throughput windows, carrying the incomplete last window over to the next block
+        if self._carry is not None:
+            carry_times, carry_block = self._carry
+            times, block = np.concatenate((carry_times, times)), np.concatenate((carry_block, block))
+            start_cycle -= len(carry_block)
+        complete = len(block) // self.window * self.window
+        for start in range(0, complete, self.window):
+            self._add_window(start_cycle + start, times[start], block[start:start + self.window])
+        self._carry = (times[complete:], block[complete:]) if complete < len(block) else None
+
+    def _add_window(self, start_cycle, start_time, block):
+        row = {"window": len(self.windows), "start_cycle": start_cycle, "start_time_ps": round(int(start_time) * self.time_unit_ps), "cycles": len(block)}
+        for event, mask in self._events(block).items():
+            if not event.endswith("stall_cycles"):
+                row[event] = int(np.count_nonzero(mask))
+        count = self._signal(block, "fifo_count")
+        if count is not None:
+            row["mean_fifo_count"] = round(float(count.mean()), 3)
+            row["max_fifo_count"] = int(count.max())
+        self.windows.append(row)
+
+    def finish(self):
+        if self._carry is not None:
+            carry_times, carry_block = self._carry
+            self._add_window(self.cycles - len(carry_block), carry_times[0], carry_block)
+            self._carry = None
+
+    def summary(self):
+        """
+        Returns:
+            dict: The statistics of all the cycles added.
+        """
+        cycles = max(self.cycles, 1)
+        time_unit_ps = self.time_unit_ps
+        signals = {}
+        for name, width, high in zip(self.names, self.widths, self.high_cycles.tolist()):
+            if width == 1:
+                signals[name] = {"width": 1, "high_cycles": high, "utilization": round(high / cycles, 6)}
+            else:
+                histogram = dict(sorted(self.histograms[name].items()))
+                total = sum(value * count for value, count in histogram.items())
+                signals[name] = {"width": width, "min": min(histogram, default=0), "max": max(histogram, default=0),
+                                 "mean": round(total / cycles, 3), "histogram": {str(value): count for value, count in histogram.items()}}
+        summary = {
+            "cycles": self.cycles,
+            "first_edge_ps": None if self.first_time is None else self.first_time * time_unit_ps,
+            "last_edge_ps": None if self.last_time is None else self.last_time * time_unit_ps,
+            "clock_period_ps": None if self.cycles < 2 else (self.last_time - self.first_time) * time_unit_ps / (self.cycles - 1),
+            "signals": signals,
+        }
+        fifo = {event: count for event, count in self.totals.items() if event in ("writes", "reads", "write_stall_cycles", "read_stall_cycles")}
+        if fifo:
+            for flag in ("full", "empty"):
+                if flag in self.column:
+                    fifo[f"{flag}_cycles"] = signals[flag]["high_cycles"]
+            fifo["write_utilization"] = round(fifo.get("writes", 0) / cycles, 6)
+            fifo["read_utilization"] = round(fifo.get("reads", 0) / cycles, 6)
+            summary["fifo"] = fifo
+        if self.pairs:
+            summary["axi"] = {prefix: {
+                "handshakes": self.totals[f"{prefix}_handshakes"],
+                "stall_cycles": self.totals[f"{prefix}_stall_cycles"],
+                "utilization": round(self.totals[f"{prefix}_handshakes"] / cycles, 6),
+            } for prefix, _, _ in self.pairs}
+        return summary
+
+
+def analyze(path, scope=None, clock=None, extra=(), window=DEFAULT_WINDOW):
+    """
+    Analyzes a waveform dump in one streaming pass.
+    Returns:
+        tuple: (summary dict, list of window rows)
+    """
+    stream, process = open_dump(path)
+    try:
+        timescale, scopes, body = read_header(stream)
+        scope, clock, selected, pairs = select_signals(scopes, scope, clock, extra)
+        names = list(selected)
+        stats = waveform_stats(names, [selected[name][1] for name in names], pairs, window, timescale_ps(timescale))
+        for times, block in sample_cycles(stream, body, scopes[scope][clock][0], [selected[name][0] for name in names]):
+            stats.add(times, block)
+        stats.finish()
+    finally:
+        stream.close()
+        if process is not None:
+            process.wait()
+    if process is not None and process.returncode != 0:
+        raise RuntimeError(f"fst2vcd failed with exit code {process.returncode}")
+
+    summary = {"dump": path, "scope": scope, "clock": clock, "timescale": timescale, "window_cycles": window}
+    summary.update(stats.summary())
+    return summary, stats.windows
+
+
+def main(argv):
+    scope = clock = None
+    extra = []
+    window = DEFAULT_WINDOW
+    out_prefix = None
+    args = []
+    while argv:
+        arg = argv.pop(0)
+        if arg == "--scope":
+            scope = argv.pop(0)
+        elif arg == "--clock":
+            clock = argv.pop(0)
+        elif arg == "--signals":
+            extra += [name for name in argv.pop(0).split(",") if name]
+        elif arg == "--window":
+            window = int(argv.pop(0))
+        elif arg == "--out":
+            out_prefix = argv.pop(0)
+        else:
+            args.append(arg)
+    if len(args) != 1 or window < 1:
+        print("[WAVEFORM STATS] ERROR:")
+        print("Usage: waveform_stats.py <dump.vcd|dump.fst> [--scope PATH] [--clock NAME] [--signals a,b,...] "
+              "[--window CYCLES] [--out PREFIX]")
+        return 1
+    path = args[0]
+    if out_prefix is None:
+        out_prefix = os.path.join(os.path.dirname(path), "waveform_stats")
+
+    try:
+        summary, windows = analyze(path, scope, clock, extra, window)
+    except (OSError, ValueError, RuntimeError) as error:
+        print(f"[WAVEFORM STATS] ERROR: {error}")
+        return 1
+
+    os.makedirs(os.path.dirname(out_prefix) or ".", exist_ok=True)
+    with open(f"{out_prefix}.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    if windows:
+        with open(f"{out_prefix}_windows.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(windows[0]))
+            writer.writeheader()
+            writer.writerows(windows)
+    if "fifo_count" in summary["signals"]:
+        with open(f"{out_prefix}_occupancy.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fifo_count", "cycles"])
+            writer.writerows(summary["signals"]["fifo_count"]["histogram"].items())
+
+    print(f"[WAVEFORM STATS] {summary['cycles']} cycles of {summary['scope']} (clock {summary['clock']}), "
+          f"{len(summary['signals'])} signals: {', '.join(summary['signals'])}")
+    for name, value in summary.get("fifo", {}).items():
+        print(f"[WAVEFORM STATS]   {name}: {value}")
+    for prefix, values in summary.get("axi", {}).items():
+        print(f"[WAVEFORM STATS]   {prefix}: {values['handshakes']} handshakes, {values['stall_cycles']} stall cycles")
+    print(f"[WAVEFORM STATS] Wrote {out_prefix}.json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))